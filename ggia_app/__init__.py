@@ -1,19 +1,38 @@
 from flask import Flask
+from flask.cli import AppGroup
 from flask_migrate import Migrate
 from flask_cors import CORS
+import click
 import os
+import time
+
+from ggia_app.startup import (
+    timed_import, IMPORT_TIMES, STARTUP_TIMES, STARTUP_MODE, STARTUP_BUDGET
+)
+
+# The modules are imported one by one to report their import times
+# ("flask ggia startup-report"). None of them loads datasets when imported.
+timed_import("ggia_app.dataset_registry")
+importer = timed_import("ggia_app.importer")
+countries = timed_import("ggia_app.countries")
+create_local_dataset = timed_import("ggia_app.create_local_dataset")
+transport = timed_import("ggia_app.transport")
+land_use_change = timed_import("ggia_app.land_use_change")
+consumption = timed_import("ggia_app.consumption")
+buildings = timed_import("ggia_app.buildings")
+timed_import("ggia_app.warmup")
 
-from ggia_app import importer, countries
-import ggia_app.create_local_dataset as create_local_dataset
-import ggia_app.transport as transport
-import ggia_app.land_use_change as land_use_change
-import ggia_app.consumption as consumption
 from ggia_app.models import db, Country, TransportMode, LandUseChange
 from ggia_app.config import *
-from ggia_app.buildings import blue_print
+from ggia_app.dataset_registry import write_snapshots
+from ggia_app.warmup import (
+    warmup, print_warmup_report, start_background_warmup, print_startup_report
+)
 
 
 def create_app(test_config=None):
+    start = time.perf_counter()
+
     app = Flask(__name__, instance_relative_config=True)
     CORS(app)
 
@@ -48,8 +67,33 @@ def create_app(test_config=None):
     app.register_blueprint(buildings.blue_print)
     app.register_blueprint(consumption.blue_print)
 
+    # Load all reference datasets and precompute the per-country data before
+    # the first request (once in the master process with gunicorn --preload),
+    # unless startup_mode in config.json defers it (see ggia_app.startup)
+    if STARTUP_MODE == "eager":
+        print_warmup_report(warmup())
+    elif STARTUP_MODE == "background":
+        start_background_warmup()
+
+    ggia_cli = AppGroup("ggia", help="GGIA maintenance commands.")
+
+    @ggia_cli.command("snapshot")
+    def snapshot():
+        """Writes binary snapshots of all reference datasets for faster startup."""
+        for path in write_snapshots():
+            click.echo(path)
+
+    @ggia_cli.command("startup-report")
+    def startup_report():
+        """Prints the import and dataset load time of every module."""
+        if not print_startup_report(IMPORT_TIMES, STARTUP_TIMES, STARTUP_BUDGET):
+            raise SystemExit(1)
+
+    app.cli.add_command(ggia_cli)
+
     @app.route('/')
     def hello():
         return 'Welcome to the Greenhouse Gas Impact Assessment'
 
+    STARTUP_TIMES["create_app"] = time.perf_counter() - start
     return app
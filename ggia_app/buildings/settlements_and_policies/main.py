@@ -1,9 +1,12 @@
-import glob
-import os
-
 import pandas as pd
 
-from ggia_app.buildings.utils.emission_factor_calculator import emission_factor
+from ggia_app.buildings.utils.emission_factor_calculator import (
+    emission_factor, country_emission_factor
+)
+from ggia_app.dataset_registry import (
+    get_table, get_country_data, get_country_index, BUILDINGS_DATASET
+)
+from ggia_app.local_datasets import check_local_data
 from ggia_app.buildings.baseline.main import calculate_baseline_emission
 from .unit7.u71 import u71_emission as u71_emission_calculator
 from .unit7.u72 import u72_emission as u72_emission_calculator
@@ -14,36 +17,6 @@ from .unit8.commercial import commercial_emission
 from .unit8.change_building_use import building_emission
 
 
-def check_local_data(country):
-    country_data = pd.DataFrame()
-
-    FULL_CSV_PATH_LOCAL = os.path.join("CSVfiles", "local_datasets", "")
-    for file in glob.glob(FULL_CSV_PATH_LOCAL + "*.csv"):
-        file_name = os.path.splitext(os.path.basename(file))[0]
-        file_name = file_name.replace("-", ": ")
-        file_name = file_name.replace("__", ":")
-        file_name = file_name.replace("_", ".")
-
-        if country == file_name:
-            df = pd.read_csv(file)
-            sub_df = df[["VariableAcronym", "Value"]].T
-            sub_df.columns = sub_df.iloc[0]
-            sub_df = sub_df.drop(["VariableAcronym"])
-
-            # Change data types to correct type
-            local_dataset_format = pd.read_csv("CSVfiles/local_dataset_format.csv")
-            for i in range(len(local_dataset_format)):
-                if local_dataset_format["VariableType"][i] == "Float":
-                    sub_df[local_dataset_format["VariableAcronym"][i]] = sub_df[
-                        local_dataset_format["VariableAcronym"][i]].astype(float)
-
-            sub_df.fillna(0, inplace=True)
-
-            country_data = sub_df
-
-    return country_data
-
-
 def calculate_settlements_emission(
         start_year, country,
 
@@ -103,6 +76,7 @@ def calculate_settlements_emission(
 
         policy_residential_list, policy_commercial_list, policy_building_changes_list
 ):
+    df = get_table(BUILDINGS_DATASET)
 
     # Check if country name contains local-dataset name
     # If so, removes country name
@@ -116,26 +90,22 @@ def calculate_settlements_emission(
     if country_data.empty:
         if country_code_separator in country_ORG:
             country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/buildings_full_dataset.csv",
-        )
-        df.fillna(0, inplace=True)
-
-        country_data = df.loc[df["country"] == country]
+        country_data = get_country_data(BUILDINGS_DATASET, country)
 
     # Check if country data is still empty after checking local
     if country_data.empty:
         return None, None, None, {"status": "invalid", "messages": "Country data not found."}
 
-    country_map = dict(zip(df.country, df.index))
+    country_map = get_country_index(BUILDINGS_DATASET)
 
     try:
         country_code = country_map[country]
+        emission_factors = country_emission_factor(country)
     except KeyError as err:
         df = country_data
         country_code = 0
+        emission_factors = emission_factor(df, country_code)
 
-    emission_factors = emission_factor(df, country_code)
     emission_factors_df = pd.DataFrame(emission_factors)
 
     base_line_emission, error = calculate_baseline_emission(
@@ -1,3 +1,8 @@
+from ggia_app.dataset_registry import (
+    get_table, get_country_index, get_country_record, BUILDINGS_DATASET
+)
+
+
 # making emission factors EFGEa and  EFDHa table
 
 def emission_factor(df, country_code):
@@ -21,3 +26,16 @@ def emission_factor(df, country_code):
                                                  DISTRICT_HEATING_emission_factora
         emission_factors[i] = (round(GRID_ELECTRICITY_emission_factora, 1), round(DISTRICT_HEATING_emission_factora, 1))
     return emission_factors
+
+
+def country_emission_factor(country):
+    """
+    Returns emission_factor() of a country of the buildings dataset.
+    The table is computed once per dataset version and must not be modified.
+    """
+    def build(country_record):
+        return emission_factor(
+            get_table(BUILDINGS_DATASET), get_country_index(BUILDINGS_DATASET)[country]
+        )
+
+    return get_country_record(BUILDINGS_DATASET, country).get_derived("emission_factors", build)
@@ -49,12 +49,14 @@
 
 # Loading Python Libraries
 import os
-import glob
 import pandas as pd
 import numpy as np
 from flask import Blueprint
 from flask import request
 import humps
+from ggia_app.dataset_registry import get_table
+from ggia_app.local_datasets import list_local_datasets
+from ggia_app.demand_vectors import get_demand_vector, list_demand_vectors
 PLOTTING = (__name__ == "__main__")  # if called directly enable plotting
 if PLOTTING:
     import matplotlib.pyplot as plt
@@ -72,81 +74,56 @@ blue_print = Blueprint("consumption", __name__, url_prefix="/api/v1/calculate/co
 
 DELTA_ZERO = 0.00001  # delta to do float zero cut-off
 
-## CSV imports
+## CSV tables
+# The tables are looked up in ggia_app.dataset_registry by name when they are
+# used, so they are only loaded once the first consumption request needs them
 CSV_PATH = os.path.join("CSVfiles", "consumption", "")
 
-# Load the projections for income and house size
-HOUSE_SIZE_PROJ_T = pd.read_csv(CSV_PATH + "House_proj_exio.csv", index_col=0)
-INCOME_PROJ_T = pd.read_csv(CSV_PATH + "Income_proj_exio.csv", index_col=0)
+# Projections for income and house size: "house_size_proj", "income_proj"
 
-# Load the different Y vectors.
+# The different Y vectors.
 # The user selects which one
 # to use based on the urban density of the region (or the
 # average one for mixed regions or if they are unsure)
 Y_VECTORS = {
-    'average': pd.read_csv(CSV_PATH + "Average_2020_Exio_elec_trans_en_Euro.csv", index_col=0),
-    'city': pd.read_csv(CSV_PATH + "City_2020_Exio_elec_trans_en_Euro.csv", index_col=0),
-    'rural': pd.read_csv(CSV_PATH + "Rural_2020_Exio_elec_trans_en_Euro.csv", index_col=0),
-    'town': pd.read_csv(CSV_PATH + "Town_2020_Exio_elec_trans_en_Euro.csv", index_col=0) }
-
-# Local datasets read from CSV-path local
-CSV_PATH_LOCAL = os.path.join(CSV_PATH + "datasets", "")
-Y_VECTORS_LOCAL = {}
-for file in glob.glob(CSV_PATH_LOCAL + "*.csv"):
-    try:
-        local_table = pd.read_csv(file, index_col=0)
-        if Y_VECTORS['average'].index.equals(local_table.index):  # small format check
-            name = os.path.basename(file).split("_")[0] + ": " + local_table.columns[0]
-            Y_VECTORS_LOCAL[name] = local_table[local_table.columns[0]].copy()
-    except (FileNotFoundError, IndexError, KeyError, pd.errors.ParserError):
-        pass
-
-
-# Load the Use phase and tail pipe emissions.
-USE_PHASE_T = pd.read_csv(CSV_PATH + "Energy_use_phase_Euro.csv", index_col=0)
-TAIL_PIPE_T = pd.read_csv(CSV_PATH + "Tailpipe_emissions_bp.csv", index_col=0)
-
-# Load default house sizes
-HOUSE_SIZE_T = pd.read_csv(CSV_PATH + "Household_characteristics_2015.csv", index_col=0)
-
-# Load the Emission intensities
-# EMISSION_COUNTRIES_T is the standard Emissions factors
-EMISSION_COUNTRIES_T = pd.read_csv(CSV_PATH + "Country_Emissions_intensities.csv", index_col=0)
-
-# M_countries_LCA is the same as M_countries, but with the electricity sector replaced with
-# individual LCA values
+    'average': "y_vector_average",
+    'city': "y_vector_city",
+    'rural': "y_vector_rural",
+    'town': "y_vector_town" }
+
+# Local datasets (Y vectors of CSVfiles/consumption/datasets) are looked up in
+# ggia_app.demand_vectors, so that new files are found without a restart
+
+# Use phase and tail pipe emissions: "use_phase", "tail_pipe"
+
+# Default house sizes: "house_size"
+
+# Emission intensities
+# "emission_countries" is the standard Emissions factors
+# "emission_countries_lca" is the same as "emission_countries", but with the electricity sector
+# replaced with individual LCA values
 # This is useful if there is local electricity production. The user can replace certain values
 # with these values if needed
-EMISSION_COUNTRIES_LCA_T = pd.read_csv(
-    CSV_PATH + "Country_Emissions_intensities_LCA.csv", index_col=0)
-PRODUCT_COUNT = EMISSION_COUNTRIES_T.columns
-EXIO_PRODUCTS_T = pd.read_csv(CSV_PATH + "Exio_products.csv")
 
-# Load the IW sectors
+# IW sectors: "iw_sectors"
 # This is needed to put the emissions into different 'sectors', such as transport,
 # food, building energy use, etc
-IW_SECTORS_T = pd.read_csv(CSV_PATH + "IW_sectors_reduced.csv", index_col=0)
-IW_SECTORS_NP_T = IW_SECTORS_T.to_numpy()
-IW_SECTORS_NP_TR_T = np.transpose(IW_SECTORS_NP_T)
 
-# Load the adjustable amounts.
+# Adjustable amounts: "adjustable_amounts"
 # This says how much electricity is spent on heating. There are some other things here but
 # decided not to include.
-ADJUSTABLE_AMOUNTS_T = pd.read_csv(CSV_PATH + "Adjustable_energy_amounts.csv", index_col=0)
 
 # Electricity prices database might need updating still - TODO: we could think about that later
-# Load the electricity prices. This is so we know in monetary terms how much is being spent on
-# electricity. The tool
+# Electricity prices: "electricity_prices". This is so we know in monetary terms how much is
+# being spent on electricity. The tool
 # at the moment has the electricity used by households in kWh. However, maybe this should now be
 # changed?
-ELECTRICITY_PRICES_T = pd.read_csv(CSV_PATH + "electricity_prices_2019.csv", index_col=0)
 
-# Load the fuel prices at basic price
+# Fuel prices at basic price: "fuel_prices"
 # We need this because of electric vehicles. The electricity and fuels need to be in the same units.
-FUEL_PRICES_T = pd.read_csv(CSV_PATH + "Fuel_prices_BP_attempt.csv", index_col=0)
 
-# Load the Income scaler. This describes how much each household spends depending on their income.
-INCOME_SCALING_T = pd.read_csv(CSV_PATH + "mean_expenditure_by_quint.csv", index_col=0)
+# Income scaler: "income_scaling". This describes how much each household spends depending on
+# their income.
 
 # Types of electricity
 # No electricity goes in ELECTRICITY_NEC. This is used for local electricity production
@@ -395,24 +372,27 @@ class Consumption:
         area_type = self.area_type
 
         self.local_dataset = local_dataset
-        if self.local_dataset is not None \
-            and self.local_dataset in Y_VECTORS_LOCAL:
+        local_demand_kv = None
+        if self.local_dataset is not None:
+            local_demand_kv = get_demand_vector(self.local_dataset)
+
+        if local_demand_kv is not None:
             name_split = self.local_dataset.split(": ")
             if len(name_split) == 2:
                 self.country = name_split[0]
                 self.region = name_split[1]
 
             # initial demand vector
-            self.demand_kv = Y_VECTORS_LOCAL[self.local_dataset]
+            self.demand_kv = local_demand_kv
         else:
             # initial demand vector
-            self.demand_kv = Y_VECTORS[area_type][country].copy()
+            self.demand_kv = get_table(Y_VECTORS[area_type])[country].copy()
 
         # U9.3: House_size
         # example: self.house_size = 2.14
         if house_size < DELTA_ZERO:
             # Pick default
-            self.house_size = HOUSE_SIZE_T.loc['Average_size_' + area_type, country]
+            self.house_size = get_table("house_size").loc['Average_size_' + area_type, country]
         else:
             self.house_size = house_size
 
@@ -424,8 +404,9 @@ class Consumption:
             income_scaler = 1
         else:
             self.income_choice = INCOME_CHOICE_TO_HOUSEHOLD[income_choice]
-            income_scaler = INCOME_SCALING_T.loc[self.income_choice, country] \
-                / INCOME_SCALING_T.loc['Total_household', country]  # USER_INPUT
+            income_scaling = get_table("income_scaling")
+            income_scaler = income_scaling.loc[self.income_choice, country] \
+                / income_scaling.loc['Total_household', country]  # USER_INPUT
 
         elasticity = 1  # Random number for now. It should be specific to country and product
                         # TODO: do later
@@ -450,15 +431,15 @@ class Consumption:
 
         # Here the emission intensities are selected
         self.emission_intensities = \
-            EMISSION_COUNTRIES_T.loc[self.direct_ab:self.indirect_ab, :].copy()
+            get_table("emission_countries").loc[self.direct_ab:self.indirect_ab, :].copy()
 
         # These are needed for the use phase emissions
-        self.tail_pipe_ab = TAIL_PIPE_T[country].copy()
-        self.use_phase_ab = USE_PHASE_T[country].copy()
+        self.tail_pipe_ab = get_table("tail_pipe")[country].copy()
+        self.use_phase_ab = get_table("use_phase")[country].copy()
 
         # This is needed for calculating the amount of electricity coming from heating
-        self.adjustable_amounts = ADJUSTABLE_AMOUNTS_T[country].copy()
-        self.elec_price = ELECTRICITY_PRICES_T[country]["BP_2019_S2_Euro"]
+        self.adjustable_amounts = get_table("adjustable_amounts")[country].copy()
+        self.elec_price = get_table("electricity_prices")[country]["BP_2019_S2_Euro"]
 
         # Baseline Modifications go here  ##Possibly not included in this version of the tool
         ################ end of the mandatory questions #######################
@@ -569,8 +550,8 @@ class Consumption:
 
         Global Inputs:
         - country - string of a country name
-        - FUEL_PRICES_T.loc['Diesel_2020', country]
-        - FUEL_PRICES_T.loc['petrol_2020', country]
+        - "fuel_prices" table: .loc['Diesel_2020', country]
+        - "fuel_prices" table: .loc['petrol_2020', country]
         - ELECTRICITY_TYPES
 
         Outputs:
@@ -588,8 +569,8 @@ class Consumption:
             local_demand_kv[fuel] = local_demand_kv[fuel]*(1-scaler)
 
         # Step 2 Turn the amount missing into kWh
-        diesel /= FUEL_PRICES_T.loc['Diesel_2020', self.country]
-        petrol /= FUEL_PRICES_T.loc['petrol_2020', self.country]
+        diesel /= get_table("fuel_prices").loc['Diesel_2020', self.country]
+        petrol /= get_table("fuel_prices").loc['petrol_2020', self.country]
 
         diesel *= 38.6*0.278   # liters, then kWh
         petrol *= 34.2*0.278   # liters, then kWh
@@ -748,7 +729,7 @@ class Consumption:
 
         # Set the emission intensity of this based on LCA values
         emission_intensities.loc[self.direct_ab:self.indirect_ab, ELECTRICITY_NEC] = \
-            EMISSION_COUNTRIES_LCA_T.loc[self.direct_ab:self.indirect_ab, elec_type]
+            get_table("emission_countries_lca").loc[self.direct_ab:self.indirect_ab, elec_type]
 
 
     def local_heating(self, local_demand_kv, emission_intensities, district_prop, elec_heat_prop,
@@ -936,10 +917,10 @@ class Consumption:
             or ev_takeup or modal_shift)
 
         # Scale factor applied to income - unique value for each decade
-        income_scaling = INCOME_PROJ_T.loc[self.country]
+        income_scaling = get_table("income_proj").loc[self.country]
 
         # Scale factor applied to household size - unique value for each decade
-        house_scaling = HOUSE_SIZE_PROJ_T.loc[self.country]
+        house_scaling = get_table("house_size_proj").loc[self.country]
 
 #        if s_heating: always compute defaults to show in ui and return
         demand_kv = self.demand_kv
@@ -998,16 +979,20 @@ class Consumption:
         self.district_value = district_value
 
 
+        iw_sectors = get_table("iw_sectors")
+        iw_sectors_np_tr = np.transpose(iw_sectors.to_numpy())
+        products = get_table("emission_countries").columns
+
         # prepare empty dataframes
         # these are for the graphs
         df_main = pd.DataFrame(np.zeros((30, 8)), index=list(range(2020, 2050)),
-                        columns=IW_SECTORS_T.columns)  # Holds final data in sectors 7 (+ sum)
+                        columns=iw_sectors.columns)  # Holds final data in sectors 7 (+ sum)
 
         df_tot = pd.DataFrame(np.zeros((30, 200)), index=list(range(2020, 2050)),
-                             columns=PRODUCT_COUNT)  # holds final data in products (200)
+                             columns=products)  # holds final data in products (200)
 
         df_area = pd.DataFrame(np.zeros((30, 8)), index=list(range(2020, 2050)),
-                            columns=IW_SECTORS_T.columns)  # Holds area emissions
+                            columns=iw_sectors.columns)  # Holds area emissions
                                                         # (multiplies by pop_size)
 
         pop_size = self.pop_size # make this default
@@ -1103,7 +1088,7 @@ class Consumption:
                 gwp_ab = pd.DataFrame(local_emission_intensities.to_numpy().dot(
                 np.diag(local_demand_kv.to_numpy())))  # This is the basic calculation
                 gwp_ab.index = ['direct', 'indirect']
-                gwp_ab.columns = PRODUCT_COUNT
+                gwp_ab.columns = products
                 # This adds in the household heating fuel use
                 use_phase_ab_gwp = local_demand_kv * local_use_phase_ab
                 # This adds in the burning of fuel for cars
@@ -1122,9 +1107,9 @@ class Consumption:
                 gwp_ab_pc = gwp_ab / house_size
 
                 # Put the results into sectors
-                df_main.loc[year_it] = IW_SECTORS_NP_TR_T.dot(gwp_ab_pc.sum().to_numpy())
+                df_main.loc[year_it] = iw_sectors_np_tr.dot(gwp_ab_pc.sum().to_numpy())
                 df_tot.loc[year_it] = gwp_ab_pc.sum()
-                df_area.loc[year_it] = IW_SECTORS_NP_TR_T.dot(
+                df_area.loc[year_it] = iw_sectors_np_tr.dot(
                 gwp_ab_pc.sum().to_numpy()) * pop_size
 
         df_main['Total_Emissions'] = df_main.sum(axis=1)
@@ -1193,7 +1178,7 @@ class Consumption:
             _, axis = plt.subplots(1, figsize=(15, 10))
 
             labels = ['HE', 'HO', 'TF', 'TO', 'AT', 'F', 'TG', 'S']
-            sectors = list(IW_SECTORS_T.columns)
+            sectors = list(get_table("iw_sectors").columns)
 
             bottom = len(df_main) * [0]
             for sector in sectors:
@@ -1339,7 +1324,7 @@ class Consumption:
                     # Make the graph
                     dataframe = policy_summed.copy()
 
-                    sectors = list(IW_SECTORS_T.columns)
+                    sectors = list(get_table("iw_sectors").columns)
 
                     #bottom = len(DF) * [0]
                     # for idx, name in enumerate(sectors):
@@ -1536,7 +1521,7 @@ def route_consumption():
     # baseline computation
     baseline_main, baseline_total_area_emissions = calculation.emission_calculation()
 
-    sectors = list(IW_SECTORS_T.columns)
+    sectors = list(get_table("iw_sectors").columns)
 
     def dict_zeros_skipper(dataframe):
         """
@@ -1675,19 +1660,13 @@ def route_datasets():
     return the names of vectors of local datasets
     """
     datasets = [] 
-    for key in  Y_VECTORS_LOCAL.keys():
+    for key in list_demand_vectors():
         datasets.append(key)
 
     """
     custom code for loading local dataset file names
     """
-    FULL_CSV_PATH_LOCAL = os.path.join("CSVfiles", "local_datasets", "")
-    for file in glob.glob(FULL_CSV_PATH_LOCAL + "*.csv"):
-        file_name = os.path.splitext(os.path.basename(file))[0]
-        file_name = file_name.replace("-", ": ")
-        file_name = file_name.replace("__", ":")
-        file_name = file_name.replace("_", ".")
-        datasets.append(file_name)
+    datasets.extend(list_local_datasets())
 
     return {
         "status": "success",
@@ -1,20 +1,9 @@
 from flask import Blueprint
-import pandas as pd
 
+from ggia_app.dataset_registry import get_table, TRANSPORT_DATASET
 #from ggia_app.models import Country
 
 
-# extract countries from transport datasets
-transport_matrix = pd.read_csv('CSVfiles/Transport_full_dataset.csv',
-      skiprows=7)  # Skipping first 7 lines to ensure headers are correct
-COUNTRIES = []
-for country in transport_matrix["country"]:
-    if "dataset" in country.lower():
-        break
-    COUNTRIES.append(country)
-COUNTRIES.sort()
-
-
 blue_print = Blueprint("countries", __name__, url_prefix="/api/v1/countries")
 
 @blue_print.route("", methods=["GET"])
@@ -29,7 +18,7 @@ def get_countries():
     #         data_sets.append(country.dataset_name)
     # countries.sort()
     # data_sets.sort()
-    countries = COUNTRIES
+    countries = extract_countries()
     data_sets = []  # TODO: enable again at one point
 
     return {
@@ -38,3 +27,14 @@ def get_countries():
             "countries": countries + data_sets
         }
     }
+
+
+def extract_countries():
+    # extract countries from transport datasets
+    countries = []
+    for country in get_table(TRANSPORT_DATASET)["country"]:
+        if "dataset" in country.lower():
+            break
+        countries.append(country)
+    countries.sort()
+    return countries
@@ -0,0 +1,398 @@
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ggia_app.startup import read_config
+
+
+# Process-wide registry of the reference tables stored under CSVfiles/.
+# Every table is parsed once per process and handed out as a shared
+# DataFrame. A table is only parsed again when the mtime of its file
+# changes *and* the content hash differs from the cached copy.
+# Shared tables must be treated as read-only: callers that need to
+# modify a table must take a .copy() first.
+#
+# To speed up cold starts, write_snapshots() stores every parsed table as a
+# pickle keyed by the hash of its source file. A table is loaded from its
+# snapshot when one exists for the current file content and parsed from CSV
+# otherwise, so a stale snapshot is simply ignored.
+#
+# The numeric blocks of a table, and the float64 matrix its CountryRecords
+# are views of, are stored next to its pickle in a separate buffer file
+# (pickle protocol 5 out-of-band buffers). With "share_datasets" set in
+# config.json, buffer files are memory-mapped instead of read, so all worker
+# processes on a host share one copy of the numeric data through the page
+# cache, whether or not the tables were loaded before the workers forked.
+# The mapping is copy-on-write: a page is only duplicated for a worker if it
+# is modified.
+
+CSV_ROOT = "CSVfiles"
+SNAPSHOT_ROOT = os.path.join(CSV_ROOT, "snapshots")
+SNAPSHOT_BUFFER_ALIGNMENT = 64
+SNAPSHOT_FORMAT = 2  # part of the snapshot file names, snapshots of other formats are ignored
+
+TRANSPORT_DATASET = "transport"
+LAND_USE_DATASET = "land_use"
+BUILDINGS_DATASET = "buildings"
+LOCAL_DATASET_FORMAT = "local_dataset_format"
+
+# Separator used by the frontend to combine a country with a local dataset,
+# e.g. "Estonia & Tallinn: 11.11.2022@12:00"
+COUNTRY_CODE_SEPARATOR = " & "
+
+# name: (path relative to CSV_ROOT, pd.read_csv keyword arguments, replace NaNs with 0)
+DATASET_FILES = {
+    # Skipping first 7 lines to ensure headers are correct
+    TRANSPORT_DATASET: ("Transport_full_dataset.csv", {"skiprows": 7}, True),
+    LAND_USE_DATASET: ("Land_use_full_dataset.csv", {"skiprows": 7}, True),
+    BUILDINGS_DATASET: ("buildings_full_dataset.csv", {}, True),
+    LOCAL_DATASET_FORMAT: ("local_dataset_format.csv", {}, False),
+
+    # Consumption tables
+    "house_size_proj": ("consumption/House_proj_exio.csv", {"index_col": 0}, False),
+    "income_proj": ("consumption/Income_proj_exio.csv", {"index_col": 0}, False),
+    "y_vector_average": (
+        "consumption/Average_2020_Exio_elec_trans_en_Euro.csv", {"index_col": 0}, False),
+    "y_vector_city": ("consumption/City_2020_Exio_elec_trans_en_Euro.csv", {"index_col": 0}, False),
+    "y_vector_rural": (
+        "consumption/Rural_2020_Exio_elec_trans_en_Euro.csv", {"index_col": 0}, False),
+    "y_vector_town": ("consumption/Town_2020_Exio_elec_trans_en_Euro.csv", {"index_col": 0}, False),
+    "use_phase": ("consumption/Energy_use_phase_Euro.csv", {"index_col": 0}, False),
+    "tail_pipe": ("consumption/Tailpipe_emissions_bp.csv", {"index_col": 0}, False),
+    "house_size": ("consumption/Household_characteristics_2015.csv", {"index_col": 0}, False),
+    "emission_countries": (
+        "consumption/Country_Emissions_intensities.csv", {"index_col": 0}, False),
+    "emission_countries_lca": (
+        "consumption/Country_Emissions_intensities_LCA.csv", {"index_col": 0}, False),
+    "exio_products": ("consumption/Exio_products.csv", {}, False),
+    "iw_sectors": ("consumption/IW_sectors_reduced.csv", {"index_col": 0}, False),
+    "adjustable_amounts": ("consumption/Adjustable_energy_amounts.csv", {"index_col": 0}, False),
+    "electricity_prices": ("consumption/electricity_prices_2019.csv", {"index_col": 0}, False),
+    "fuel_prices": ("consumption/Fuel_prices_BP_attempt.csv", {"index_col": 0}, False),
+    "income_scaling": ("consumption/mean_expenditure_by_quint.csv", {"index_col": 0}, False),
+}
+
+
+SHARE_DATASETS = bool(read_config("share_datasets", False))
+
+_TABLES = {}  # name -> _CachedTable
+_LOCK = threading.Lock()
+_LOAD_TIMES = {}  # name -> (source, seconds) of the last (re)load
+
+
+class CountryRecord:
+    """
+    Parameters of one country (or local dataset) compiled from its row.
+    Numeric columns are kept in a flat float64 array and text columns
+    (city names, menu labels) as they are. Values are read either as
+    attributes (record.BUS_COL26) or items (record["BUS_COL26"]).
+
+    Data derived only from these parameters (e.g. emission factor
+    trajectories) can be cached on the record with get_derived(). A record
+    is replaced whenever its dataset changes, which drops the derived data too.
+    """
+    __slots__ = ("values", "offsets", "text", "derived")
+
+    def __init__(self, values, offsets, text):
+        self.values = values
+        self.offsets = offsets  # column name -> position in values
+        self.text = text  # column name -> value of non-numeric columns
+        self.derived = {}
+
+    def get_derived(self, key, build):
+        """
+        Returns build(record), which is only computed the first time key is requested.
+        Callers must not modify the returned value.
+        """
+        value = self.derived.get(key)
+        if value is None:
+            value = build(self)
+            self.derived[key] = value
+        return value
+
+    def __getitem__(self, column):
+        offset = self.offsets.get(column)
+        if offset is not None:
+            return self.values[offset]
+        return self.text[column]
+
+    def __getattr__(self, column):
+        if column in CountryRecord.__slots__:
+            raise AttributeError(column)
+        try:
+            return self[column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def __contains__(self, column):
+        return column in self.offsets or column in self.text
+
+
+class _CachedTable:
+    __slots__ = (
+        "mtime", "digest", "table", "country_index", "offsets", "values", "records"
+    )
+
+    def __init__(self, mtime, digest, table, values=None):
+        self.mtime = mtime
+        self.digest = digest
+        self.table = table
+        self.country_index = _build_country_index(table)
+
+        # Numeric part of country tables as one float64 matrix, shared by all
+        # records. Tables loaded from a snapshot come with their matrix.
+        self.offsets, positions = _numeric_layout(table) if self.country_index else ({}, [])
+        if values is None:
+            values = table.iloc[:, positions].to_numpy(dtype=np.float64)
+        self.values = values
+        self.records = {}  # row position -> CountryRecord, compiled on first use
+
+
+def dataset_path(name):
+    return os.path.join(CSV_ROOT, DATASET_FILES[name][0])
+
+
+def snapshot_path(name, digest):
+    # Pickles are not portable across pandas versions, so the version is part of the key
+    return os.path.join(
+        SNAPSHOT_ROOT, f"{name}-{digest}-v{SNAPSHOT_FORMAT}-pandas{pd.__version__}.pkl"
+    )
+
+
+def _snapshot_buffer_path(path):
+    return os.path.splitext(path)[0] + ".buf"
+
+
+def get_table(name):
+    """
+    Returns the parsed (and cleaned) table registered under name.
+    The returned DataFrame is shared between all callers and must not be modified.
+    """
+    return _get_cached(name).table
+
+
+def _get_cached(name):
+    path = dataset_path(name)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _TABLES.get(name)
+    if cached is not None and cached.mtime == mtime:
+        return cached
+
+    with _LOCK:
+        cached = _TABLES.get(name)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+
+        with open(path, "rb") as csv_file:
+            content = csv_file.read()
+        digest = hashlib.sha1(content).hexdigest()
+
+        if cached is not None and cached.digest == digest:
+            # File was touched but its content did not change
+            cached.mtime = mtime
+            return cached
+
+        start = time.perf_counter()
+        snapshot = _load_snapshot(name, digest)
+        if snapshot is not None:
+            (table, values), source = snapshot, "snapshot"
+        else:
+            table, values, source = _parse_table(name, content), None, "csv"
+
+        cached = _CachedTable(mtime, digest, table, values)
+        _TABLES[name] = cached
+        _LOAD_TIMES[name] = (source, time.perf_counter() - start)
+
+    return cached
+
+
+def get_country_index(name):
+    """
+    Returns a dict mapping every country of a table to its row position.
+    """
+    return _get_cached(name).country_index
+
+
+def get_country_data(name, country):
+    """
+    Returns the row of country as a one-row DataFrame (a slice of the shared
+    table, not a copy), or an empty DataFrame if the country is unknown.
+    """
+    cached = _get_cached(name)
+
+    row = cached.country_index.get(country)
+    if row is None:
+        return cached.table.iloc[0:0]
+
+    return cached.table.iloc[row:row + 1]
+
+
+def list_countries(name):
+    """
+    Returns all countries of a table, in table order.
+    """
+    return list(_get_cached(name).country_index.keys())
+
+
+def get_country_record(name, country):
+    """
+    Returns the compiled CountryRecord of country, or None if the
+    country is unknown.
+    """
+    cached = _get_cached(name)
+
+    row = cached.country_index.get(country)
+    if row is None:
+        return None
+
+    record = cached.records.get(row)
+    if record is None:
+        text = {}
+        for position, column in enumerate(cached.table.columns):
+            if column not in cached.offsets and column not in text:
+                text[column] = cached.table.iat[row, position]
+        record = CountryRecord(cached.values[row], cached.offsets, text)
+        cached.records[row] = record
+
+    return record
+
+
+def get_version(name):
+    """
+    Returns the content hash of the currently loaded version of a table.
+    """
+    return _get_cached(name).digest
+
+
+def load_all():
+    """
+    Parses every registered table, e.g. to warm up a worker before serving requests.
+    """
+    for name in DATASET_FILES.keys():
+        get_table(name)
+
+
+def get_load_report():
+    """
+    Returns {name: (source, seconds)} describing how each loaded table was
+    last read, where source is either "snapshot" or "csv".
+    """
+    return dict(_LOAD_TIMES)
+
+
+def write_snapshots():
+    """
+    Writes a snapshot of every registered table and removes outdated ones.
+    Returns the list of written snapshot paths.
+    """
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+
+    written = []
+    for name in DATASET_FILES.keys():
+        cached = _get_cached(name)
+        path = snapshot_path(name, cached.digest)
+        _write_snapshot(cached, path)
+        written.append(path)
+
+    written_files = set(written) | {_snapshot_buffer_path(path) for path in written}
+    for file_name in os.listdir(SNAPSHOT_ROOT):
+        path = os.path.join(SNAPSHOT_ROOT, file_name)
+        if file_name.endswith((".pkl", ".buf")) and path not in written_files:
+            os.remove(path)
+
+    return written
+
+
+def _write_snapshot(cached, path):
+    buffers = []
+    frame = pickle.dumps(
+        (cached.table, cached.values), protocol=5, buffer_callback=buffers.append
+    )
+
+    # Numeric blocks go to the buffer file, aligned so they can be used in place
+    buffer_layout = []  # (offset, length) of each out-of-band buffer
+    buffer_path = _snapshot_buffer_path(path)
+    with open(buffer_path + ".tmp", "wb") as buffer_file:
+        for buffer in buffers:
+            raw = buffer.raw()
+            buffer_file.write(b"\0" * (-buffer_file.tell() % SNAPSHOT_BUFFER_ALIGNMENT))
+            buffer_layout.append((buffer_file.tell(), raw.nbytes))
+            buffer_file.write(raw)
+
+    with open(path + ".tmp", "wb") as snapshot_file:
+        pickle.dump((buffer_layout, frame), snapshot_file, protocol=5)
+
+    # Replace the buffer file first, a pickle is never read with a partial buffer file
+    os.replace(buffer_path + ".tmp", buffer_path)
+    os.replace(path + ".tmp", path)
+
+
+def _load_snapshot(name, digest):
+    # Returns (table, values) of the snapshot of a file content, or None
+    path = snapshot_path(name, digest)
+    buffer_path = _snapshot_buffer_path(path)
+    if not os.path.isfile(path) or not os.path.isfile(buffer_path):
+        return None
+
+    try:
+        with open(path, "rb") as snapshot_file:
+            buffer_layout, frame = pickle.load(snapshot_file)
+
+        buffers = []
+        if buffer_layout:
+            with open(buffer_path, "rb") as buffer_file:
+                # Empty files (tables without numeric data) cannot be mapped
+                if SHARE_DATASETS and os.fstat(buffer_file.fileno()).st_size:
+                    data = mmap.mmap(buffer_file.fileno(), 0, access=mmap.ACCESS_COPY)
+                else:
+                    data = bytearray(buffer_file.read())
+            data = memoryview(data)
+            buffers = [data[offset:offset + length] for offset, length in buffer_layout]
+
+        return pickle.loads(frame, buffers=buffers)
+    except Exception:
+        # Unreadable snapshot, e.g. written by another pandas version: use the CSV instead
+        return None
+
+
+def _parse_table(name, content):
+    _, read_csv_kwargs, fill_na = DATASET_FILES[name]
+
+    table = pd.read_csv(io.BytesIO(content), **read_csv_kwargs)
+    if fill_na:
+        table.fillna(0, inplace=True)
+
+    return table
+
+
+def _numeric_layout(table):
+    # Maps every numeric column to its offset in the flat values array.
+    # Returns the positions of those columns in the table as well.
+    offsets = {}
+    positions = []
+    for position, (column, dtype) in enumerate(table.dtypes.items()):
+        if dtype.kind in "fiu" and column not in offsets:
+            offsets[column] = len(positions)
+            positions.append(position)
+
+    return offsets, positions
+
+
+def _build_country_index(table):
+    if "country" not in table.columns:
+        return {}
+
+    country_index = {}
+    for row, country in enumerate(table["country"]):
+        # Keep the first row, as a lookup by mask followed by [0] would
+        country_index.setdefault(country, row)
+
+    return country_index
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from ggia_app.dataset_registry import get_table, CSV_ROOT
+
+
+# Store of the local demand vectors (Y vectors) saved under
+# CSVfiles/consumption/datasets. New and changed files are discovered while
+# the app is running: the directory is listed again whenever its mtime
+# changes, and only files that were not seen before (or changed since) are
+# read and validated against the index of the average Y vector.
+# Parsed vectors are kept in a size-bounded LRU cache.
+
+DEMAND_VECTORS_PATH = os.path.join(CSV_ROOT, "consumption", "datasets")
+MAX_CACHED_VECTORS = 32
+
+# Some file systems only store mtimes with a resolution of a second, so the
+# directory is listed again as long as its last change is this recent
+_MTIME_RESOLUTION_NS = 2 * 10 ** 9
+
+_FILES = {}  # file path -> _DemandVectorFile
+_INDEX = {}  # dataset name -> file path, in directory order
+_INDEX_MTIME = None
+_VECTORS = OrderedDict()  # dataset name -> (mtime, pd.Series), least recently used first
+_LOCK = threading.Lock()
+
+
+class _DemandVectorFile:
+    __slots__ = ("mtime", "name")
+
+    def __init__(self, mtime, name):
+        self.mtime = mtime
+        self.name = name  # None if the file is not a valid demand vector
+
+
+def list_demand_vectors():
+    """
+    Returns the names of all valid local demand vectors.
+    """
+    return list(_get_index().keys())
+
+
+def get_demand_vector(name):
+    """
+    Returns a copy of the demand vector called name as a pd.Series,
+    or None if there is no such vector.
+    """
+    path = _get_index().get(name)
+    if path is None:
+        return None
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    demand_vector_file = _FILES.get(path)
+    if demand_vector_file is None or demand_vector_file.mtime != mtime:
+        # The file was rewritten in place, so it has to be validated again
+        _invalidate_index()
+        if _get_index().get(name) != path:
+            return None
+
+    with _LOCK:
+        cached = _VECTORS.get(name)
+        if cached is not None and cached[0] == mtime:
+            _VECTORS.move_to_end(name)
+            return cached[1].copy()
+
+    try:
+        vector = _read_demand_vector(path)
+    except (FileNotFoundError, IndexError, KeyError, pd.errors.ParserError):
+        return None
+
+    with _LOCK:
+        _VECTORS[name] = (mtime, vector)
+        _VECTORS.move_to_end(name)
+        while len(_VECTORS) > MAX_CACHED_VECTORS:
+            _VECTORS.popitem(last=False)
+
+    return vector.copy()
+
+
+def _get_index():
+    global _INDEX, _INDEX_MTIME
+
+    try:
+        mtime = os.stat(DEMAND_VECTORS_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    if mtime == _INDEX_MTIME and time.time_ns() - mtime > _MTIME_RESOLUTION_NS:
+        return _INDEX
+
+    with _LOCK:
+        files = {}
+        with os.scandir(DEMAND_VECTORS_PATH) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".csv") or not entry.is_file():
+                    continue
+
+                file_mtime = entry.stat().st_mtime_ns
+                known_file = _FILES.get(entry.path)
+                if known_file is not None and known_file.mtime == file_mtime:
+                    files[entry.path] = known_file
+                else:
+                    files[entry.path] = _DemandVectorFile(file_mtime, _validate(entry.path))
+
+        _FILES.clear()
+        _FILES.update(files)
+        _INDEX = {
+            demand_vector_file.name: path
+            for path, demand_vector_file in files.items() if demand_vector_file.name is not None
+        }
+        _INDEX_MTIME = mtime
+
+        # Forget cached vectors whose file was removed
+        for name in list(_VECTORS.keys()):
+            if name not in _INDEX:
+                del _VECTORS[name]
+
+    return _INDEX
+
+
+def _invalidate_index():
+    # Lists the directory again on the next _get_index()
+    global _INDEX_MTIME
+
+    with _LOCK:
+        _INDEX_MTIME = None
+
+
+def _validate(path):
+    # Returns the dataset name of a valid demand vector file, otherwise None
+    try:
+        local_table = pd.read_csv(path, index_col=0)
+        if get_table("y_vector_average").index.equals(local_table.index):  # small format check
+            return os.path.basename(path).split("_")[0] + ": " + local_table.columns[0]
+    except (FileNotFoundError, IndexError, KeyError, pd.errors.ParserError):
+        pass
+
+    return None
+
+
+def _read_demand_vector(path):
+    local_table = pd.read_csv(path, index_col=0)
+    return local_table[local_table.columns[0]].copy()
@@ -1,8 +1,5 @@
-import pandas as pd
 import datetime
 import math
-import glob
-import os
 
 from flask import Blueprint
 from flask import request
@@ -10,6 +7,8 @@ from marshmallow import ValidationError
 from ggia_app.transport_schemas import *
 from ggia_app.models import *
 from ggia_app.env import *
+from ggia_app.dataset_registry import get_country_data, TRANSPORT_DATASET, LAND_USE_DATASET
+from ggia_app.local_datasets import check_local_data
 import humps
 from marshmallow.validate import Range
 
@@ -125,37 +124,6 @@ class LandUseChange(Schema):
     policy_start_year = fields.Dict(required=True, keys=fields.Str(), values=fields.Integer())
 
 
-# CHECK & LOAD LOCAL DATASET ########################################
-
-def check_local_data(country):
-    country_data = pd.DataFrame()
-
-    FULL_CSV_PATH_LOCAL = os.path.join("CSVfiles", "local_datasets", "")
-    for file in glob.glob(FULL_CSV_PATH_LOCAL + "*.csv"):
-        file_name = os.path.splitext(os.path.basename(file))[0]
-        file_name = file_name.replace("-", ": ")
-        file_name = file_name.replace("__", ":")
-        file_name = file_name.replace("_", ".")
-
-        if country == file_name:
-            df = pd.read_csv(file)
-            sub_df = df[["VariableAcronym", "Value"]].T
-            sub_df.columns = sub_df.iloc[0]
-            sub_df = sub_df.drop(["VariableAcronym"])
-
-            # Change data types to correct type          
-            local_dataset_format = pd.read_csv("CSVfiles/local_dataset_format.csv")
-            for i in range(len(local_dataset_format)):
-                if local_dataset_format["VariableType"][i] == "Float":
-                    sub_df[local_dataset_format["VariableAcronym"][i]] = sub_df[local_dataset_format["VariableAcronym"][i]].astype(float)
-
-            sub_df.fillna(0, inplace=True)
-
-            country_data = sub_df
-    
-    return country_data
-
-
 # CALCULATE BASE DATA ########################################
 
 def calculate_population(country, start_year, start_population):
@@ -173,12 +141,7 @@ def calculate_population(country, start_year, start_population):
     if country_data.empty:
         if country_code_separator in country_ORG:
             country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Transport_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
-
-        country_data = df.loc[df["country"] == country]
+        country_data = get_country_data(TRANSPORT_DATASET, country)
 
     # Check if country data is still empty after checking local
     if country_data.empty:
@@ -230,12 +193,7 @@ def calculate_land_use_baseline(country, start_year, year_range, land_use_catego
     if country_data.empty:
         if country_code_separator in country_ORG:
             country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Land_use_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
-
-        country_data = df.loc[df["country"] == country]
+        country_data = get_country_data(LAND_USE_DATASET, country)
 
     # Check if country data is still empty after checking local
     if country_data.empty:
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ggia_app.dataset_registry import (
+    get_table, get_version, CountryRecord, CSV_ROOT, LOCAL_DATASET_FORMAT
+)
+
+
+# Store of the local datasets saved under CSVfiles/local_datasets.
+# The directory listing is kept as a dataset name -> file path index, which
+# is rebuilt only when the mtime of the directory changes (i.e. when a
+# dataset is added, removed or renamed). Parsed datasets are cached per name
+# and parsed again when the mtime of their file changes.
+# Parsed datasets are shared between requests and must not be modified.
+
+LOCAL_DATASETS_PATH = os.path.join(CSV_ROOT, "local_datasets")
+
+# Some file systems only store mtimes with a resolution of a second, so the
+# directory is listed again as long as its last change is this recent
+_MTIME_RESOLUTION_NS = 2 * 10 ** 9
+
+_INDEX = {}  # dataset name -> file path
+_INDEX_MTIME = None
+_DATASETS = {}  # dataset name -> _LocalDataset
+_FORMAT = None  # LocalDatasetFormat of the loaded local_dataset_format.csv
+_LOCK = threading.Lock()
+
+
+class LocalDatasetFormat:
+    """
+    Compiled local_dataset_format.csv, i.e. the variables a local dataset
+    consists of. Variables are listed in file order by name and acronym,
+    with their type ("Float" or "String") and default value.
+    """
+    __slots__ = (
+        "version", "names", "acronyms", "types", "defaults",
+        "acronym_by_name", "name_by_acronym", "float_acronyms"
+    )
+
+    def __init__(self, version, table):
+        self.version = version
+        self.names = table["VariableName"].tolist()
+        self.acronyms = table["VariableAcronym"].tolist()
+        self.types = table["VariableType"].tolist()
+        self.defaults = ["" if var_type == "String" else 0.0 for var_type in self.types]
+
+        self.acronym_by_name = dict(zip(self.names, self.acronyms))
+        self.name_by_acronym = dict(zip(self.acronyms, self.names))
+        self.float_acronyms = frozenset(
+            acronym for acronym, var_type in zip(self.acronyms, self.types) if var_type == "Float"
+        )
+
+
+class _LocalDataset:
+    __slots__ = ("path", "mtime", "record", "data")
+
+    def __init__(self, path, mtime, record):
+        self.path = path
+        self.mtime = mtime
+        self.record = record
+        self.data = None  # DataFrame, built on first use
+
+
+def get_local_dataset_format():
+    """
+    Returns the LocalDatasetFormat of the current local_dataset_format.csv.
+    """
+    global _FORMAT
+
+    version = get_version(LOCAL_DATASET_FORMAT)
+    if _FORMAT is None or _FORMAT.version != version:
+        _FORMAT = LocalDatasetFormat(version, get_table(LOCAL_DATASET_FORMAT))
+
+    return _FORMAT
+
+
+def dataset_name(file_name):
+    """
+    Converts the file name of a local dataset to its name,
+    e.g. "Tallinn-11_11_2022@12__00.csv" to "Tallinn: 11.11.2022@12:00".
+    """
+    name = os.path.splitext(os.path.basename(file_name))[0]
+    name = name.replace("-", ": ")
+    name = name.replace("__", ":")
+    name = name.replace("_", ".")
+    return name
+
+
+def list_local_datasets():
+    """
+    Returns the names of all saved local datasets.
+    """
+    return list(_get_index().keys())
+
+
+def check_local_data(name):
+    """
+    Returns the local dataset called name as a one-row DataFrame
+    (VariableAcronym as columns), or an empty DataFrame if there is none.
+    """
+    local_dataset = _get_local_dataset(name)
+    if local_dataset is None:
+        return pd.DataFrame()
+
+    if local_dataset.data is None:
+        record = local_dataset.record
+        float_data = pd.DataFrame(
+            record.values[np.newaxis, :], columns=list(record.offsets.keys()), index=["Value"]
+        )
+        text_data = pd.DataFrame(
+            [list(record.text.values())], columns=list(record.text.keys()), index=["Value"]
+        )
+        local_dataset.data = pd.concat([float_data, text_data], axis=1)
+
+    return local_dataset.data
+
+
+def get_local_record(name):
+    """
+    Returns the local dataset called name compiled into a CountryRecord,
+    or None if there is none.
+    """
+    local_dataset = _get_local_dataset(name)
+    if local_dataset is None:
+        return None
+
+    return local_dataset.record
+
+
+def get_local_version(name):
+    """
+    Returns a version of the local dataset called name that changes whenever
+    its file changes, or None if there is no such dataset.
+    """
+    local_dataset = _get_local_dataset(name)
+    if local_dataset is None:
+        return None
+
+    return local_dataset.mtime
+
+
+def _get_index():
+    global _INDEX, _INDEX_MTIME
+
+    try:
+        mtime = os.stat(LOCAL_DATASETS_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    if mtime == _INDEX_MTIME and time.time_ns() - mtime > _MTIME_RESOLUTION_NS:
+        return _INDEX
+
+    with _LOCK:
+        index = {}
+        with os.scandir(LOCAL_DATASETS_PATH) as entries:
+            for entry in entries:
+                if entry.name.endswith(".csv") and entry.is_file():
+                    index[dataset_name(entry.name)] = entry.path
+
+        # Forget parsed datasets whose file was removed
+        for name in list(_DATASETS.keys()):
+            if name not in index:
+                del _DATASETS[name]
+
+        _INDEX = index
+        _INDEX_MTIME = mtime
+
+    return index
+
+
+def _get_local_dataset(name):
+    path = _get_index().get(name)
+    if path is None:
+        return None
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    local_dataset = _DATASETS.get(name)
+    if local_dataset is None or local_dataset.path != path or local_dataset.mtime != mtime:
+        local_dataset = _LocalDataset(path, mtime, _parse_local_dataset(path))
+        _DATASETS[name] = local_dataset
+
+    return local_dataset
+
+
+def _parse_local_dataset(path):
+    df = pd.read_csv(path)
+    acronyms = df["VariableAcronym"].to_numpy(dtype=object)
+    values = df["Value"].to_numpy(dtype=object)
+
+    # Convert all Float variables at once, missing values become 0
+    float_acronyms = get_local_dataset_format().float_acronyms
+    is_float = np.fromiter(
+        (acronym in float_acronyms for acronym in acronyms), dtype=bool, count=len(acronyms)
+    )
+    float_values = values[is_float].astype(np.float64)
+    float_values[np.isnan(float_values)] = 0
+
+    text_values = values[~is_float]
+    text_values[pd.isna(text_values)] = 0
+
+    offsets = {acronym: offset for offset, acronym in enumerate(acronyms[is_float])}
+    text = dict(zip(acronyms[~is_float], text_values))
+    return CountryRecord(float_values, offsets, text)
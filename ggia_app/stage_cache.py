@@ -0,0 +1,59 @@
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+# Size-bounded LRU cache of intermediate calculation results ("stages"),
+# shared by all requests of a process. The frontend sends the same
+# sub-payload to several endpoints in one session (e.g. the transport
+# baseline to /baseline, /new-development and /transport), so a stage
+# computed for one endpoint is reused by the next.
+#
+# A key is a hash of the stage name, its sub-payload and the versions of the
+# datasets it was computed from, so results of replaced datasets are never
+# returned. Values are deep-copied in both directions: callers may modify
+# what they put in or get out.
+
+MAX_CACHED_STAGES = 256
+
+_STAGES = OrderedDict()  # key -> value, least recently used first
+_LOCK = threading.Lock()
+
+
+def stage_key(stage, payload, versions):
+    """
+    Returns the cache key of stage computed from payload (any JSON data)
+    with the datasets of the given versions.
+    """
+    canonical = json.dumps(
+        [stage, payload, versions], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def get_stage(key):
+    """
+    Returns a copy of the value cached under key, or None.
+    """
+    with _LOCK:
+        value = _STAGES.get(key)
+        if value is None:
+            return None
+        _STAGES.move_to_end(key)
+
+    return copy.deepcopy(value)
+
+
+def put_stage(key, value):
+    """
+    Caches a copy of value under key, evicting the least recently used values.
+    """
+    value = copy.deepcopy(value)
+
+    with _LOCK:
+        _STAGES[key] = value
+        _STAGES.move_to_end(key)
+        while len(_STAGES) > MAX_CACHED_STAGES:
+            _STAGES.popitem(last=False)
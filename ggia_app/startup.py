@@ -0,0 +1,54 @@
+import importlib
+import json
+import time
+
+
+# Startup bookkeeping. Kept free of pandas and of the other ggia_app modules,
+# so that it can time their imports.
+#
+# "startup_mode" in config.json selects when the reference datasets are loaded:
+# - "eager" (default): create_app loads them and precomputes the per-country data
+# - "background": create_app returns right away and a thread does the same
+#   warmup. Do not combine with gunicorn --preload: workers forked while the
+#   thread is running would not have the data.
+# - "lazy": nothing is loaded up front, every dataset is loaded by the first
+#   request that uses it
+#
+# "startup_budget" is the time (in seconds) allowed for imports and create_app,
+# checked by "flask ggia startup-report".
+
+STARTUP_MODES = ("eager", "background", "lazy")
+
+IMPORT_TIMES = {}  # module name -> seconds spent importing it (incl. not yet imported dependencies)
+STARTUP_TIMES = {}  # stage -> seconds, e.g. "create_app"
+
+
+def read_config(key, default):
+    """
+    Returns the value of key in config.json, or default if it is not set
+    (or the file cannot be read).
+    """
+    try:
+        with open("config.json") as config_file:
+            return json.load(config_file)[key]
+    except Exception:
+        return default
+
+
+STARTUP_MODE = read_config("startup_mode", "eager")
+if STARTUP_MODE not in STARTUP_MODES:
+    raise ValueError("Unknown startup_mode %r in config.json, expected one of %s" % (
+        STARTUP_MODE, ", ".join(STARTUP_MODES)))
+
+# Met by the eager mode, also without snapshots (see README.md)
+STARTUP_BUDGET = float(read_config("startup_budget", 1.5))
+
+
+def timed_import(name):
+    """
+    Imports the module name and records how long that took.
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
@@ -1,7 +1,6 @@
-import pandas as pd
+import itertools
+import numpy as np
 import math
-import glob
-import os
 
 from flask import Blueprint
 from flask import request
@@ -9,10 +8,67 @@ from marshmallow import ValidationError
 from ggia_app.transport_schemas import *
 from ggia_app.models import *
 from ggia_app.env import *
+from ggia_app.dataset_registry import (
+    get_country_record, get_version, COUNTRY_CODE_SEPARATOR, TRANSPORT_DATASET
+)
+from ggia_app.local_datasets import get_local_record, get_local_version
+from ggia_app.stage_cache import stage_key, get_stage, put_stage
+from ggia_app.year_trajectories import (
+    growth_percentages, growth_profile, to_year_dict, serialize_years, years_since,
+    YearAxis, YearFrame, YearSeries, YEARS
+)
 import humps
 
 blue_print = Blueprint("transport", __name__, url_prefix="/api/v1/calculate/transport")
 
+# Columns of the 2021 passenger-km (vehicle-km, tonne-km) per capita and the
+# occupancy rate of each transport mode. Freight has no occupancy rate.
+ACTIVITY_COLUMNS = {
+    "bus": ("BUS_COL1", "BUS_COL2"),
+    "car": ("CAR_COL1", "CAR_COL2"),
+    "metro": ("METRO_COL1", "METRO_COL2"),
+    "tram": ("TRAM_COL1", "TRAM_COL2"),
+    "train": ("TRAIN_COL1", "TRAIN_COL2"),
+    "rail_transport": ("RAIL_TRN_COL1", None),
+    "road_transport": ("ROAD_TRN_COL1", None),
+    "waterways_transport": ("WATER_TRN_COL1", None),
+}
+
+SETTLEMENT_TYPES = ("metropolitan_center", "urban", "suburban", "town", "rural")
+
+BUS_PROPULSION_TYPES = ("petrol", "lpg", "cng", "electricity", "diesel")
+CAR_PROPULSION_TYPES = (
+    "lpg", "cng", "ngv", "petrol", "p_e_hybrid", "p_e_phev", "electricity_p_e_phev",
+    "diesel", "d_e_hybrid", "d_e_phev", "electricity_d_e_phev", "hydrogen_fuel",
+    "bioethanol", "biodiesel", "bifuel", "other", "electricity_bev",
+)
+
+ROAD_TRANSPORT_PROPULSION_TYPES = (
+    "petrol_hybrid", "lpg", "diesel_hybrid", "ng", "electricity", "alternative",
+    "bioethonol", "biodiesel", "cng",
+)
+
+# Transport modes whose emission factors depend on the settlement distribution,
+# as they drive on roads and streets
+SETTLEMENT_WEIGHTED_MODES = ("bus", "car", "road_transport")
+
+# 5 year period (0 for 2021-2025 ... 5 for 2046-2050) of the years 2022-2050,
+# the share of electric buses moves towards the target of each period
+_BUS_ELECTRICITY_PERIODS = np.searchsorted([2025, 2030, 2035, 2040, 2045], YEARS[1:], side="left")
+
+# Columns of the annual change of the activity of each transport mode
+# in 2020-2030, 2030-2040 and 2040-2050
+ACTIVITY_GROWTH_COLUMNS = {
+    "bus": ("BUS_COL3", "BUS_COL4", "BUS_COL5"),
+    "car": ("CAR_COL4", "CAR_COL5", "CAR_COL6"),
+    "metro": ("METRO_COL4", "METRO_COL5", "METRO_COL6"),
+    "tram": ("TRAM_COL4", "TRAM_COL5", "TRAM_COL6"),
+    "train": ("TRAIN_COL6", "TRAIN_COL7", "TRAIN_COL8"),
+    "rail_transport": ("RAIL_TRN_COL5", "RAIL_TRN_COL6", "RAIL_TRN_COL7"),
+    "road_transport": ("ROAD_TRN_COL3", "ROAD_TRN_COL4", "ROAD_TRN_COL5"),
+    "waterways_transport": ("WATER_TRN_COL3", "WATER_TRN_COL4", "WATER_TRN_COL5"),
+}
+
 
 # ROUTES ########################################
 
@@ -60,25 +116,54 @@ def route_baseline():
 
     selected_year = baseline["year"]
 
-    _, baseline_response = calculate_baseline(baseline)
+    context, message = create_transport_context(baseline)
+
+    if context is None:
+        return {"status": "invalid", "message": message}
 
-    if baseline_response == "message":
-        return {"status": "invalid",
-        "message": "Country data not found."}
-    elif "message" in baseline_response:
-        return {"status": "invalid", "message": baseline_response["message"]}
+    _, baseline_response = calculate_baseline_stage(context, baseline)
 
     # Removing years prior to selected year - BASELINE
-    for ptype in baseline_response["projections"].keys():
-        for year in list(baseline_response["projections"][ptype]):
-            if year < selected_year:
-                baseline_response["projections"][ptype].pop(year, None)
-        if ptype != "population":
-            for year in list(baseline_response["absolute_projections"][ptype]):
-                if year < selected_year:
-                    baseline_response["absolute_projections"][ptype].pop(year, None)
+    baseline_response = years_since(baseline_response, selected_year)
+
+    return {"status": "success", "data": serialize_years({"baseline": baseline_response})}
+
+
+@blue_print.route("settlement-distribution", methods=["GET", "POST"])
+def route_settlement_distribution():
+    # Baseline emissions of a settlement distribution for interactive use:
+    # the first request of a baseline precomputes a settlement basis, the
+    # next ones with only another settlement distribution just evaluate it
+    request_body = humps.decamelize(request.json)
+    baseline_schema = Baseline()
+    baseline = request_body.get("baseline", -1)
+
+    try:
+        baseline_schema.load(baseline)
+    except ValidationError as err:
+        return {"status": "invalid", "message": err.messages}, 400
+
+    missing_types = [
+        settlement_type for settlement_type in SETTLEMENT_TYPES
+        if settlement_type not in baseline["settlement_distribution"]
+    ]
+    if missing_types:
+        return {
+            "status": "invalid",
+            "message": "Settlement distribution misses " + ", ".join(missing_types) + ".",
+        }
+
+    context, message = create_transport_context(baseline)
+
+    if context is None:
+        return {"status": "invalid", "message": message}
+
+    settlement_basis = calculate_settlement_basis_stage(context, baseline)
+    baseline_response = calculate_settlement_distribution_emissions(
+        context, baseline, settlement_basis
+    )
 
-    return {"status": "success", "data": {"baseline": baseline_response}}
+    return {"status": "success", "data": serialize_years({"baseline": baseline_response})}
 
 
 @blue_print.route("new-development", methods=["GET", "POST"])
@@ -98,13 +183,12 @@ def route_new_development():
 
     selected_year = baseline["year"]
 
-    baseline_v, baseline_response = calculate_baseline(baseline)
+    context, message = create_transport_context(baseline)
+
+    if context is None:
+        return {"status": "invalid", "message": message}
 
-    if baseline_response == "message":
-        return {"status": "invalid",
-        "message": "Country data not found."}
-    elif "message" in baseline_response:
-        return {"status": "invalid", "message": baseline_response["message"]}
+    baseline_v, baseline_response = calculate_baseline_stage(context, baseline)
 
     (
         _, _, modal_split_u2,
@@ -112,8 +196,8 @@ def route_new_development():
         car_propulsion_share,
         grid_electricity_emission_factor,
         new_development_response
-    ) = calculate_new_development(
-        baseline, baseline_response["projections"], baseline_v, new_development
+    ) = calculate_new_development_stage(
+        context, baseline, baseline_response["projections"], baseline_v, new_development
     )
 
     modal_split_percentage = calculate_modal_split_percentage(selected_year, modal_split_u2)
@@ -121,65 +205,24 @@ def route_new_development():
     # if "message" in new_development_response:
     #     return {"status": "invalid", "message": new_development_response["message"]}
 
-    # Removing years prior to selected year - BASELINE
-    for ptype in baseline_response["projections"].keys():
-        for year in list(baseline_response["projections"][ptype]):
-            if year < selected_year:
-                baseline_response["projections"][ptype].pop(year, None)
-
-        if ptype != "population":
-            for year in list(baseline_response["absolute_projections"][ptype]):
-                if year < selected_year:
-                    baseline_response["absolute_projections"][ptype].pop(year, None)
-
-    for year in list(new_development_response["impact"]["new_residents"]):
-        if year < selected_year:
-            new_development_response["impact"]["new_residents"].pop(year, None)
-
-    for year in list(new_development_response["impact"]["population"]):
-        if year < selected_year:
-            new_development_response["impact"]["population"].pop(year, None)
-
-    for year in list(new_development_response["impact"]["settlement_distribution"]):
-        if year < selected_year:
-            new_development_response["impact"]["settlement_distribution"].pop(
-                year, None
-            )
-
-    # Removing years prior to selected year - NEW DEVELOPMENT
-    for ptype in new_development_response["impact"]["emissions"].keys():
-        for year in list(new_development_response["impact"]["emissions"][ptype]):
-            if year < selected_year:
-                new_development_response["impact"]["emissions"][ptype].pop(year, None)
-                new_development_response["impact"]["absolute_emissions"][ptype].pop(
-                    year, None
-                )
-
-    for year in list(grid_electricity_emission_factor.keys()):
-        for propulsion_type in bus_propulsion_share[year].keys():
-            bus_propulsion_share[year][propulsion_type] = round(
-                bus_propulsion_share[year][propulsion_type], 3)
-
-        for propulsion_type in car_propulsion_share[year].keys():
-            car_propulsion_share[year][propulsion_type] = round(
-                car_propulsion_share[year][propulsion_type], 3)
+    baseline_response, new_development_response = remove_years_before_selected_year(
+        selected_year, baseline_response, new_development_response
+    )
 
-        grid_electricity_emission_factor[year] = round(grid_electricity_emission_factor[year], 3)
-        if year < selected_year:
-            bus_propulsion_share.pop(year, None)
-            car_propulsion_share.pop(year, None)
-            grid_electricity_emission_factor.pop(year, None)
+    bus_propulsion_share = bus_propulsion_share.round(3).since(selected_year)
+    car_propulsion_share = car_propulsion_share.round(3).since(selected_year)
+    grid_electricity_emission_factor = grid_electricity_emission_factor.round(3).since(selected_year)
 
     return {
         "status": "success",
-        "data": {
+        "data": serialize_years({
             "baseline": baseline_response,
             "new_development": new_development_response,
             "modal_split_percentage": modal_split_percentage,
             "bus_propulsion_share": bus_propulsion_share,
             "car_propulsion_share": car_propulsion_share,
             "transport_electricity_consumption": grid_electricity_emission_factor
-        },
+        }),
     }
 
 
@@ -189,7 +232,7 @@ def route_transport():
     request_schema = Transport()
 
     try:
-        request_schema.load(request_body)
+        request_data = request_schema.load(request_body)
     except ValidationError as err:
         return {"status": "invalid", "message": err.messages}, 400
 
@@ -199,13 +242,12 @@ def route_transport():
 
     selected_year = baseline["year"]
 
-    baseline_v, baseline_response = calculate_baseline(baseline)
+    context, message = create_transport_context(baseline)
 
-    if baseline_response == "message":
-        return {"status": "invalid",
-        "message": "Country data not found."}
-    elif "message" in baseline_response:
-        return {"status": "invalid", "message": baseline_response["message"]}
+    if context is None:
+        return {"status": "invalid", "message": message}
+
+    baseline_v, baseline_response = calculate_baseline_stage(context, baseline)
 
     (
         adjusted_settlement_distribution_by_year,
@@ -215,8 +257,8 @@ def route_transport():
         car_propulsion_share,
         grid_electricity_emission_factor,
         new_development_response,
-    ) = calculate_new_development(
-        baseline, baseline_response["projections"], baseline_v, new_development
+    ) = calculate_new_development_stage(
+        context, baseline, baseline_response["projections"], baseline_v, new_development
     )
 
     # if "message" in new_development_response:
@@ -226,6 +268,7 @@ def route_transport():
         absolute_policy_quantification_response,
         policy_quantification_response,
     ) = calculate_policy_quantification(
+        context,
         baseline,
         policy_quantification,
         baseline_v,
@@ -242,202 +285,432 @@ def route_transport():
     #         "message": policy_quantification_response["message"],
     #     }
 
-    # Removing years prior to selected year - BASELINE
-    for ptype in baseline_response["projections"].keys():
-        for year in list(baseline_response["projections"][ptype]):
-            if year < selected_year:
-                baseline_response["projections"][ptype].pop(year, None)
-
-        if ptype != "population":
-            for year in list(baseline_response["absolute_projections"][ptype]):
-                if year < selected_year:
-                    baseline_response["absolute_projections"][ptype].pop(year, None)
-
-    for year in list(new_development_response["impact"]["new_residents"]):
-        if year < selected_year:
-            new_development_response["impact"]["new_residents"].pop(year, None)
-
-    for year in list(new_development_response["impact"]["population"]):
-        if year < selected_year:
-            new_development_response["impact"]["population"].pop(year, None)
-
-    for year in list(new_development_response["impact"]["settlement_distribution"]):
-        if year < selected_year:
-            new_development_response["impact"]["settlement_distribution"].pop(
-                year, None
-            )
-    # Removing years prior to selected year - NEW DEVELOPMENT
-    for ptype in new_development_response["impact"]["emissions"].keys():
-        for year in list(new_development_response["impact"]["emissions"][ptype]):
-            if year < selected_year:
-                new_development_response["impact"]["emissions"][ptype].pop(year, None)
-                new_development_response["impact"]["absolute_emissions"][ptype].pop(
-                    year, None
-                )
+    baseline_response, new_development_response = remove_years_before_selected_year(
+        selected_year, baseline_response, new_development_response
+    )
+
+    response = {
+        "baseline": baseline_response,
+        "new_development": new_development_response,
+        "policy_quantification": policy_quantification_response,
+        "absolute_policy_quantification": absolute_policy_quantification_response,
+    }
+
+    # Validated, as "false" and "0" are accepted for False
+    if request_data.get("decomposition"):
+        response["decomposition"] = calculate_policy_decomposition(
+            context,
+            baseline,
+            policy_quantification,
+            adjusted_settlement_distribution_by_year,
+            new_development_response,
+            modal_split_u2,
+        )
+
+    if "uncertainty" in request_body:
+        response["uncertainty"] = calculate_uncertainty(
+            context,
+            baseline,
+            request_body["uncertainty"],
+            policy_quantification,
+            modal_split_u2,
+            baseline_response,
+            new_development_response,
+            policy_quantification_response,
+        )
 
     return {
         "status": "success",
-        "data": {
-            "baseline": baseline_response,
-            "new_development": new_development_response,
+        "data": serialize_years(response),
+    }
+
+
+@blue_print.route("batch", methods=["GET", "POST"])
+def route_transport_batch():
+    # Several policy quantifications of the same baseline and new development,
+    # which are calculated once. The results are in the order of the request.
+    request_body = humps.decamelize(request.json)
+    request_schema = TransportBatch()
+
+    try:
+        request_schema.load(request_body)
+    except ValidationError as err:
+        return {"status": "invalid", "message": err.messages}, 400
+
+    baseline = request_body["baseline"]
+    new_development = request_body["new_development"]
+    policy_quantifications = request_body["policy_quantifications"]
+
+    selected_year = baseline["year"]
+
+    context, message = create_transport_context(baseline)
+
+    if context is None:
+        return {"status": "invalid", "message": message}
+
+    baseline_v, baseline_response = calculate_baseline_stage(context, baseline)
+
+    (
+        adjusted_settlement_distribution_by_year,
+        weighted_cf_by_transport_year,
+        modal_split_u2,
+        bus_propulsion_share,
+        car_propulsion_share,
+        grid_electricity_emission_factor,
+        new_development_response,
+    ) = calculate_new_development_stage(
+        context, baseline, baseline_response["projections"], baseline_v, new_development
+    )
+
+    settlement_weights = calculate_policy_settlement_weights(
+        context,
+        adjusted_settlement_distribution_by_year,
+        new_development_response["impact"]["population"].keys(),
+    )
+
+    policy_quantification_responses = []
+
+    for policy_quantification in policy_quantifications:
+        (
+            absolute_policy_quantification_response,
+            policy_quantification_response,
+        ) = calculate_policy_quantification(
+            context,
+            baseline,
+            policy_quantification,
+            baseline_v,
+            baseline_response,
+            adjusted_settlement_distribution_by_year,
+            new_development_response,
+            weighted_cf_by_transport_year,
+            modal_split_u2,
+            settlement_weights,
+        )
+
+        policy_quantification_responses.append({
             "policy_quantification": policy_quantification_response,
             "absolute_policy_quantification": absolute_policy_quantification_response,
-        },
+        })
+
+    baseline_response, new_development_response = remove_years_before_selected_year(
+        selected_year, baseline_response, new_development_response
+    )
+
+    return {
+        "status": "success",
+        "data": serialize_years({
+            "baseline": baseline_response,
+            "new_development": new_development_response,
+            "policy_quantifications": policy_quantification_responses,
+        }),
+    }
+
+
+@blue_print.route("sensitivity", methods=["GET", "POST"])
+def route_transport_sensitivity():
+    # Elasticities of the total emissions with policies to the inputs of the
+    # request, of which the baseline and new development are calculated once
+    request_body = humps.decamelize(request.json)
+    request_schema = TransportSensitivity()
+
+    try:
+        request_schema.load(request_body)
+    except ValidationError as err:
+        return {"status": "invalid", "message": err.messages}, 400
+
+    baseline = request_body["baseline"]
+    new_development = request_body["new_development"]
+    policy_quantification = request_body["policy_quantification"]
+
+    context, message = create_transport_context(baseline)
+
+    if context is None:
+        return {"status": "invalid", "message": message}
+
+    baseline_v, baseline_response = calculate_baseline_stage(context, baseline)
+
+    (
+        adjusted_settlement_distribution_by_year,
+        weighted_cf_by_transport_year,
+        modal_split_u2,
+        bus_propulsion_share,
+        car_propulsion_share,
+        grid_electricity_emission_factor,
+        new_development_response,
+    ) = calculate_new_development_stage(
+        context, baseline, baseline_response["projections"], baseline_v, new_development
+    )
+
+    return {
+        "status": "success",
+        "data": serialize_years({
+            "sensitivity": calculate_sensitivity(
+                context,
+                new_development,
+                {"baseline": baseline, "policy_quantification": policy_quantification},
+                request_body.get("sensitivity", {}),
+                baseline_response["projections"],
+                new_development_response,
+            ),
+        }),
     }
 
 
-# CHECK & LOAD LOCAL DATASET ########################################
+def remove_years_before_selected_year(selected_year, baseline_response, new_development_response):
+    """
+    Returns the baseline and new development responses of a transport
+    calculation without the years prior to the selected year.
+    """
+    return (
+        years_since(baseline_response, selected_year),
+        years_since(new_development_response, selected_year),
+    )
+
+
+def load_country_data(country):
+    """
+    Returns the compiled parameters of a country, a local dataset or a
+    "<country> & <local dataset>" combination, or None if nothing is found.
+    Local datasets take precedence over the country they were combined with.
+    """
+    local_record = get_local_record(country.split(COUNTRY_CODE_SEPARATOR, 1)[-1])
+    if local_record is not None:
+        return local_record
+
+    return get_country_record(TRANSPORT_DATASET, country.split(COUNTRY_CODE_SEPARATOR, 1)[0])
+
+
+class TransportContext:
+    """
+    Inputs shared by all stages of a transport calculation, resolved once per
+    request from its baseline: the country parameters (see load_country_data),
+    the versions of the datasets they come from, the YearAxis of all stages
+    and the trajectories of the grid electricity emission factor and the population.
+    The stages must not modify the trajectories.
+    """
+    __slots__ = (
+        "country", "country_data", "versions", "year_axis",
+        "grid_electricity_emission_factor", "population_by_year"
+    )
+
+    def __init__(self, baseline, country_data):
+        self.country = baseline["country"]
+        self.country_data = country_data
+        self.versions = dataset_versions(self.country)
+        self.year_axis = YearAxis()
+
+        self.grid_electricity_emission_factor = calculate_grid_electricity_emission_factor(
+            self.year_axis, country_data
+        )
+        self.population_by_year = calculate_population(
+            baseline["population"], baseline["year"], country_data
+        )
+
+
+def create_transport_context(baseline):
+    """
+    Returns (TransportContext of baseline, None), or (None, error message)
+    if the selected year is out of range, the country is not found or some
+    of its metro and tram cities have no name.
+    """
+    selected_year = baseline["year"]
+
+    if selected_year < 2021:
+        return None, "Selected year is smaller than 2021."
+    if selected_year > 2050:
+        return None, "Selected year is larger than 2051."
+
+    country_data = load_country_data(baseline["country"])
+
+    if country_data is None:
+        return None, "Country data not found."
+
+    metro_city_index = country_data.get_derived("metro_city_index", build_metro_city_index)
+    tram_city_index = country_data.get_derived("tram_city_index", build_tram_city_index)
+
+    if not (metro_city_index.named and tram_city_index.named):
+        return None, "Metro and tram data of the country is incomplete."
+
+    return TransportContext(baseline, country_data), None
+
+
+def dataset_versions(country):
+    """
+    Returns the versions of the datasets the transport calculations of
+    country (see load_country_data) are based on.
+    """
+    return [
+        get_version(TRANSPORT_DATASET),
+        get_local_version(country.split(COUNTRY_CODE_SEPARATOR, 1)[-1]),
+    ]
+
+
+def calculate_baseline_stage(context, baseline):
+    """
+    Returns calculate_baseline(context, baseline), reusing the result of an
+    earlier request with the same baseline and datasets.
+    """
+    key = stage_key("baseline", baseline, context.versions)
+
+    result = get_stage(key)
+    if result is None:
+        result = calculate_baseline(context, baseline)
+        put_stage(key, result)
+
+    return result
+
+
+def calculate_settlement_basis_stage(context, baseline):
+    """
+    Returns build_settlement_basis(context, baseline), reusing the basis of
+    an earlier request with the same baseline (except for the settlement
+    distribution) and datasets.
+    """
+    baseline = {
+        key: value for key, value in baseline.items() if key != "settlement_distribution"
+    }
+    key = stage_key("settlement_basis", baseline, context.versions)
 
-def check_local_data(country):
-    country_data = pd.DataFrame()
+    settlement_basis = get_stage(key)
+    if settlement_basis is None:
+        settlement_basis = build_settlement_basis(context, baseline)
+        put_stage(key, settlement_basis)
 
-    FULL_CSV_PATH_LOCAL = os.path.join("CSVfiles", "local_datasets", "")
-    for file in glob.glob(FULL_CSV_PATH_LOCAL + "*.csv"):
-        file_name = os.path.splitext(os.path.basename(file))[0]
-        file_name = file_name.replace("-", ": ")
-        file_name = file_name.replace("__", ":")
-        file_name = file_name.replace("_", ".")
+    return settlement_basis
 
-        if country == file_name:
-            df = pd.read_csv(file)
-            sub_df = df[["VariableAcronym", "Value"]].T
-            sub_df.columns = sub_df.iloc[0]
-            sub_df = sub_df.drop(["VariableAcronym"])
 
-            # Change data types to correct type          
-            local_dataset_format = pd.read_csv("CSVfiles/local_dataset_format.csv")
-            for i in range(len(local_dataset_format)):
-                if local_dataset_format["VariableType"][i] == "Float":
-                    sub_df[local_dataset_format["VariableAcronym"][i]] = sub_df[local_dataset_format["VariableAcronym"][i]].astype(float)
+def calculate_new_development_stage(
+    context, baseline, baseline_result, baseline_v, new_development
+):
+    """
+    Returns calculate_new_development(...), reusing the result of an earlier
+    request with the same baseline, new development and datasets.
+    baseline_result and baseline_v must be the baseline stage of baseline.
+    """
+    key = stage_key(
+        "new_development",
+        {"baseline": baseline, "new_development": new_development},
+        context.versions,
+    )
 
-            sub_df.fillna(0, inplace=True)
+    result = get_stage(key)
+    if result is None:
+        result = calculate_new_development(
+            context, baseline, baseline_result, baseline_v, new_development
+        )
+        put_stage(key, result)
 
-            country_data = sub_df
-    
-    return country_data
+    return result
 
 
 # METRO TRAM LIST ########################################
 
 
-def generate_metro_tram_list(metro_tram_request):
-    metro_city_list = {}
-    tram_city_list = {}
+# Column prefix, position of the first city name, number of cities (the
+# activities follow the names) and placeholder of unused columns
+CITY_COLUMNS = {
+    "metro": ("METRO_COL", 7, 7, "no metro"),
+    "tram": ("TRAM_COL", 7, 58, "no trams"),
+}
+
 
+def generate_metro_tram_list(metro_tram_request):
     country = metro_tram_request["country"]
 
-    # Check if country name contains local-dataset name
-    # If so, removes country name
-    country_ORG = country
-    country_code_separator = " & "
-    if country_code_separator in country:
-        country = country.split(country_code_separator, 1)[1]
+    country_data = load_country_data(country)
 
-    country_data = check_local_data(country)
+    if country_data is None:
+        return {"status": "invalid", "message": "Country data not found."}
 
-    if country_data.empty:
-        if country_code_separator in country_ORG:
-            country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Transport_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
+    metro_city_index = country_data.get_derived("metro_city_index", build_metro_city_index)
+    tram_city_index = country_data.get_derived("tram_city_index", build_tram_city_index)
 
-        country_data = df.loc[df["country"] == country]
+    return dict(metro_city_index.city_list), dict(tram_city_index.city_list)
 
-    # Check if country data is still empty after checking local
-    if country_data.empty:
-        return {"status": "invalid", "message": "Country data not found."}
 
-    metro_min_col_idx = 7
-    metro_col_count = 7
-    for i in range(metro_min_col_idx, metro_min_col_idx + metro_col_count):
-        metro_key_name = "metro_"
-        metro_col_name = "METRO_COL"
-        metro_col_name1 = metro_col_name + str(i)
-        metro_col_value1 = country_data[metro_col_name1].to_numpy()[0]
-        if metro_col_value1 != "no metro" and metro_col_value1 != "-":
-            metro_city_list[
-                metro_key_name + str(i - metro_min_col_idx + 1)
-            ] = metro_col_value1
-
-    tram_min_col_idx = 7
-    tram_col_count = 58
-    for j in range(tram_min_col_idx, tram_min_col_idx + tram_col_count):
-        tram_key_name = "tram_"
-        tram_col_name = "TRAM_COL"
-        tram_col_name1 = tram_col_name + str(j)
-        tram_col_value1 = country_data[tram_col_name1].to_numpy()[0]
-        if tram_col_value1 != "no trams" and tram_col_value1 != "-":
-            tram_city_list[
-                tram_key_name + str(j - tram_min_col_idx + 1)
-            ] = tram_col_value1
-
-    return metro_city_list, tram_city_list
+class CityIndex:
+    """
+    Metro (or tram) cities of a country: the entries of the metro-tram list
+    ({"metro_1": city, ...}), the 2021 activity of every distinct city as an
+    array and the positions of the cities in it by lower case name. Built once
+    per country, so the activity of a split by city is a dot product.
+    Cities of some datasets have no name (empty columns), see named.
+    """
+    __slots__ = ("city_list", "activity", "positions", "named")
 
+    def __init__(self, city_list, activity_by_city):
+        self.city_list = city_list
+        self.activity = np.fromiter(
+            activity_by_city.values(), dtype=np.float64, count=len(activity_by_city)
+        )
+        self.positions = {}
+        self.named = True
+        for position, city in enumerate(activity_by_city):
+            if isinstance(city, str):
+                self.positions.setdefault(city.lower(), []).append(position)
+            else:
+                self.named = False
 
-# BASELINE ########################################
+    def split_activity(self, split):
+        """
+        Returns the activity of the cities in split ({city: %}, names in any
+        case), weighted by their percentage.
+        """
+        shares = {}
+        for city in split:
+            for position in self.positions.get(city.lower(), ()):
+                shares[position] = split[city] / 100
 
+        positions = sorted(shares)
+        return np.dot([shares[position] for position in positions], self.activity[positions])
 
-def calculate_baseline(baseline):
-    country = baseline["country"]
-    population = baseline["population"]
-    selected_year = baseline["year"]
-    settlement_distribution = baseline["settlement_distribution"]
-    intensity_non_res_and_ft_opts = baseline["intensity_non_res_and_ft"]
-    metro_split = baseline["metro_split"]
-    tram_split = baseline["tram_split"]
 
-    year_range = list(range(2021, 2051))
+def build_metro_city_index(country_data):
+    return _build_city_index(country_data, "metro")
 
-    if year_range[0] > selected_year:
-        return {}, {"message": "Selected year is smaller than 2021."}
-    if year_range[-1] < selected_year:
-        return {}, {"message": "Selected year is larger than 2051."}
 
-    # Check if country name contains local-dataset name
-    # If so, removes country name
-    country_ORG = country
-    country_code_separator = " & "
-    if country_code_separator in country:
-        country = country.split(country_code_separator, 1)[1]
+def build_tram_city_index(country_data):
+    return _build_city_index(country_data, "tram")
 
-    country_data = check_local_data(country)
 
-    if country_data.empty:
-        if country_code_separator in country_ORG:
-            country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Transport_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
+def _build_city_index(country_data, transport_type):
+    col_name, min_col_idx, col_count, no_city = CITY_COLUMNS[transport_type]
 
-        country_data = df.loc[df["country"] == country]
+    city_list = {}
+    activity_by_city = {}
+    for i in range(min_col_idx, min_col_idx + col_count):
+        city = country_data[col_name + str(i)]
+        if city != no_city and city != "-":
+            city_list[transport_type + "_" + str(i - min_col_idx + 1)] = city
+            activity_by_city[city] = country_data[col_name + str(i + col_count)]
 
-    # Check if country data is still empty after checking local
-    if country_data.empty:
-        return {"status": "invalid", "message": "Country data not found."}
+    return CityIndex(city_list, activity_by_city)
 
-    grid_electricity_emission_factor = calculate_grid_electricity_emission_factor(
-        year_range, country_data
-    )
-    population_by_year = calculate_population(population, selected_year, country_data)
+
+# BASELINE ########################################
+
+
+def calculate_baseline(context, baseline):
+    selected_year = baseline["year"]
+    settlement_distribution = baseline["settlement_distribution"]
+    intensity_non_res_and_ft_opts = baseline["intensity_non_res_and_ft"]
+    metro_split = baseline["metro_split"]
+    tram_split = baseline["tram_split"]
+
+    year_range = context.year_axis
+    country_data = context.country_data
+    grid_electricity_emission_factor = context.grid_electricity_emission_factor
+    population_by_year = context.population_by_year
 
     intensity_non_res_and_ft = generate_intensity_non_res_and_ft(
         intensity_non_res_and_ft_opts, country_data
     )
 
-    settlement_distribution_by_year = {}
-
-    for year in year_range:
-        settlement_distribution_by_year[year] = {}
-
-        for settlement_type in settlement_distribution.keys():
-            settlement_distribution_by_year[year][
-                settlement_type
-            ] = settlement_distribution[settlement_type]
+    settlement_distribution_by_year = settlement_distribution_frame(
+        settlement_distribution, year_range
+    )
 
-    baseline_v, projections = calculate_baseline_emissions(
+    baseline_v, baseline_emissions = calculate_baseline_emissions(
         year_range,
         settlement_distribution_by_year,
         intensity_non_res_and_ft,
@@ -448,66 +721,153 @@ def calculate_baseline(baseline):
         grid_electricity_emission_factor,
     )
 
-    emissions = {}
-    absolute_emissions = {}
-    absolute_projections = {}
+    population = YearSeries([population_by_year[year] for year in year_range], year_range.start)
 
-    for transport_type in projections.keys():
-        absolute_projections[transport_type] = {}
+    projections = baseline_emissions.round(3)
+    absolute_projections = (baseline_emissions * population.array / 1000).round(3)
 
-        for year in year_range:
-            absolute_projections[transport_type][year] = round(
-                projections[transport_type][year] * population_by_year[year] / 1000, 3
-            )
+    return baseline_v, {
+        "emissions": projections.at(selected_year),
+        "absolute_year1_emissions": absolute_projections.at(selected_year),
+        "projections": dict(projections.items(), population=population),
+        "absolute_projections": dict(absolute_projections.items()),
+    }
 
-            projections[transport_type][year] = round(
-                projections[transport_type][year], 3
-            )
 
-        emissions[transport_type] = projections[transport_type][selected_year]
-        absolute_emissions[transport_type] = absolute_projections[transport_type][
-            selected_year
-        ]
+class SettlementBasis:
+    """
+    Per capita baseline emissions of every transport mode and their total in
+    2021-2050 as a function of the settlement distribution a (the shares of
+    SETTLEMENT_TYPES, in fractions of 1):
 
-    projections["population"] = population_by_year
+        constant + linear @ a + a @ quadratic @ a
 
-    return baseline_v, {
-        "emissions": emissions,
-        "absolute_year1_emissions": absolute_emissions,
-        "projections": projections,
-        "absolute_projections": absolute_projections,
+    The activity of a mode (through its correction factor) and the area
+    specific emission factors of buses, cars and road freight are both
+    linear in a, so their emissions are quadratic in it. constant is a
+    (modes, 30) array, linear (modes, 30, 5) and quadratic (modes, 30, 5, 5).
+    """
+    __slots__ = ("modes", "constant", "linear", "quadratic")
+
+    def __init__(self, modes, constant, linear, quadratic):
+        self.modes = modes
+        self.constant = constant
+        self.linear = linear
+        self.quadratic = quadratic
+
+    def evaluate(self, settlement_distribution):
+        """
+        Returns the YearFrame of the per capita emissions of every mode of
+        settlement_distribution, {settlement type: share in %}.
+        """
+        a = np.array(
+            [settlement_distribution[settlement_type] for settlement_type in SETTLEMENT_TYPES],
+            dtype=np.float64,
+        ) / 100
+
+        emissions = (
+            self.constant + self.linear @ a + np.einsum("mykl,k,l->my", self.quadratic, a, a)
+        )
+        return YearFrame(self.modes, np.nan_to_num(emissions))
+
+
+def build_settlement_basis(context, baseline):
+    """
+    Returns the SettlementBasis of baseline (whose settlement distribution
+    is not used), evaluating calculate_baseline_emissions at 21 settlement
+    distributions: none, every settlement type at 100 % and 200 %, and every
+    pair of settlement types at 100 % each.
+    """
+    intensity_non_res_and_ft = generate_intensity_non_res_and_ft(
+        baseline["intensity_non_res_and_ft"], context.country_data
+    )
+
+    def emissions(a):
+        settlement_distribution = dict(zip(SETTLEMENT_TYPES, (100 * a).tolist()))
+        _, baseline_emissions = calculate_baseline_emissions(
+            context.year_axis,
+            settlement_distribution_frame(settlement_distribution, context.year_axis),
+            intensity_non_res_and_ft,
+            baseline["metro_split"],
+            baseline["tram_split"],
+            context.country_data,
+            context.population_by_year,
+            context.grid_electricity_emission_factor,
+        )
+        return baseline_emissions.array, baseline_emissions.labels
+
+    unit = np.eye(len(SETTLEMENT_TYPES))
+    constant, modes = emissions(np.zeros(len(SETTLEMENT_TYPES)))
+    single = [emissions(unit[k])[0] - constant for k in range(len(SETTLEMENT_TYPES))]
+    double = [emissions(2 * unit[k])[0] - constant for k in range(len(SETTLEMENT_TYPES))]
+
+    quadratic = np.zeros(constant.shape + (len(SETTLEMENT_TYPES), len(SETTLEMENT_TYPES)))
+    for k in range(len(SETTLEMENT_TYPES)):
+        quadratic[..., k, k] = (double[k] - 2 * single[k]) / 2
+    linear = np.stack(single, axis=-1) - np.diagonal(quadratic, axis1=-2, axis2=-1)
+
+    for k in range(len(SETTLEMENT_TYPES)):
+        for l in range(k + 1, len(SETTLEMENT_TYPES)):
+            pair = emissions(unit[k] + unit[l])[0] - constant
+            quadratic[..., k, l] = quadratic[..., l, k] = (
+                pair - single[k] - single[l]
+            ) / 2
+
+    return SettlementBasis(modes, constant, linear, quadratic)
+
+
+def calculate_settlement_distribution_emissions(context, baseline, settlement_basis):
+    """
+    Returns the emissions and projections of calculate_baseline from
+    settlement_basis (see calculate_settlement_basis_stage), for the years
+    from the selected year on. The emissions of the basis equal those of
+    calculate_baseline to floating point precision (relative differences of
+    about 1e-15), so the responses, rounded to 3 decimals, are the same as
+    those of calculate_baseline unless a value falls on a rounding boundary.
+    """
+    selected_year = baseline["year"]
+    year_range = context.year_axis.since(selected_year)
+    population = YearSeries([context.population_by_year[year] for year in year_range], selected_year)
+
+    emissions = settlement_basis.evaluate(baseline["settlement_distribution"]).since(selected_year)
+
+    projections = emissions.round(3)
+    absolute_projections = (emissions * population.array / 1000).round(3)
+
+    return {
+        "emissions": projections.at(selected_year),
+        "absolute_year1_emissions": absolute_projections.at(selected_year),
+        "projections": dict(projections.items(), population=population),
+        "absolute_projections": dict(absolute_projections.items()),
     }
 
 
 def calculate_grid_electricity_emission_factor(year_range, country_data):
-    grid_electricity_ef = {}
+    grid_electricity_ef_by_year = country_data.get_derived(
+        "grid_electricity_ef", build_grid_electricity_emission_factor
+    )
 
     # Initializing value for 2021
-    grid_electricity_ef[2021] = country_data.ENE_COL1.to_numpy()[0]
-
-    annual_change_2020_2030 = country_data.ENE_COL2.to_numpy()[0]
-    annual_change_2030_2040 = country_data.ENE_COL3.to_numpy()[0]
-    annual_change_2040_2050 = country_data.ENE_COL4.to_numpy()[0]
+    grid_electricity_ef = {2021: grid_electricity_ef_by_year[2021]}
 
     for year in year_range:
-        # if year == 2021:
-        # Value already initialized so skip
-        if 2022 <= year <= 2030:
-            grid_electricity_ef[year] = (
-                grid_electricity_ef[year - 1] * (100 + annual_change_2020_2030) / 100
-            )
-        elif 2031 <= year <= 2040:
-            grid_electricity_ef[year] = (
-                grid_electricity_ef[year - 1] * (100 + annual_change_2030_2040) / 100
-            )
-        elif 2041 <= year <= 2050:
-            grid_electricity_ef[year] = (
-                grid_electricity_ef[year - 1] * (100 + annual_change_2040_2050) / 100
-            )
+        if 2022 <= year <= 2050:
+            grid_electricity_ef[year] = grid_electricity_ef_by_year[year]
 
     return grid_electricity_ef
 
 
+def build_grid_electricity_emission_factor(country_data):
+    # Value of 2021, developing with the annual changes of each decade
+    grid_electricity_ef = country_data.ENE_COL1 * growth_profile(
+        [country_data.ENE_COL2, country_data.ENE_COL3, country_data.ENE_COL4]
+    )
+
+    # Kept as NumPy floats: the policy U3.7 divides by the factors, which
+    # gives nan (reported as 0) rather than an error for factors of 0
+    return dict(zip(YEARS.tolist(), grid_electricity_ef))
+
+
 def calculate_population(initialized_population, initialized_year, country_data):
     population = {}
 
@@ -519,29 +879,28 @@ def calculate_population(initialized_population, initialized_year, country_data)
             population[year] = 0
         population[initialized_year] = initialized_population
 
-    annual_change_2020_2030 = country_data.POP_COL1.to_numpy()[0]
-    annual_change_2030_2040 = country_data.POP_COL2.to_numpy()[0]
-    annual_change_2040_2050 = country_data.POP_COL3.to_numpy()[0]
+    population_growth = country_data.get_derived(
+        "population_growth", build_population_growth
+    )
 
-    for year in range(initialized_year + 1, 2051):
-        # if year == 2021:
-        # Value already initialized so skip
-        if 2022 <= year <= 2030:
-            population[year] = math.ceil(
-                population[year - 1] * (100 + annual_change_2020_2030) / 100
-            )
-        elif 2031 <= year <= 2040:
-            population[year] = math.ceil(
-                population[year - 1] * (100 + annual_change_2030_2040) / 100
-            )
-        elif 2041 <= year <= 2050:
-            population[year] = math.ceil(
-                population[year - 1] * (100 + annual_change_2040_2050) / 100
-            )
+    # Rounded up every year, so each year depends on the rounded previous one
+    value = population[initialized_year]
+    for year, growth in zip(
+        range(initialized_year + 1, 2051), population_growth[initialized_year - 2021:]
+    ):
+        value = math.ceil(value * growth / 100)
+        population[year] = value
 
     return population
 
 
+def build_population_growth(country_data):
+    # Annual population change of each year 2022-2050 as percentage of the previous year
+    return growth_percentages(
+        [country_data.POP_COL1, country_data.POP_COL2, country_data.POP_COL3]
+    ).tolist()
+
+
 def generate_intensity_non_res_and_ft(intensity_non_res_and_ft_opts, country_data):
     intensity_non_res_and_ft = {}
 
@@ -557,21 +916,13 @@ def generate_intensity_non_res_and_ft(intensity_non_res_and_ft_opts, country_dat
     for transport_type in citizen_transport_modes:
         if transport_type == "bus" or transport_type == "car":
             if intensity_non_res_and_ft_opts["non_res_pt"] == "none":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL7.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL7
             elif intensity_non_res_and_ft_opts["non_res_pt"] == "low_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL8.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL8
             elif intensity_non_res_and_ft_opts["non_res_pt"] == "average_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL9.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL9
             elif intensity_non_res_and_ft_opts["non_res_pt"] == "high_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL10.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL10
             else:
                 intensity_non_res_and_ft[transport_type] = 1
 
@@ -580,61 +931,37 @@ def generate_intensity_non_res_and_ft(intensity_non_res_and_ft_opts, country_dat
 
         elif transport_type == "rail_transport":
             if intensity_non_res_and_ft_opts["ft_rail"] == "none":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL15.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL15
             elif intensity_non_res_and_ft_opts["ft_rail"] == "low_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL16.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL16
             elif intensity_non_res_and_ft_opts["ft_rail"] == "average_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL17.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL17
             elif intensity_non_res_and_ft_opts["ft_rail"] == "high_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL18.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL18
             else:
                 intensity_non_res_and_ft[transport_type] = 1
 
         elif transport_type == "road_transport":
             if intensity_non_res_and_ft_opts["ft_road"] == "none":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL11.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL11
             elif intensity_non_res_and_ft_opts["ft_road"] == "low_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL12.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL12
             elif intensity_non_res_and_ft_opts["ft_road"] == "average_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL13.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL13
             elif intensity_non_res_and_ft_opts["ft_road"] == "high_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL14.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL14
             else:
                 intensity_non_res_and_ft[transport_type] = 1
 
         elif transport_type == "waterways_transport":
             if intensity_non_res_and_ft_opts["ft_water"] == "none":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL19.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL19
             elif intensity_non_res_and_ft_opts["ft_water"] == "low_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL20.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL20
             elif intensity_non_res_and_ft_opts["ft_water"] == "average_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL21.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL21
             elif intensity_non_res_and_ft_opts["ft_water"] == "high_intensity":
-                intensity_non_res_and_ft[
-                    transport_type
-                ] = country_data.MENU_COL22.to_numpy()[0]
+                intensity_non_res_and_ft[transport_type] = country_data.MENU_COL22
             else:
                 intensity_non_res_and_ft[transport_type] = 1
 
@@ -659,7 +986,6 @@ def calculate_baseline_emissions(
 
     baseline_emissions = {}
     transport_mode_weights = {}
-    baseline_v = {}
 
     transport_modes = [item[0] for item in TRANSPORT_LIST]
 
@@ -672,28 +998,31 @@ def calculate_baseline_emissions(
         transport_mode_weights, settlement_distribution_by_year
     )
 
+    baseline_v = calculate_baseline_v(
+        year_range,
+        intensity_non_res_and_ft,
+        metro_split,
+        tram_split,
+        country_data,
+        correction_factor,
+    )
+
+    area_specific_ef = calculate_area_specific_ef_by_mode(
+        country_data, settlement_distribution_by_year, year_range
+    )
+
     for transport_type in transport_modes:
-        baseline_v[transport_type] = calculate_baseline_v(
-            year_range,
-            intensity_non_res_and_ft,
-            metro_split,
-            tram_split,
-            country_data,
-            transport_type,
-            correction_factor,
-        )
         if transport_type == "bus":
             _, baseline_emissions[transport_type] = calculate_baseline_emissions_bus(
                 country_data,
-                settlement_distribution_by_year,
-                grid_electricity_emission_factor,
+                area_specific_ef[transport_type],
                 baseline_v[transport_type],
             )
 
         elif transport_type == "car":
             _, baseline_emissions[transport_type] = calculate_baseline_emissions_car(
                 country_data,
-                settlement_distribution_by_year,
+                area_specific_ef[transport_type],
                 baseline_v[transport_type],
             )
 
@@ -734,7 +1063,7 @@ def calculate_baseline_emissions(
                 transport_type
             ] = calculate_baseline_emissions_road_transport(
                 country_data,
-                settlement_distribution_by_year,
+                area_specific_ef[transport_type],
                 baseline_v[transport_type],
             )
 
@@ -745,45 +1074,56 @@ def calculate_baseline_emissions(
                 country_data, baseline_v[transport_type]
             )
 
-        for year in year_range:
-            # Replacing NANs (if any) with ZEROs
-            if math.isnan(baseline_emissions[transport_type][year]):
-                baseline_emissions[transport_type][year] = 0.0
-
-    baseline_emissions["total"] = {}
+    return baseline_v, emissions_frame(transport_modes, baseline_emissions, year_range)
 
-    for year in year_range:
-        baseline_emissions["total"][year] = baseline_emissions["bus"][year] + \
-                                            baseline_emissions["car"][year] + \
-                                            baseline_emissions["metro"][year] + \
-                                            baseline_emissions["tram"][year] + \
-                                            baseline_emissions["train"][year] + \
-                                            baseline_emissions["rail_transport"][year] + \
-                                            baseline_emissions["road_transport"][year] + \
-                                            baseline_emissions["waterways_transport"][year]
 
-    return baseline_v, baseline_emissions
+def emissions_frame(transport_modes, emissions_by_mode, year_range, total_modes=None):
+    """
+    Returns the YearFrame of {transport_type: {year: emissions}} of
+    transport_modes in the years of year_range with a "total" row of
+    total_modes (all by default). NANs (if any) are replaced with zeros.
+    The emissions of a mode may also be a YearSeries of these years, whose
+    leading axes (if any) lead the frame.
+    """
+    year_range = YearAxis.of(year_range)
+    transport_modes = list(transport_modes)
+    emissions = np.stack(np.broadcast_arrays(*(
+        emissions_by_mode[transport_type].array
+        if isinstance(emissions_by_mode[transport_type], YearSeries)
+        else np.array([emissions_by_mode[transport_type][year] for year in year_range])
+        for transport_type in transport_modes
+    )), axis=-2).astype(np.float64)
+    emissions[np.isnan(emissions)] = 0.0
+
+    if total_modes is None:
+        total = emissions.sum(axis=-2)
+    else:
+        total = emissions[
+            ..., [transport_modes.index(transport_type) for transport_type in total_modes], :
+        ].sum(axis=-2)
+
+    return YearFrame(
+        transport_modes + ["total"],
+        np.concatenate([emissions, total[..., np.newaxis, :]], axis=-2),
+        year_range.start,
+    )
 
 
 def initialize_transport_mode_weights(country_data, transport_type):
     transport_mode_weights = {}
 
     if transport_type == "bus":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.BUS_COL11.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.BUS_COL12.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.BUS_COL13.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.BUS_COL14.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.BUS_COL15.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.BUS_COL11
+        transport_mode_weights["urban"] = country_data.BUS_COL12
+        transport_mode_weights["suburban"] = country_data.BUS_COL13
+        transport_mode_weights["town"] = country_data.BUS_COL14
+        transport_mode_weights["rural"] = country_data.BUS_COL15
     elif transport_type == "car":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.CAR_COL54.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.CAR_COL55.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.CAR_COL56.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.CAR_COL57.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.CAR_COL58.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.CAR_COL54
+        transport_mode_weights["urban"] = country_data.CAR_COL55
+        transport_mode_weights["suburban"] = country_data.CAR_COL56
+        transport_mode_weights["town"] = country_data.CAR_COL57
+        transport_mode_weights["rural"] = country_data.CAR_COL58
     elif transport_type == "metro":
         transport_mode_weights["metropolitan_center"] = 1.0
         transport_mode_weights["urban"] = 1.0
@@ -797,37 +1137,29 @@ def initialize_transport_mode_weights(country_data, transport_type):
         transport_mode_weights["town"] = 1.0
         transport_mode_weights["rural"] = 1.0
     elif transport_type == "train":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.TRAIN_COL9.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.TRAIN_COL10.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.TRAIN_COL11.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.TRAIN_COL12.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.TRAIN_COL13.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.TRAIN_COL9
+        transport_mode_weights["urban"] = country_data.TRAIN_COL10
+        transport_mode_weights["suburban"] = country_data.TRAIN_COL11
+        transport_mode_weights["town"] = country_data.TRAIN_COL12
+        transport_mode_weights["rural"] = country_data.TRAIN_COL13
     elif transport_type == "rail_transport":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.RAIL_TRN_COL8.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.RAIL_TRN_COL9.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.RAIL_TRN_COL10.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.RAIL_TRN_COL11.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.RAIL_TRN_COL12.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.RAIL_TRN_COL8
+        transport_mode_weights["urban"] = country_data.RAIL_TRN_COL9
+        transport_mode_weights["suburban"] = country_data.RAIL_TRN_COL10
+        transport_mode_weights["town"] = country_data.RAIL_TRN_COL11
+        transport_mode_weights["rural"] = country_data.RAIL_TRN_COL12
     elif transport_type == "road_transport":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.ROAD_TRN_COL6.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.ROAD_TRN_COL7.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.ROAD_TRN_COL8.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.ROAD_TRN_COL9.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.ROAD_TRN_COL10.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.ROAD_TRN_COL6
+        transport_mode_weights["urban"] = country_data.ROAD_TRN_COL7
+        transport_mode_weights["suburban"] = country_data.ROAD_TRN_COL8
+        transport_mode_weights["town"] = country_data.ROAD_TRN_COL9
+        transport_mode_weights["rural"] = country_data.ROAD_TRN_COL10
     elif transport_type == "waterways_transport":
-        transport_mode_weights[
-            "metropolitan_center"
-        ] = country_data.WATER_TRN_COL6.to_numpy()[0]
-        transport_mode_weights["urban"] = country_data.WATER_TRN_COL7.to_numpy()[0]
-        transport_mode_weights["suburban"] = country_data.WATER_TRN_COL8.to_numpy()[0]
-        transport_mode_weights["town"] = country_data.WATER_TRN_COL9.to_numpy()[0]
-        transport_mode_weights["rural"] = country_data.WATER_TRN_COL10.to_numpy()[0]
+        transport_mode_weights["metropolitan_center"] = country_data.WATER_TRN_COL6
+        transport_mode_weights["urban"] = country_data.WATER_TRN_COL7
+        transport_mode_weights["suburban"] = country_data.WATER_TRN_COL8
+        transport_mode_weights["town"] = country_data.WATER_TRN_COL9
+        transport_mode_weights["rural"] = country_data.WATER_TRN_COL10
 
     return transport_mode_weights
 
@@ -838,13 +1170,13 @@ def calculate_correction_factors(
     """
     This function calculates correction factor based on given settlement weights and settlement percentages
     :param transport_mode_weights: dictionary
-    :param settlement_distribution_by_year: dictionary
+    :param settlement_distribution_by_year: YearFrame of settlement types
     :return: dictionary
     """
 
     correction_factor = {}
 
-    settlement_distribution_2021 = settlement_distribution_by_year[2021]
+    settlement_distribution_2021 = settlement_distribution_by_year.at(2021)
 
     for transport_type in transport_mode_weights.keys():
         correction_factor_by_transport = 0
@@ -867,533 +1199,395 @@ def calculate_baseline_v(
     metro_split,
     tram_split,
     country_data,
-    transport_type,
     correction_factor,
 ):
-    baseline_v = {}
-
-    if transport_type == "bus":
-        passenger_km_per_capita = country_data.BUS_COL1.to_numpy()[0]
-        occupancy_rate = country_data.BUS_COL2.to_numpy()[0]
-        annual_change_2020_2030 = country_data.BUS_COL3.to_numpy()[0]
-        annual_change_2030_2040 = country_data.BUS_COL4.to_numpy()[0]
-        annual_change_2040_2050 = country_data.BUS_COL5.to_numpy()[0]
-    elif transport_type == "car":
-        passenger_km_per_capita = country_data.CAR_COL1.to_numpy()[0]
-        occupancy_rate = country_data.CAR_COL2.to_numpy()[0]
-        annual_change_2020_2030 = country_data.CAR_COL4.to_numpy()[0]
-        annual_change_2030_2040 = country_data.CAR_COL5.to_numpy()[0]
-        annual_change_2040_2050 = country_data.CAR_COL6.to_numpy()[0]
-    elif transport_type == "metro":
-        passenger_km_per_capita = country_data.METRO_COL1.to_numpy()[0]
-        occupancy_rate = country_data.METRO_COL2.to_numpy()[0]
-        annual_change_2020_2030 = country_data.METRO_COL4.to_numpy()[0]
-        annual_change_2030_2040 = country_data.METRO_COL5.to_numpy()[0]
-        annual_change_2040_2050 = country_data.METRO_COL6.to_numpy()[0]
-    elif transport_type == "tram":
-        passenger_km_per_capita = country_data.TRAM_COL1.to_numpy()[0]
-        occupancy_rate = country_data.TRAM_COL2.to_numpy()[0]
-        annual_change_2020_2030 = country_data.TRAM_COL4.to_numpy()[0]
-        annual_change_2030_2040 = country_data.TRAM_COL5.to_numpy()[0]
-        annual_change_2040_2050 = country_data.TRAM_COL6.to_numpy()[0]
-    elif transport_type == "train":
-        passenger_km_per_capita = country_data.TRAIN_COL1.to_numpy()[0]
-        occupancy_rate = country_data.TRAIN_COL2.to_numpy()[0]
-        annual_change_2020_2030 = country_data.TRAIN_COL6.to_numpy()[0]
-        annual_change_2030_2040 = country_data.TRAIN_COL7.to_numpy()[0]
-        annual_change_2040_2050 = country_data.TRAIN_COL8.to_numpy()[0]
-    elif transport_type == "rail_transport":
-        passenger_km_per_capita = country_data.RAIL_TRN_COL1.to_numpy()[0]
-        occupancy_rate = 1  # Fixed for now
-        annual_change_2020_2030 = country_data.RAIL_TRN_COL5.to_numpy()[0]
-        annual_change_2030_2040 = country_data.RAIL_TRN_COL6.to_numpy()[0]
-        annual_change_2040_2050 = country_data.RAIL_TRN_COL7.to_numpy()[0]
-    elif transport_type == "road_transport":
-        passenger_km_per_capita = country_data.ROAD_TRN_COL1.to_numpy()[0]
-        occupancy_rate = 1  # Fixed for now
-        annual_change_2020_2030 = country_data.ROAD_TRN_COL3.to_numpy()[0]
-        annual_change_2030_2040 = country_data.ROAD_TRN_COL4.to_numpy()[0]
-        annual_change_2040_2050 = country_data.ROAD_TRN_COL5.to_numpy()[0]
-    elif transport_type == "waterways_transport":
-        passenger_km_per_capita = country_data.WATER_TRN_COL1.to_numpy()[0]
-        occupancy_rate = 1  # Fixed for now
-        annual_change_2020_2030 = country_data.WATER_TRN_COL3.to_numpy()[0]
-        annual_change_2030_2040 = country_data.WATER_TRN_COL4.to_numpy()[0]
-        annual_change_2040_2050 = country_data.WATER_TRN_COL5.to_numpy()[0]
-    else:
-        print("Incorrect transport type!")
-        return baseline_v
-
-    if (
-        transport_type == "bus"
-        or transport_type == "car"
-        or transport_type == "train"
-        or transport_type == "rail_transport"
-        or transport_type == "road_transport"
-        or transport_type == "waterways_transport"
-    ):
-
-        for year in year_range:
-            if year == 2021:
-                baseline_v[year] = (
-                    passenger_km_per_capita
-                    / occupancy_rate
-                    * correction_factor[transport_type]
-                    * intensity_non_res_and_ft[transport_type]
-                )
-            elif 2022 <= year <= 2030:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2020_2030) / 100
-                )
-            elif 2031 <= year <= 2040:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2030_2040) / 100
-                )
-            elif 2041 <= year <= 2050:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2040_2050) / 100
-                )
+    """
+    Returns {transport_type: {year: activity}} of all transport modes, the
+    activity of 2021 developing with the annual changes of each mode.
+    """
+    transport_modes = [item[0] for item in TRANSPORT_LIST]
 
-    if transport_type == "metro":
-        metro_activity_by_city = {}
+    initial_v = np.array([
+        calculate_initial_v(
+            intensity_non_res_and_ft,
+            metro_split,
+            tram_split,
+            country_data,
+            transport_type,
+            correction_factor,
+        )
+        for transport_type in transport_modes
+    ])
 
-        min_col_idx = 7
-        col_count = 7
-        for i in range(min_col_idx, min_col_idx + col_count):
-            col_name = "METRO_COL"
-            col_name1 = col_name + str(i)
-            col_name2 = col_name + str(i + col_count)
-            col_value1 = country_data[col_name1].to_numpy()[0]
-            col_value2 = country_data[col_name2].to_numpy()[0]
-            if col_value1 != "no metro" and col_value1 != "-":
-                metro_activity_by_city[col_value1] = col_value2
+    activity_growth = country_data.get_derived("activity_growth", build_activity_growth)
+    baseline_v_by_year = initial_v[:, np.newaxis] * activity_growth
 
-        percent_metro_input = {}
+    return {
+        transport_type: to_year_dict(baseline_v_by_year[i], year_range)
+        for i, transport_type in enumerate(transport_modes)
+    }
 
-        for city in metro_activity_by_city.keys():
-            if city.lower() in map(str.lower, metro_split.keys()):
-                percent_metro_input[city] = metro_split[city.lower()]
 
-        for year in year_range:
-            if year == 2021:
-                baseline_v[year] = 0
-                for city in percent_metro_input.keys():
-                    baseline_v[year] = baseline_v[year] + (
-                        percent_metro_input[city] / 100 * metro_activity_by_city[city]
-                    )
+def calculate_initial_v(
+    intensity_non_res_and_ft,
+    metro_split,
+    tram_split,
+    country_data,
+    transport_type,
+    correction_factor,
+):
+    """
+    Returns the activity of a transport mode in 2021.
+    """
+    passenger_km_per_capita_col, occupancy_rate_col = ACTIVITY_COLUMNS[transport_type]
+    passenger_km_per_capita = country_data[passenger_km_per_capita_col]
+    if occupancy_rate_col is None:
+        occupancy_rate = 1  # Fixed for now
+    else:
+        occupancy_rate = country_data[occupancy_rate_col]
 
-                baseline_v[year] = baseline_v[year] / occupancy_rate
-            elif 2022 <= year <= 2030:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2020_2030) / 100
-                )
-            elif 2031 <= year <= 2040:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2030_2040) / 100
-                )
-            elif 2041 <= year <= 2050:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2040_2050) / 100
-                )
+    if transport_type == "metro":
+        metro_city_index = country_data.get_derived("metro_city_index", build_metro_city_index)
+        return metro_city_index.split_activity(metro_split) / occupancy_rate
 
     if transport_type == "tram":
-        tram_activity_by_city = {}
+        tram_city_index = country_data.get_derived("tram_city_index", build_tram_city_index)
+        return tram_city_index.split_activity(tram_split) / occupancy_rate
 
-        min_col_idx = 7
-        col_count = 58
-        for i in range(min_col_idx, min_col_idx + col_count):
-            col_name = "TRAM_COL"
-            col_name1 = col_name + str(i)
-            col_name2 = col_name + str(i + col_count)
-            col_value1 = country_data[col_name1].to_numpy()[0]
-            col_value2 = country_data[col_name2].to_numpy()[0]
-            if col_value1 != "no trams" and col_value1 != "-":
-                tram_activity_by_city[col_value1] = col_value2
+    return (
+        passenger_km_per_capita
+        / occupancy_rate
+        * correction_factor[transport_type]
+        * intensity_non_res_and_ft[transport_type]
+    )
 
-        percent_tram_input = {}
 
-        for city in tram_activity_by_city.keys():
-            if city.lower() in map(str.lower, tram_split.keys()):
-                percent_tram_input[city] = tram_split[city.lower()]
+def build_activity_growth(country_data):
+    # Activity of every transport mode (rows in TRANSPORT_LIST order) in
+    # 2021-2050 relative to 2021
+    return growth_profile([
+        [country_data[col] for col in ACTIVITY_GROWTH_COLUMNS[item[0]]]
+        for item in TRANSPORT_LIST
+    ])
 
-        for year in year_range:
-            if year == 2021:
-                baseline_v[year] = 0
-                for city in percent_tram_input.keys():
-                    baseline_v[year] = baseline_v[year] + (
-                        percent_tram_input[city] / 100 * tram_activity_by_city[city]
-                    )
 
-                baseline_v[year] = baseline_v[year] / occupancy_rate
-            elif 2022 <= year <= 2030:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2020_2030) / 100
-                )
-            elif 2031 <= year <= 2040:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2030_2040) / 100
-                )
-            elif 2041 <= year <= 2050:
-                baseline_v[year] = (
-                    baseline_v[year - 1] * (100 + annual_change_2040_2050) / 100
-                )
+def calculate_baseline_emissions_bus(country_data, area_specific_ef_average, baseline_v):
+    # area_specific_ef_average: (n,) array of the years of baseline_v, see
+    # calculate_area_specific_ef_by_mode
+    timeline = country_data.get_derived(
+        "bus_propulsion_timeline", build_bus_propulsion_timeline
+    )
 
-    return baseline_v
+    year_range = YearAxis.of(baseline_v.keys())
 
+    baseline_emissions_bus = (
+        np.fromiter(baseline_v.values(), dtype=np.float64) * area_specific_ef_average / 1000
+    )
 
-def calculate_baseline_emissions_bus(
-    country_data,
-    settlement_distribution_by_year,
-    grid_electricity_emission_factor,
-    baseline_v,
-):
-    baseline_emissions_bus = {}
-
-    share_road_driving = {
-        "metropolitan_center": country_data.BUS_COL33.to_numpy()[0],
-        "urban": country_data.BUS_COL35.to_numpy()[0],
-        "suburban": country_data.BUS_COL37.to_numpy()[0],
-        "town": country_data.BUS_COL39.to_numpy()[0],
-        "rural": country_data.BUS_COL41.to_numpy()[0],
-    }
-    share_street_driving = {
-        "metropolitan_center": 100 - share_road_driving["metropolitan_center"],
-        "urban": 100 - share_road_driving["urban"],
-        "suburban": 100 - share_road_driving["suburban"],
-        "town": 100 - share_road_driving["town"],
-        "rural": 100 - share_road_driving["rural"],
-    }
+    return (
+        timeline.share_frame(year_range),
+        dict(zip(year_range, baseline_emissions_bus.tolist())),
+    )
 
-    init_propulsion_type = {"petrol", "lpg", "diesel", "cng", "electricity"}
 
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
+class PropulsionTimeline:
+    """
+    Propulsion shares (in %) and street and road driving emission factors of
+    one vehicle type in 2021-2050, as (30, k) arrays with a column for each
+    propulsion type, and the share of road driving in each settlement type.
+    Emission factors of electric propulsion types are per unit of grid
+    electricity emission factor.
+
+    The emission factors averaged over the baseline propulsion shares are
+    precomputed, so per request they only have to be weighted by settlements.
+    """
+    __slots__ = (
+        "types", "columns", "share", "ef_street", "ef_road", "electric",
+        "share_road_driving", "share_street_driving", "average_ef_by_source"
+    )
 
-    for year in baseline_v.keys():
-        propulsion_share[year] = {}
-        baseline_ef_street[year] = {}
-        baseline_ef_road[year] = {}
-
-        for prplsn_type in init_propulsion_type:
-
-            if prplsn_type == "petrol":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL6.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL16.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL21.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "lpg":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL7.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL17.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL22.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "cng":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL9.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL19.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL24.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "electricity":
-                if year == 2021:
-                    share_start_yr = country_data.BUS_COL26.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL27.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_start_yr + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2022 <= year <= 2025:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL26.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL27.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2026 <= year <= 2030:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL27.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL28.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2031 <= year <= 2035:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL28.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL29.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2036 <= year <= 2040:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL29.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL30.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2041 <= year <= 2045:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL30.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL31.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2046 <= year <= 2050:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL31.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL32.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
+    def __init__(self, types, share, ef_street, ef_road, electric_types, share_road_driving):
+        self.types = tuple(types)
+        self.columns = {prplsn_type: column for column, prplsn_type in enumerate(self.types)}
+        self.share = share
+        self.ef_street = ef_street
+        self.ef_road = ef_road
+        self.electric = np.array([prplsn_type in electric_types for prplsn_type in self.types])
+        self.share_road_driving = np.asarray(share_road_driving, dtype=np.float64)
+        self.share_street_driving = 100 - self.share_road_driving
+        self.average_ef_by_source = self._average_ef_by_source(share)
+
+    def _average_ef_by_source(self, share):
+        # (road fuels, street fuels, road electricity, street electricity), each (30, 1)
+        ef_road = self.ef_road * share / 100
+        ef_street = self.ef_street * share / 100
+        fuel = ~self.electric
+        return (
+            ef_road[..., fuel].sum(axis=-1, keepdims=True),
+            ef_street[..., fuel].sum(axis=-1, keepdims=True),
+            ef_road[..., self.electric].sum(axis=-1, keepdims=True),
+            ef_street[..., self.electric].sum(axis=-1, keepdims=True),
+        )
 
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL20.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL25.to_numpy()[
-                    0
-                ]
+    def average_ef(self, grid_electricity_ef, rows=slice(None), share=None):
+        """
+        Returns the road and street driving emission factors averaged over the
+        propulsion types, weighted by share (by default the baseline shares),
+        for the given rows (years) as (n,) arrays. grid_electricity_ef is an
+        (n, 1) array, or 0 if there are no electric propulsion types. The
+        results have the leading axes of share and grid_electricity_ef, if any.
+        """
+        if share is None:
+            average_ef_by_source = self.average_ef_by_source
+        else:
+            average_ef_by_source = self._average_ef_by_source(share)
+        road_fuel, street_fuel, road_electricity, street_electricity = (
+            average[..., rows, :] for average in average_ef_by_source
+        )
 
-    for year in baseline_v.keys():
-        propulsion_share[year]["diesel"] = 100 - (
-            propulsion_share[year]["petrol"]
-            + propulsion_share[year]["lpg"]
-            + propulsion_share[year]["cng"]
-            + propulsion_share[year]["electricity"]
+        return (
+            (road_fuel + road_electricity * grid_electricity_ef)[..., 0],
+            (street_fuel + street_electricity * grid_electricity_ef)[..., 0],
         )
 
-        baseline_ef_street[year]["diesel"] = country_data.BUS_COL18.to_numpy()[0]
-        baseline_ef_road[year]["diesel"] = country_data.BUS_COL23.to_numpy()[0]
+    def share_frame(self, year_range):
+        """
+        Returns the YearFrame of the baseline shares of the years of
+        year_range (consecutive), by year.
+        """
+        year_range = YearAxis.of(year_range)
+        return YearFrame(
+            self.types, self.share[year_range.rows].T.copy(), year_range.start, by_year=True
+        )
 
-    ef_road = {}
-    ef_street = {}
 
-    for year in baseline_v.keys():
-        ef_road[year] = 0
-        ef_street[year] = 0
-
-        for prplsn_type in propulsion_share[year].keys():
-            if prplsn_type == "electricity":
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
+def settlement_distribution_frame(settlement_distribution, year_range):
+    """
+    Returns the YearFrame of a settlement distribution, {settlement type:
+    share in %}, that is the same in all years of year_range.
+    """
+    shares = np.array(
+        [settlement_distribution[settlement_type] for settlement_type in SETTLEMENT_TYPES],
+        dtype=np.float64,
+    )
+    return YearFrame(
+        SETTLEMENT_TYPES,
+        np.repeat(shares[:, np.newaxis], len(year_range), axis=1),
+        YearAxis.of(year_range).start,
+        by_year=True,
+    )
 
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
-            else:
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                )
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                )
 
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
+def calculate_settlement_distribution(settlement_distribution_by_year, year_range):
+    """
+    Returns the settlement distribution (in %) of the years of year_range as
+    an (n, 5) array with a column for each of SETTLEMENT_TYPES.
+    settlement_distribution_by_year is a YearFrame of SETTLEMENT_TYPES, its
+    leading axes (if any) lead the result.
+    """
+    columns = YearAxis.of(year_range).array - settlement_distribution_by_year.start
+    return np.stack([
+        settlement_distribution_by_year[settlement_type].array[..., columns]
+        for settlement_type in SETTLEMENT_TYPES
+    ], axis=-1).astype(np.float64)
 
-    area_specific_ef_average = {}
 
-    for year in baseline_v.keys():
-        area_specific_ef_average[year] = 0
-
-        for settlement_type in share_road_driving.keys():
-            area_specific_ef_average[year] = (
-                area_specific_ef_average[year]
-                + (
-                    ef_road[year] * share_road_driving[settlement_type] / 100
-                    + ef_street[year] * share_street_driving[settlement_type] / 100
-                )
-                * settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+def calculate_area_specific_ef(ef_road, ef_street, share_road_driving, settlement_distribution):
+    """
+    Returns the road and street driving emission factors weighted by the
+    share of road driving in each settlement type (share_road_driving, (5,)
+    or (m, 5) for m transport modes) and the settlement distribution of each
+    year ((n, 5), see calculate_settlement_distribution). The emission
+    factors are (n,) or (n, m) arrays, as is the result. The settlement
+    distribution and the emission factors may have leading axes.
+    """
+    share_road_driving = np.asarray(share_road_driving)
 
-        baseline_emissions_bus[year] = (
-            baseline_v[year] * area_specific_ef_average[year] / 1000
-        )
+    road_weight = settlement_distribution @ share_road_driving.T / 100 / 100
+    street_weight = settlement_distribution @ (100 - share_road_driving).T / 100 / 100
 
-    return propulsion_share, baseline_emissions_bus
+    return ef_road * road_weight + ef_street * street_weight
 
 
-def calculate_baseline_emissions_car(
-    country_data, settlement_distribution_by_year, baseline_v
-):
-    baseline_emissions_car = {}
-
-    share_road_driving = {
-        "metropolitan_center": country_data.CAR_COL59.to_numpy()[0],
-        "urban": country_data.CAR_COL60.to_numpy()[0],
-        "suburban": country_data.CAR_COL61.to_numpy()[0],
-        "town": country_data.CAR_COL62.to_numpy()[0],
-        "rural": country_data.CAR_COL63.to_numpy()[0],
-    }
-    share_street_driving = {}
-    for settlement_type in share_road_driving.keys():
-        share_street_driving[settlement_type] = (
-            100 - share_road_driving[settlement_type]
+class SettlementIndependentEF:
+    """
+    Road and street driving emission factors of SETTLEMENT_WEIGHTED_MODES in
+    2021-2050 without policies, as an (m, 30, 2) array [mode, year,
+    road/street], and the share of road driving of each mode in each
+    settlement type, as an (m, 5) array.
+
+    None of it depends on a request, so it is built once per country. The
+    settlement distribution of a request (baseline, new development or
+    policy) is only needed for the weighting (see weight).
+    """
+    __slots__ = ("modes", "ef", "share_road_driving")
+
+    def __init__(self, timelines, grid_electricity_ef):
+        # timelines: PropulsionTimeline of each mode, grid_electricity_ef:
+        # the factor of its electric propulsion types, 0 or a (30, 1) array
+        self.modes = SETTLEMENT_WEIGHTED_MODES
+        self.ef = np.stack([
+            np.stack(timelines[mode].average_ef(grid_electricity_ef[mode]), axis=-1)
+            for mode in self.modes
+        ])
+        self.share_road_driving = np.stack(
+            [timelines[mode].share_road_driving for mode in self.modes]
+        )
+
+    def weight(self, settlement_distribution, rows=slice(None)):
+        """
+        Returns {mode: (n,) array} of the area specific emission factors of
+        the given rows (years) weighted by settlement_distribution, see
+        calculate_area_specific_ef.
+        """
+        ef = self.ef[:, rows]
+        area_specific_ef = calculate_area_specific_ef(
+            ef[..., 0].T, ef[..., 1].T, self.share_road_driving, settlement_distribution
         )
+        return dict(zip(self.modes, np.moveaxis(area_specific_ef, -1, 0)))
 
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
 
-    for year in baseline_v.keys():
-        propulsion_share[year] = {
-            "lpg": country_data.CAR_COL9.to_numpy()[0],
-            "cng": country_data.CAR_COL10.to_numpy()[0],
-            "ngv": country_data.CAR_COL11.to_numpy()[0],
-            "petrol": country_data.CAR_COL12.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL13.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL14.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL14.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL15.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL16.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL17.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL17.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL18.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL19.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL20.to_numpy()[0],
-            "bifuel": country_data.CAR_COL21.to_numpy()[0],
-            "other": country_data.CAR_COL22.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL23.to_numpy()[0],
-        }
+def build_settlement_independent_ef(country_data):
+    # Baseline emission factors of buses (electricity weighted by the grid
+    # emission factor), cars (electricity not weighted) and road freight
+    # (electricity not weighted)
+    grid_electricity_ef = country_data.get_derived(
+        "grid_electricity_ef", build_grid_electricity_emission_factor
+    )
+    return SettlementIndependentEF(
+        {
+            "bus": country_data.get_derived(
+                "bus_propulsion_timeline", build_bus_propulsion_timeline
+            ),
+            "car": country_data.get_derived(
+                "car_propulsion_timeline", build_car_propulsion_timeline
+            ),
+            "road_transport": country_data.get_derived(
+                "road_transport_propulsion_timeline", build_road_transport_propulsion_timeline
+            ),
+        },
+        {
+            "bus": np.fromiter(grid_electricity_ef.values(), dtype=np.float64)[:, np.newaxis],
+            "car": 0,
+            "road_transport": 1,
+        },
+    )
 
-        if year > 2021:
-            propulsion_share[year]["petrol"] = (
-                propulsion_share[2021]["petrol"]
-                / (propulsion_share[2021]["petrol"] + propulsion_share[2021]["diesel"])
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol"]
-                        + propulsion_share[year]["diesel"]
-                        + propulsion_share[year]["p_e_phev"]
-                        + propulsion_share[year]["d_e_phev"]
-                    )
-                )
-            )
 
-            propulsion_share[year]["diesel"] = (
-                propulsion_share[2021]["diesel"]
-                / (propulsion_share[2021]["petrol"] + propulsion_share[2021]["diesel"])
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol"]
-                        + propulsion_share[year]["diesel"]
-                        + propulsion_share[year]["p_e_phev"]
-                        + propulsion_share[year]["d_e_phev"]
-                    )
-                )
-            )
+def calculate_area_specific_ef_by_mode(country_data, settlement_distribution_by_year, year_range):
+    """
+    Returns {mode: (n,) array} of the baseline area specific emission factors
+    of SETTLEMENT_WEIGHTED_MODES in the years of year_range.
+    """
+    year_range = YearAxis.of(year_range)
+    settlement_independent_ef = country_data.get_derived(
+        "settlement_independent_ef", build_settlement_independent_ef
+    )
+    return settlement_independent_ef.weight(
+        calculate_settlement_distribution(settlement_distribution_by_year, year_range),
+        year_range.rows,
+    )
 
-        baseline_ef_road[year] = {
-            "lpg": country_data.CAR_COL39.to_numpy()[0],
-            "cng": country_data.CAR_COL40.to_numpy()[0],
-            "ngv": country_data.CAR_COL41.to_numpy()[0],
-            "petrol": country_data.CAR_COL42.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL43.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL44.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL44.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL45.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL46.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL47.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL47.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL48.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL49.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL50.to_numpy()[0],
-            "bifuel": country_data.CAR_COL51.to_numpy()[0],
-            "other": country_data.CAR_COL52.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL53.to_numpy()[0],
-        }
 
-        baseline_ef_street[year] = {
-            "lpg": country_data.CAR_COL24.to_numpy()[0],
-            "cng": country_data.CAR_COL25.to_numpy()[0],
-            "ngv": country_data.CAR_COL26.to_numpy()[0],
-            "petrol": country_data.CAR_COL27.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL28.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL29.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL29.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL30.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL31.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL32.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL32.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL33.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL34.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL35.to_numpy()[0],
-            "bifuel": country_data.CAR_COL36.to_numpy()[0],
-            "other": country_data.CAR_COL37.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL38.to_numpy()[0],
-        }
+def build_bus_propulsion_timeline(country_data):
+    # Propulsion shares and emission factors of buses for every year 2021-2050.
+    # The share of electric buses moves linearly between the targets of every
+    # 5 years (BUS_COL26 ... BUS_COL32), diesel makes up the rest.
+    electricity_targets = np.array([country_data["BUS_COL%d" % i] for i in range(26, 33)])
+    annual_increase = np.diff(electricity_targets) / 5
+    electricity_share = electricity_targets[0] + annual_increase[0] + np.concatenate(
+        ([0.0], np.cumsum(annual_increase[_BUS_ELECTRICITY_PERIODS]))
+    )
 
-    ef_road = {}
-    ef_street = {}
+    share = np.empty((len(YEARS), len(BUS_PROPULSION_TYPES)))
+    share[:, 0] = country_data.BUS_COL6  # petrol
+    share[:, 1] = country_data.BUS_COL7  # lpg
+    share[:, 2] = country_data.BUS_COL9  # cng
+    share[:, 3] = electricity_share
+    share[:, 4] = 100 - share[:, :4].sum(axis=1)  # diesel
+
+    ef_street = np.array([
+        country_data.BUS_COL16,
+        country_data.BUS_COL17,
+        country_data.BUS_COL19,
+        country_data.BUS_COL20,
+        country_data.BUS_COL18,
+    ])
+    ef_road = np.array([
+        country_data.BUS_COL21,
+        country_data.BUS_COL22,
+        country_data.BUS_COL24,
+        country_data.BUS_COL25,
+        country_data.BUS_COL23,
+    ])
+
+    return PropulsionTimeline(
+        BUS_PROPULSION_TYPES,
+        share,
+        np.tile(ef_street, (len(YEARS), 1)),
+        np.tile(ef_road, (len(YEARS), 1)),
+        {"electricity"},
+        [country_data["BUS_COL%d" % i] for i in (33, 35, 37, 39, 41)],
+    )
 
-    for year in baseline_v.keys():
-        ef_road[year] = 0
-        ef_street[year] = 0
 
-        for prplsn_type in propulsion_share[year].keys():
-            ef_road_pt = (
-                baseline_ef_road[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
-            ef_street_pt = (
-                baseline_ef_street[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
+def calculate_baseline_emissions_car(country_data, area_specific_ef_average, baseline_v):
+    # area_specific_ef_average: (n,) array of the years of baseline_v, see
+    # calculate_area_specific_ef_by_mode
+    timeline = country_data.get_derived(
+        "car_propulsion_timeline", build_car_propulsion_timeline
+    )
 
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
+    year_range = YearAxis.of(baseline_v.keys())
 
-    area_specific_ef_average = {}
+    baseline_emissions_car = (
+        np.fromiter(baseline_v.values(), dtype=np.float64) * area_specific_ef_average / 1000
+    )
 
-    for year in baseline_v.keys():
-        area_specific_ef_average[year] = 0
-
-        for settlement_type in share_road_driving.keys():
-            area_specific_ef_average[year] = (
-                area_specific_ef_average[year]
-                + (
-                    ef_road[year] * share_road_driving[settlement_type] / 100
-                    + ef_street[year] * share_street_driving[settlement_type] / 100
-                )
-                * settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+    return (
+        timeline.share_frame(year_range),
+        dict(zip(year_range, baseline_emissions_car.tolist())),
+    )
 
-        baseline_emissions_car[year] = (
-            baseline_v[year] * area_specific_ef_average[year] / 1000
+
+def build_car_propulsion_timeline(country_data):
+    # Propulsion shares and emission factors of cars for every year 2021-2050.
+    # Plug-in hybrids are split half and half into fuel and electricity.
+    def car_columns(first_col):
+        # Values of the propulsion types in CAR_PROPULSION_TYPES order, whose
+        # 15 columns start at first_col
+        values = [country_data["CAR_COL%d" % (first_col + i)] for i in range(15)]
+        return np.array(
+            values[:5] + [values[5] * 0.5, values[5] * 0.5]
+            + values[6:8] + [values[8] * 0.5, values[8] * 0.5]
+            + values[9:]
         )
 
-    return propulsion_share, baseline_emissions_car
+    columns = {prplsn_type: i for i, prplsn_type in enumerate(CAR_PROPULSION_TYPES)}
+
+    share_2021 = car_columns(9)
+    share = np.tile(share_2021, (len(YEARS), 1))
+
+    # From 2022 on, petrol and diesel keep their 2021 proportion and make up
+    # what the other propulsion types (except for the plug-in hybrids'
+    # fuel halves) leave
+    petrol = share_2021[columns["petrol"]]
+    diesel = share_2021[columns["diesel"]]
+    rest = 100 - (
+        share_2021.sum()
+        - (petrol + diesel + share_2021[columns["p_e_phev"]] + share_2021[columns["d_e_phev"]])
+    )
+    share[1:, columns["petrol"]] = petrol / (petrol + diesel) * rest
+    share[1:, columns["diesel"]] = diesel / (petrol + diesel) * rest
+
+    return PropulsionTimeline(
+        CAR_PROPULSION_TYPES,
+        share,
+        np.tile(car_columns(24), (len(YEARS), 1)),
+        np.tile(car_columns(39), (len(YEARS), 1)),
+        set(),
+        [country_data["CAR_COL%d" % i] for i in range(59, 64)],
+    )
 
 
 def calculate_baseline_emissions_metro(
@@ -1406,7 +1600,7 @@ def calculate_baseline_emissions_metro(
     ef_metro = {}
 
     for year in baseline_v.keys():
-        electric_energy_consumption[year] = country_data.METRO_COL3.to_numpy()[0]
+        electric_energy_consumption[year] = country_data.METRO_COL3
         ef_metro[year] = (
             electric_energy_consumption[year] * grid_electricity_emission_factor[year]
         )
@@ -1433,7 +1627,7 @@ def calculate_baseline_emissions_tram(
     ef_tram = {}
 
     for year in baseline_v.keys():
-        electric_energy_consumption[year] = country_data.TRAM_COL3.to_numpy()[0]
+        electric_energy_consumption[year] = country_data.TRAM_COL3
         ef_tram[year] = (
             electric_energy_consumption[year] * grid_electricity_emission_factor[year]
         )
@@ -1461,10 +1655,10 @@ def calculate_baseline_emissions_train(
     ef_diesel_train = {}
 
     for year in baseline_v.keys():
-        share_electric_engine[year] = country_data.TRAIN_COL5.to_numpy()[0]
+        share_electric_engine[year] = country_data.TRAIN_COL5
         share_diesel_engine[year] = 100 - share_electric_engine[year]
-        electric_energy_consumption[year] = country_data.TRAIN_COL4.to_numpy()[0]
-        ef_diesel_train[year] = country_data.TRAIN_COL3.to_numpy()[0]
+        electric_energy_consumption[year] = country_data.TRAIN_COL4
+        ef_diesel_train[year] = country_data.TRAIN_COL3
 
     ef_train = {}
 
@@ -1492,10 +1686,10 @@ def calculate_baseline_emissions_rail_transport(
     ef_diesel_transport = {}
 
     for year in baseline_v.keys():
-        share_electric_engine[year] = country_data.RAIL_TRN_COL4.to_numpy()[0]
+        share_electric_engine[year] = country_data.RAIL_TRN_COL4
         share_diesel_engine[year] = 100 - share_electric_engine[year]
-        electric_energy_consumption[year] = country_data.RAIL_TRN_COL3.to_numpy()[0]
-        ef_diesel_transport[year] = country_data.RAIL_TRN_COL2.to_numpy()[0]
+        electric_energy_consumption[year] = country_data.RAIL_TRN_COL3
+        ef_diesel_transport[year] = country_data.RAIL_TRN_COL2
 
     ef_rail_transport = {}
 
@@ -1515,142 +1709,43 @@ def calculate_baseline_emissions_rail_transport(
 
 
 def calculate_baseline_emissions_road_transport(
-    country_data, settlement_distribution_by_year, baseline_v
+    country_data, area_specific_ef_average, baseline_v
 ):
-    baseline_emissions_road_transport = {}
-
-    share_road_driving = {
-        "metropolitan_center": country_data.ROAD_TRN_COL38.to_numpy()[0],
-        "urban": country_data.ROAD_TRN_COL39.to_numpy()[0],
-        "suburban": country_data.ROAD_TRN_COL40.to_numpy()[0],
-        "town": country_data.ROAD_TRN_COL41.to_numpy()[0],
-        "rural": country_data.ROAD_TRN_COL42.to_numpy()[0],
-    }
-    share_street_driving = {}
-    for settlement_type in share_road_driving.keys():
-        share_street_driving[settlement_type] = (
-            100 - share_road_driving[settlement_type]
-        )
-
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
-
-    for year in baseline_v.keys():
-        propulsion_share[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL11.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL12.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL13.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL14.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL15.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL16.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL17.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL18.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL19.to_numpy()[0],
-        }
-
-        if year > 2021:
-            propulsion_share[year]["petrol_hybrid"] = (
-                propulsion_share[2021]["petrol_hybrid"]
-                / (
-                    propulsion_share[2021]["petrol_hybrid"]
-                    + propulsion_share[2021]["diesel_hybrid"]
-                )
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol_hybrid"]
-                        + propulsion_share[year]["diesel_hybrid"]
-                    )
-                )
-            )
-
-            propulsion_share[year]["diesel_hybrid"] = (
-                propulsion_share[2021]["diesel_hybrid"]
-                / (
-                    propulsion_share[2021]["petrol_hybrid"]
-                    + propulsion_share[2021]["diesel_hybrid"]
-                )
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol_hybrid"]
-                        + propulsion_share[year]["diesel_hybrid"]
-                    )
-                )
-            )
-
-        baseline_ef_road[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL29.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL30.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL31.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL32.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL33.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL34.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL35.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL36.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL37.to_numpy()[0],
-        }
-
-        baseline_ef_street[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL20.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL21.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL22.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL23.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL24.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL25.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL26.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL27.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL28.to_numpy()[0],
-        }
-
-    ef_road = {}
-    ef_street = {}
+    # area_specific_ef_average: (n,) array of the years of baseline_v, see
+    # calculate_area_specific_ef_by_mode
+    baseline_emissions_road_transport = (
+        np.fromiter(baseline_v.values(), dtype=np.float64) * area_specific_ef_average / 1000
+    )
 
-    for year in baseline_v.keys():
-        ef_road[year] = 0
-        ef_street[year] = 0
+    return dict(zip(baseline_v.keys(), baseline_emissions_road_transport.tolist()))
 
-        for prplsn_type in propulsion_share[year].keys():
-            ef_road_pt = (
-                baseline_ef_road[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
-            ef_street_pt = (
-                baseline_ef_street[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
 
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
+def build_road_transport_propulsion_timeline(country_data):
+    # Propulsion shares and emission factors of road freight for every year
+    # 2021-2050. From 2022 on, petrol and diesel hybrids keep their 2021
+    # proportion and make up what the other propulsion types leave.
+    columns = {prplsn_type: i for i, prplsn_type in enumerate(ROAD_TRANSPORT_PROPULSION_TYPES)}
 
-    area_specific_ef_average = {}
+    def road_transport_columns(first_col):
+        return np.array([country_data["ROAD_TRN_COL%d" % (first_col + i)] for i in range(9)])
 
-    for year in baseline_v.keys():
-        area_specific_ef_average[year] = 0
-
-        for settlement_type in share_road_driving.keys():
-            area_specific_ef_average[year] = (
-                area_specific_ef_average[year]
-                + (
-                    ef_road[year] * share_road_driving[settlement_type] / 100
-                    + ef_street[year] * share_street_driving[settlement_type] / 100
-                )
-                * settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+    share_2021 = road_transport_columns(11)
+    share = np.tile(share_2021, (len(YEARS), 1))
 
-        baseline_emissions_road_transport[year] = (
-            baseline_v[year] * area_specific_ef_average[year] / 1000
-        )
+    petrol_hybrid = share_2021[columns["petrol_hybrid"]]
+    diesel_hybrid = share_2021[columns["diesel_hybrid"]]
+    rest = 100 - (share_2021.sum() - (petrol_hybrid + diesel_hybrid))
+    share[1:, columns["petrol_hybrid"]] = petrol_hybrid / (petrol_hybrid + diesel_hybrid) * rest
+    share[1:, columns["diesel_hybrid"]] = diesel_hybrid / (petrol_hybrid + diesel_hybrid) * rest
 
-    return baseline_emissions_road_transport
+    return PropulsionTimeline(
+        ROAD_TRANSPORT_PROPULSION_TYPES,
+        share,
+        np.tile(road_transport_columns(20), (len(YEARS), 1)),
+        np.tile(road_transport_columns(29), (len(YEARS), 1)),
+        {"electricity"},
+        [country_data["ROAD_TRN_COL%d" % i] for i in range(38, 43)],
+    )
 
 
 def calculate_baseline_emissions_waterways_transport(country_data, baseline_v):
@@ -1659,7 +1754,7 @@ def calculate_baseline_emissions_waterways_transport(country_data, baseline_v):
     ef_waterways_transport = {}
 
     for year in baseline_v.keys():
-        ef_waterways_transport[year] = country_data.WATER_TRN_COL2.to_numpy()[0]
+        ef_waterways_transport[year] = country_data.WATER_TRN_COL2
 
         baseline_emissions_waterways_transport[year] = (
             baseline_v[year] * ef_waterways_transport[year] / 1000
@@ -1671,8 +1766,7 @@ def calculate_baseline_emissions_waterways_transport(country_data, baseline_v):
 # NEW DEVELOPMENT - U2 ########################################
 
 
-def calculate_new_development(baseline, baseline_result, baseline_v, new_development):
-    country = baseline["country"]
+def calculate_new_development(context, baseline, baseline_result, baseline_v, new_development):
     beginning_year = baseline["year"]
     old_settlement_distribution = baseline["settlement_distribution"]
 
@@ -1693,28 +1787,7 @@ def calculate_new_development(baseline, baseline_result, baseline_v, new_develop
     if year_start < beginning_year:
         year_start = beginning_year
 
-    # Check if country name contains local-dataset name
-    # If so, removes country name
-    country_ORG = country
-    country_code_separator = " & "
-    if country_code_separator in country:
-        country = country.split(country_code_separator, 1)[1]
-
-    country_data = check_local_data(country)
-
-    if country_data.empty:
-        if country_code_separator in country_ORG:
-            country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Transport_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
-
-        country_data = df.loc[df["country"] == country]
-
-    # Check if country data is still empty after checking local
-    if country_data.empty:
-        return {"status": "invalid", "message": "Country data not found."}
+    country_data = context.country_data
 
     new_residents_by_year = calculate_residents_after_new_development(
         year_range, country_data, new_residents, year_start, year_finish
@@ -1735,20 +1808,12 @@ def calculate_new_development(baseline, baseline_result, baseline_v, new_develop
             country_data, transport_type
         )
 
-    old_settlement_distribution_by_year = {}
-    new_settlement_distribution_by_year = {}
-
-    for year in year_range:
-        old_settlement_distribution_by_year[year] = {}
-        new_settlement_distribution_by_year[year] = {}
-
-        for settlement_type in old_settlement_distribution.keys():
-            old_settlement_distribution_by_year[year][
-                settlement_type
-            ] = old_settlement_distribution[settlement_type]
-            new_settlement_distribution_by_year[year][
-                settlement_type
-            ] = new_settlement_distribution[settlement_type]
+    old_settlement_distribution_by_year = settlement_distribution_frame(
+        old_settlement_distribution, year_range
+    )
+    new_settlement_distribution_by_year = settlement_distribution_frame(
+        new_settlement_distribution, year_range
+    )
 
     old_correction_factors = calculate_correction_factors(
         transport_mode_weights, old_settlement_distribution_by_year
@@ -1783,62 +1848,25 @@ def calculate_new_development(baseline, baseline_result, baseline_v, new_develop
         calculate_new_baseline_emissions(
         year_range,
         baseline_v,
-        country_data,
+        context,
         old_correction_factors,
         adjusted_settlement_distribution_by_year,
         new_population_by_year,
         weighted_cf_by_transport_year,
     )
 
-    new_baseline_emissions["total"] = {}
-
-    for year in year_range:
-        new_baseline_emissions["total"][year] = \
-            new_baseline_emissions["bus"][year] + \
-            new_baseline_emissions["car"][year] + \
-            new_baseline_emissions["metro"][year] + \
-            new_baseline_emissions["tram"][year] + \
-            new_baseline_emissions["train"][year] + \
-            new_baseline_emissions["rail_transport"][year] + \
-            new_baseline_emissions["road_transport"][year] + \
-            new_baseline_emissions["waterways_transport"][year]
-
-    new_baseline_absolute_emissions = {}
-
-    for transport_type in new_baseline_emissions.keys():
-        new_baseline_absolute_emissions[transport_type] = {}
-
-        for year in year_range:
-            new_baseline_absolute_emissions[transport_type][year] = round(
-                new_baseline_emissions[transport_type][year]
-                * new_population_by_year[year]
-                / 1000,
-                3,
-            )
-
-            new_baseline_emissions[transport_type][year] = round(
-                new_baseline_emissions[transport_type][year], 3
-            )
-
-    for year in year_range:
-        for settlement_type in adjusted_settlement_distribution_by_year[year].keys():
-            adjusted_settlement_distribution_by_year[year][settlement_type] = round(
-                adjusted_settlement_distribution_by_year[year][settlement_type], 3
-            )
+    new_population = YearSeries.from_dict(new_population_by_year)
 
-            # Replacing NANs (if any) with ZEROs
-            if math.isnan(
-                adjusted_settlement_distribution_by_year[year][settlement_type]
-            ):
-                adjusted_settlement_distribution_by_year[year][settlement_type] = 0.0
+    new_baseline_absolute_emissions = (
+        new_baseline_emissions * new_population.array / 1000
+    ).round(3)
+    new_baseline_emissions = new_baseline_emissions.round(3)
 
-    for year in year_range:
-        # Replacing NANs (if any) with ZEROs
-        if math.isnan(new_residents_by_year[year]):
-            new_residents_by_year[year] = 0
-        # Replacing NANs (if any) with ZEROs
-        if math.isnan(new_population_by_year[year]):
-            new_population_by_year[year] = 0
+    # Replacing NANs (if any) with ZEROs
+    adjusted_settlement_distribution_by_year = adjusted_settlement_distribution_by_year.round(3, builtin=True)
+    adjusted_settlement_distribution_by_year.array[
+        np.isnan(adjusted_settlement_distribution_by_year.array)
+    ] = 0.0
 
     return (
         adjusted_settlement_distribution_by_year,
@@ -1849,11 +1877,11 @@ def calculate_new_development(baseline, baseline_result, baseline_v, new_develop
         grid_electricity_emission_factor,
         {
             "impact": {
-                "new_residents": new_residents_by_year,
-                "population": new_population_by_year,
+                "new_residents": YearSeries.from_dict(new_residents_by_year),
+                "population": new_population,
                 "settlement_distribution": adjusted_settlement_distribution_by_year,
-                "emissions": new_baseline_emissions,
-                "absolute_emissions": new_baseline_absolute_emissions,
+                "emissions": dict(new_baseline_emissions.items()),
+                "absolute_emissions": dict(new_baseline_absolute_emissions.items()),
             }
         },
     )
@@ -1870,9 +1898,9 @@ def calculate_residents_after_new_development(
 
     residents = {}
 
-    annual_change_2020_2030 = country_data.POP_COL1.to_numpy()[0]
-    annual_change_2030_2040 = country_data.POP_COL2.to_numpy()[0]
-    annual_change_2040_2050 = country_data.POP_COL3.to_numpy()[0]
+    annual_change_2020_2030 = country_data.POP_COL1
+    annual_change_2030_2040 = country_data.POP_COL2
+    annual_change_2040_2050 = country_data.POP_COL3
 
     for year in year_range:
         residents[year] = 0
@@ -1920,39 +1948,29 @@ def calculate_adjusted_settlement_distribution_by_year(
     new_settlement_distribution_by_year,
     new_residents_by_year,
 ):
-    adjusted_settlement_distribution_by_year = {}
-
-    for year in old_settlement_distribution_by_year.keys():
-        adjusted_settlement_distribution_by_year[year] = {}
-
-        for settlement_type in old_settlement_distribution_by_year[year].keys():
-            if (old_population_by_year[year] + new_residents_by_year[year]) == 0:
-                adjusted_settlement_distribution_by_year[year][settlement_type] = 0
-            else:
-                adjusted_settlement_distribution_by_year[year][settlement_type] = float(
-                    (
-                        old_settlement_distribution_by_year[year][settlement_type]
-                        * (
-                            old_population_by_year[year]
-                            / (
-                                old_population_by_year[year]
-                                + new_residents_by_year[year]
-                            )
-                        )
-                    )
-                    + (
-                        new_settlement_distribution_by_year[year][settlement_type]
-                        * (
-                            new_residents_by_year[year]
-                            / (
-                                old_population_by_year[year]
-                                + new_residents_by_year[year]
-                            )
-                        )
-                    )
-                )
+    """
+    Returns the YearFrame of the settlement distribution of the old
+    population and the new residents together.
+    """
+    year_range = old_settlement_distribution_by_year.years
+    old_population = np.array([old_population_by_year[year] for year in year_range])
+    new_residents = np.array([new_residents_by_year[year] for year in year_range])
+    population = old_population + new_residents
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adjusted_settlement_distribution = np.where(
+            population == 0,
+            0.0,
+            old_settlement_distribution_by_year.array * (old_population / population)
+            + new_settlement_distribution_by_year.array * (new_residents / population),
+        )
 
-    return adjusted_settlement_distribution_by_year
+    return YearFrame(
+        old_settlement_distribution_by_year.labels,
+        adjusted_settlement_distribution,
+        year_range.start,
+        by_year=True,
+    )
 
 
 def calculate_weighted_correction_factors(
@@ -1988,7 +2006,7 @@ def calculate_weighted_correction_factors(
 def calculate_new_baseline_emissions(
     year_range,
     baseline_v,
-    country_data,
+    context,
     old_correction_factors,
     adjusted_settlement_distribution_by_year,
     new_population_by_year,
@@ -1996,9 +2014,8 @@ def calculate_new_baseline_emissions(
 ):
     new_baseline_emissions = {}
 
-    grid_electricity_emission_factor = calculate_grid_electricity_emission_factor(
-        year_range, country_data
-    )
+    country_data = context.country_data
+    grid_electricity_emission_factor = YearSeries.from_dict(context.grid_electricity_emission_factor)
 
     u2_emissions = {}
     cf_impact_factor = {}
@@ -2006,33 +2023,7 @@ def calculate_new_baseline_emissions(
     modal_split_u2 = {}
 
     for transport_type in old_correction_factors.keys():
-        if transport_type == "bus":
-            occupancy_rate = country_data.BUS_COL2.to_numpy()[0]
-            average_load = 1
-        elif transport_type == "car":
-            occupancy_rate = country_data.CAR_COL2.to_numpy()[0]
-            average_load = 1
-        elif transport_type == "metro":
-            occupancy_rate = country_data.METRO_COL2.to_numpy()[0]
-            average_load = 1
-        elif transport_type == "tram":
-            occupancy_rate = country_data.TRAM_COL2.to_numpy()[0]
-            average_load = 1
-        elif transport_type == "train":
-            occupancy_rate = country_data.TRAIN_COL2.to_numpy()[0]
-            average_load = 1
-        elif transport_type == "rail_transport":
-            occupancy_rate = 1  # Fixed for now
-            average_load = country_data.RAIL_TRN_COL13.to_numpy()[0]
-        elif transport_type == "road_transport":
-            occupancy_rate = 1  # Fixed for now
-            average_load = country_data.ROAD_TRN_COL43.to_numpy()[0]
-        elif transport_type == "waterways_transport":
-            occupancy_rate = 1  # Fixed for now
-            average_load = country_data.WATER_TRN_COL11.to_numpy()[0]
-        else:
-            occupancy_rate = 0
-            average_load = 0
+        occupancy_rate, average_load = get_occupancy_rate_and_load(country_data, transport_type)
 
         cf_impact_factor[transport_type] = {}
         new_baseline_v[transport_type] = {}
@@ -2056,13 +2047,17 @@ def calculate_new_baseline_emissions(
                 new_baseline_v[transport_type][year] * occupancy_rate * average_load
             )
 
+    # Only the settlement weighting depends on the new development
+    area_specific_ef = calculate_area_specific_ef_by_mode(
+        country_data, adjusted_settlement_distribution_by_year, year_range
+    )
+
     for transport_type in old_correction_factors.keys():
         if transport_type == "bus":
             bus_propulsion_share, new_baseline_emissions[transport_type] = \
                 calculate_baseline_emissions_bus(
                 country_data,
-                adjusted_settlement_distribution_by_year,
-                grid_electricity_emission_factor,
+                area_specific_ef[transport_type],
                 new_baseline_v[transport_type],
             )
 
@@ -2070,7 +2065,7 @@ def calculate_new_baseline_emissions(
             car_propulsion_share, new_baseline_emissions[transport_type] = \
                 calculate_baseline_emissions_car(
                 country_data,
-                adjusted_settlement_distribution_by_year,
+                area_specific_ef[transport_type],
                 baseline_v[transport_type],
             )
 
@@ -2111,7 +2106,7 @@ def calculate_new_baseline_emissions(
                 transport_type
             ] = calculate_baseline_emissions_road_transport(
                 country_data,
-                adjusted_settlement_distribution_by_year,
+                area_specific_ef[transport_type],
                 baseline_v[transport_type],
             )
 
@@ -2122,22 +2117,42 @@ def calculate_new_baseline_emissions(
                 country_data, baseline_v[transport_type]
             )
 
-        for year in year_range:
-            # Replacing NANs (if any) with ZEROs
-            if math.isnan(new_baseline_emissions[transport_type][year]):
-                new_baseline_emissions[transport_type][year] = 0.0
-
     return modal_split_u2, \
            bus_propulsion_share, \
            car_propulsion_share, \
            grid_electricity_emission_factor, \
-           new_baseline_emissions
+           emissions_frame(list(old_correction_factors), new_baseline_emissions, year_range)
 
 
-def calculate_modal_split_percentage(selected_year, modal_split_u2):
-    modal_split_percentage = {}
-
-    modal_split_percentage["passenger_transport"] = {}
+def get_occupancy_rate_and_load(country_data, transport_type):
+    """
+    Returns the occupancy rate and average load of a transport mode, by which
+    its activity is multiplied in the modal split.
+    """
+    if transport_type == "bus":
+        return country_data.BUS_COL2, 1
+    if transport_type == "car":
+        return country_data.CAR_COL2, 1
+    if transport_type == "metro":
+        return country_data.METRO_COL2, 1
+    if transport_type == "tram":
+        return country_data.TRAM_COL2, 1
+    if transport_type == "train":
+        return country_data.TRAIN_COL2, 1
+    # Freight occupancy rates are fixed for now
+    if transport_type == "rail_transport":
+        return 1, country_data.RAIL_TRN_COL13
+    if transport_type == "road_transport":
+        return 1, country_data.ROAD_TRN_COL43
+    if transport_type == "waterways_transport":
+        return 1, country_data.WATER_TRN_COL11
+    return 0, 0
+
+
+def calculate_modal_split_percentage(selected_year, modal_split_u2):
+    modal_split_percentage = {}
+
+    modal_split_percentage["passenger_transport"] = {}
     passenger_transport_modes = ["bus", "car", "metro", "tram", "train"]
 
     for year in modal_split_u2["bus"].keys():
@@ -2198,6 +2213,7 @@ def calculate_modal_split_percentage(selected_year, modal_split_u2):
 
 
 def calculate_policy_quantification(
+    context,
     baseline,
     policy_quantification,
     baseline_v,
@@ -2206,131 +2222,72 @@ def calculate_policy_quantification(
     new_development_result,
     correction_factor,
     modal_split_u2,
+    settlement_weights=None,
 ):
-    country = baseline["country"]
+    """
+    Returns the absolute and per capita emissions with the policies of
+    policy_quantification. settlement_weights are those of
+    calculate_policy_settlement_weights, computed here if not given.
+    """
     beginning_year = baseline["year"]
 
     year_range = new_development_result["impact"]["population"].keys()
     new_emissions = new_development_result["impact"]["emissions"]
     new_population = new_development_result["impact"]["population"]
 
-    # Check if country name contains local-dataset name
-    # If so, removes country name
-    country_ORG = country
-    country_code_separator = " & "
-    if country_code_separator in country:
-        country = country.split(country_code_separator, 1)[1]
-
-    country_data = check_local_data(country)
-
-    if country_data.empty:
-        if country_code_separator in country_ORG:
-            country = country_ORG.split(country_code_separator, 1)[0]
-        df = pd.read_csv(
-            "CSVfiles/Transport_full_dataset.csv", skiprows=7
-        )  # Skipping first 7 lines to ensure headers are correct
-        df.fillna(0, inplace=True)
-
-        country_data = df.loc[df["country"] == country]
-
-    # Check if country data is still empty after checking local
-    if country_data.empty:
-        return {"status": "invalid", "message": "Country data not found."}
-
-    # U3.1 ########################################
-    passenger_mobility = policy_quantification["passenger_mobility"]
-    expected_change_u31 = passenger_mobility["expected_change"]
-    population_affected_u31 = passenger_mobility[
-        "affected_area"
-    ]  # Name needs to fixed on FE
-    year_start_u31 = passenger_mobility["year_start"]
-    year_end_u31 = passenger_mobility["year_end"]
-
-    if year_start_u31 > year_end_u31:
-        # Switching years
-        tmp = year_start_u31
-        year_start_u31 = year_end_u31
-        year_end_u31 = tmp
-
-    if year_start_u31 < beginning_year:
-        year_start_u31 = beginning_year
-
-    policy_impact_passenger_mobility = calculate_policy_impact_passenger_mobility(
-        year_range,
-        expected_change_u31,
-        population_affected_u31,
-        modal_split_u2,
-        year_start_u31,
-        year_end_u31,
-    )
-
-    # U3.2 ########################################
-    freight_transport = policy_quantification["freight_transport"]
-    expected_change_u32 = freight_transport["expected_change"]
-    year_start_u32 = freight_transport["year_start"]
-    year_end_u32 = freight_transport["year_end"]
-
-    if year_start_u32 > year_end_u32:
-        # Switching years
-        tmp = year_start_u32
-        year_start_u32 = year_end_u32
-        year_end_u32 = tmp
+    country_data = context.country_data
 
-    if year_start_u32 < beginning_year:
-        year_start_u32 = beginning_year
+    if settlement_weights is None:
+        settlement_weights = calculate_policy_settlement_weights(
+            context, adjusted_settlement_distribution_by_year, year_range
+        )
 
-    policy_impact_freights = calculate_change_policy_impact_freights(
-        year_range, modal_split_u2, expected_change_u32, year_start_u32, year_end_u32
+    transport_impact_passenger_mobility, transport_impact_freight = calculate_policy_activity(
+        year_range, country_data, beginning_year, policy_quantification, modal_split_u2
     )
 
-    # U3.3 ########################################
-    modal_split_passenger = policy_quantification["modal_split_passenger"]
-    shares_u33 = modal_split_passenger["shares"]
-    affected_population_u33 = modal_split_passenger["affected_population"]
-    year_start_u33 = modal_split_passenger["year_start"]
-    year_end_u33 = modal_split_passenger["year_end"]
-
-    if year_start_u33 > year_end_u33:
-        # Switching years
-        tmp = year_start_u33
-        year_start_u33 = year_end_u33
-        year_end_u33 = tmp
-
-    if year_start_u33 < beginning_year:
-        year_start_u33 = beginning_year
-
-    transport_impact_passenger_mobility = calculate_transport_impact_passenger_mobility(
+    policy_quantification_response = calculate_policy_emissions(
+        context,
         year_range,
-        policy_impact_passenger_mobility,
-        shares_u33,
-        affected_population_u33,
-        year_start_u33,
-        year_end_u33,
+        beginning_year,
+        policy_quantification,
+        settlement_weights,
+        transport_impact_passenger_mobility,
+        transport_impact_freight,
     )
 
-    # U3.4 ########################################
-    modal_split_freight = policy_quantification["modal_split_freight"]
-    shares_u34 = modal_split_freight["shares"]
-    year_start_u34 = modal_split_freight["year_start"]
-    year_end_u34 = modal_split_freight["year_end"]
+    absolute_policy_quantification_response = (
+        policy_quantification_response * new_population.array / 1000
+    ).round(3).since(beginning_year)
+    policy_quantification_response = policy_quantification_response.round(3).since(beginning_year)
 
-    if year_start_u34 > year_end_u34:
-        # Switching years
-        tmp = year_start_u34
-        year_start_u34 = year_end_u34
-        year_end_u34 = tmp
+    return (
+        dict(absolute_policy_quantification_response.items()),
+        dict(policy_quantification_response.items()),
+    )
 
-    if year_start_u34 < beginning_year:
-        year_start_u34 = beginning_year
 
-    transport_impact_freight = calculate_transport_impact_freight(
-        year_range,
-        country_data,
-        policy_impact_freights,
-        shares_u34,
-        year_start_u34,
-        year_end_u34,
-    )
+def calculate_policy_emissions(
+    context,
+    year_range,
+    beginning_year,
+    policy_quantification,
+    settlement_weights,
+    transport_impact_passenger_mobility,
+    transport_impact_freight,
+):
+    """
+    Returns the YearFrame of the per capita emissions of all transport modes
+    and their total with the policies U3.5 - U3.7 of policy_quantification,
+    from the activity with the policies U3.1 - U3.4 (YearFrames, see
+    calculate_policy_activity) and the settlement weights of
+    calculate_policy_settlement_weights. Like the activity, the settlement
+    weights and the percentages of the policies may have leading axes, e.g.
+    the variants of calculate_sensitivity.
+    """
+    year_range = YearAxis.of(year_range)
+    country_data = context.country_data
+    settlement_distribution, area_specific_ef = settlement_weights
 
     # U3.5 ########################################
     fuel_shares_bus = policy_quantification["fuel_shares_bus"]
@@ -2351,23 +2308,24 @@ def calculate_policy_quantification(
     baseline_emissions_bus = calculate_impact_bus_ef(
         year_range,
         country_data,
-        adjusted_settlement_distribution_by_year,
+        context.grid_electricity_emission_factor,
+        settlement_distribution,
+        area_specific_ef["bus"],
         types_u35,
         year_start_u35,
         year_end_u35,
         affected_area_u35,
     )
 
-    total_bus_ef = {}
-    bus_occupancy_rate = country_data.BUS_COL2.to_numpy()[0]
+    bus_occupancy_rate = country_data.BUS_COL2
 
-    for year in year_range:
-        total_bus_ef[year] = (
-            transport_impact_passenger_mobility["bus"][year]
-            / bus_occupancy_rate
-            * baseline_emissions_bus[year]
-            / 1000
-        )
+    total_bus_ef = YearSeries(
+        transport_impact_passenger_mobility["bus"].array
+        / bus_occupancy_rate
+        * baseline_emissions_bus.array
+        / 1000,
+        year_range.start,
+    )
 
     # U3.6 ########################################
     fuel_shares_car = policy_quantification["fuel_shares_car"]
@@ -2388,23 +2346,23 @@ def calculate_policy_quantification(
     baseline_emissions_car = calculate_impact_car_ef(
         year_range,
         country_data,
-        adjusted_settlement_distribution_by_year,
+        settlement_distribution,
+        area_specific_ef["car"],
         types_u36,
         year_start_u36,
         year_end_u36,
         affected_area_u36,
     )
 
-    total_car_ef = {}
-    car_occupancy_rate = country_data.CAR_COL2.to_numpy()[0]
+    car_occupancy_rate = country_data.CAR_COL2
 
-    for year in year_range:
-        total_car_ef[year] = (
-            transport_impact_passenger_mobility["car"][year]
-            / car_occupancy_rate
-            * baseline_emissions_car[year]
-            / 1000
-        )
+    total_car_ef = YearSeries(
+        transport_impact_passenger_mobility["car"].array
+        / car_occupancy_rate
+        * baseline_emissions_car.array
+        / 1000,
+        year_range.start,
+    )
 
     # U3.7 ########################################
 
@@ -2425,7 +2383,7 @@ def calculate_policy_quantification(
 
     impact_electricity_ef = calculate_impact_electricity_ef(
         year_range,
-        country_data,
+        context.grid_electricity_emission_factor,
         types_u37,
         year_start_u37,
         year_end_u37,
@@ -2440,104 +2398,207 @@ def calculate_policy_quantification(
         impact_electricity_ef,
     )
 
-    total_rail_transport_ef = calculate_total_rail_transport_ef(
-        country_data, transport_impact_freight["rail_transport"], impact_electricity_ef
+    freight_emissions = calculate_freight_emissions(
+        country_data, settlement_distribution, transport_impact_freight, impact_electricity_ef
     )
 
-    total_road_transport_ef = calculate_total_road_transport_ef(
-        country_data,
-        adjusted_settlement_distribution_by_year,
-        transport_impact_freight["road_transport"],
-        impact_electricity_ef,
+    metro_occupancy_rate = country_data.METRO_COL2
+    metro_electric_energy_consumption = country_data.METRO_COL3
+    tram_occupancy_rate = country_data.TRAM_COL2
+    tram_electric_energy_consumption = country_data.TRAM_COL3
+
+    total_metro_ef = YearSeries(
+        transport_impact_passenger_mobility["metro"].array
+        / metro_occupancy_rate
+        * metro_electric_energy_consumption
+        * impact_electricity_ef.array
+        / 1000,
+        year_range.start,
+    )
+    total_tram_ef = YearSeries(
+        transport_impact_passenger_mobility["tram"].array
+        / tram_occupancy_rate
+        * tram_electric_energy_consumption
+        * impact_electricity_ef.array
+        / 1000,
+        year_range.start,
+    )
+
+    # Aggregating results ########################################
+
+    return emissions_frame(
+        ["bus", "car", "metro", "tram", "train", "rail_transport", "road_transport", "waterways_transport"],
+        {
+            "bus": total_bus_ef,
+            "car": total_car_ef,
+            "metro": total_metro_ef,
+            "tram": total_tram_ef,
+            "train": total_train_ef,
+            "rail_transport": freight_emissions["rail_transport"],
+            "road_transport": freight_emissions["road_transport"],
+            "waterways_transport": freight_emissions["waterways_transport"],
+        },
+        year_range,
+        total_modes=POLICY_TOTAL_MODES,
     )
 
-    total_water_transport_ef = calculate_total_water_transport_ef(
-        country_data, transport_impact_freight["waterways_transport"]
+
+def calculate_policy_activity(
+    year_range,
+    country_data,
+    beginning_year,
+    policy_quantification,
+    modal_split_u2,
+    without_u34=False,
+):
+    """
+    Returns the YearFrames of the activity of PASSENGER_TRANSPORT_MODES and
+    FREIGHT_TRANSPORT_MODES with the policies U3.1 - U3.4 of
+    policy_quantification (but U3.4 if without_u34). modal_split_u2 is
+    {transport_type: {year: value}} or a YearFrame, whose array may have
+    leading axes (e.g. the samples of calculate_uncertainty), which the
+    results then have too. So may the percentages of the policies (e.g. the
+    variants of calculate_sensitivity).
+    """
+    # U3.1 ########################################
+    passenger_mobility = policy_quantification["passenger_mobility"]
+    expected_change_u31 = passenger_mobility["expected_change"]
+    population_affected_u31 = passenger_mobility[
+        "affected_area"
+    ]  # Name needs to fixed on FE
+    year_start_u31 = passenger_mobility["year_start"]
+    year_end_u31 = passenger_mobility["year_end"]
+
+    if year_start_u31 > year_end_u31:
+        # Switching years
+        tmp = year_start_u31
+        year_start_u31 = year_end_u31
+        year_end_u31 = tmp
+
+    if year_start_u31 < beginning_year:
+        year_start_u31 = beginning_year
+
+    policy_impact_passenger_mobility = calculate_policy_impact_passenger_mobility(
+        year_range,
+        expected_change_u31,
+        population_affected_u31,
+        modal_split_u2,
+        year_start_u31,
+        year_end_u31,
     )
 
-    total_metro_ef = {}
-    total_tram_ef = {}
+    # U3.2 ########################################
+    freight_transport = policy_quantification["freight_transport"]
+    expected_change_u32 = freight_transport["expected_change"]
+    year_start_u32 = freight_transport["year_start"]
+    year_end_u32 = freight_transport["year_end"]
 
-    metro_occupancy_rate = country_data.METRO_COL2.to_numpy()[0]
-    metro_electric_energy_consumption = country_data.METRO_COL3.to_numpy()[0]
-    tram_occupancy_rate = country_data.TRAM_COL2.to_numpy()[0]
-    tram_electric_energy_consumption = country_data.TRAM_COL3.to_numpy()[0]
+    if year_start_u32 > year_end_u32:
+        # Switching years
+        tmp = year_start_u32
+        year_start_u32 = year_end_u32
+        year_end_u32 = tmp
 
-    for year in year_range:
-        total_metro_ef[year] = (
-            transport_impact_passenger_mobility["metro"][year]
-            / metro_occupancy_rate
-            * metro_electric_energy_consumption
-            * impact_electricity_ef[year]
-            / 1000
-        )
+    if year_start_u32 < beginning_year:
+        year_start_u32 = beginning_year
 
-        total_tram_ef[year] = (
-            transport_impact_passenger_mobility["tram"][year]
-            / tram_occupancy_rate
-            * tram_electric_energy_consumption
-            * impact_electricity_ef[year]
-            / 1000
-        )
+    policy_impact_freights = calculate_change_policy_impact_freights(
+        year_range, modal_split_u2, expected_change_u32, year_start_u32, year_end_u32
+    )
 
-    # Aggregating results ########################################
+    # U3.3 ########################################
+    modal_split_passenger = policy_quantification["modal_split_passenger"]
+    shares_u33 = modal_split_passenger["shares"]
+    affected_population_u33 = modal_split_passenger["affected_population"]
+    year_start_u33 = modal_split_passenger["year_start"]
+    year_end_u33 = modal_split_passenger["year_end"]
 
-    policy_quantification_response = {
-        "bus": total_bus_ef,
-        "car": total_car_ef,
-        "metro": total_metro_ef,
-        "tram": total_tram_ef,
-        "train": total_train_ef,
-        "rail_transport": total_rail_transport_ef,
-        "road_transport": total_road_transport_ef,
-        "waterways_transport": total_water_transport_ef,
-    }
+    if year_start_u33 > year_end_u33:
+        # Switching years
+        tmp = year_start_u33
+        year_start_u33 = year_end_u33
+        year_end_u33 = tmp
 
-    for transport_type in policy_quantification_response.keys():
-        for year in year_range:
-            # Replacing NANs (if any) with ZEROs
-            if math.isnan(policy_quantification_response[transport_type][year]):
-                policy_quantification_response[transport_type][year] = 0.0
+    if year_start_u33 < beginning_year:
+        year_start_u33 = beginning_year
 
-    policy_quantification_response["total"] = {}
+    transport_impact_passenger_mobility = calculate_transport_impact_passenger_mobility(
+        year_range,
+        policy_impact_passenger_mobility,
+        shares_u33,
+        affected_population_u33,
+        year_start_u33,
+        year_end_u33,
+    )
 
-    for year in year_range:
-        policy_quantification_response["total"][year] = (
-            policy_quantification_response["bus"][year]
-            + policy_quantification_response["car"][year]
-            + policy_quantification_response["tram"][year]
-            + policy_quantification_response["train"][year]
-            + policy_quantification_response["rail_transport"][year]
-            + policy_quantification_response["road_transport"][year]
-            + policy_quantification_response["waterways_transport"][year]
+    # U3.4 ########################################
+    if without_u34:
+        return transport_impact_passenger_mobility, calculate_final_v_in_tonne_km(
+            year_range, country_data, policy_impact_freights
         )
 
-    absolute_policy_quantification_response = {}
+    modal_split_freight = policy_quantification["modal_split_freight"]
+    shares_u34 = modal_split_freight["shares"]
+    year_start_u34 = modal_split_freight["year_start"]
+    year_end_u34 = modal_split_freight["year_end"]
 
-    for transport_type in policy_quantification_response.keys():
-        absolute_policy_quantification_response[transport_type] = {}
+    if year_start_u34 > year_end_u34:
+        # Switching years
+        tmp = year_start_u34
+        year_start_u34 = year_end_u34
+        year_end_u34 = tmp
 
-        for year in year_range:
+    if year_start_u34 < beginning_year:
+        year_start_u34 = beginning_year
 
-            absolute_policy_quantification_response[transport_type][year] = round(
-                policy_quantification_response[transport_type][year]
-                * new_population[year]
-                / 1000,
-                3,
-            )
+    transport_impact_freight = calculate_transport_impact_freight(
+        year_range,
+        country_data,
+        policy_impact_freights,
+        shares_u34,
+        year_start_u34,
+        year_end_u34,
+    )
+
+    return transport_impact_passenger_mobility, transport_impact_freight
 
-            policy_quantification_response[transport_type][year] = round(
-                policy_quantification_response[transport_type][year], 3
-            )
 
-            if year < beginning_year:
-                policy_quantification_response[transport_type].pop(year, None)
-                absolute_policy_quantification_response[transport_type].pop(year, None)
+def calculate_policy_settlement_weights(
+    context, adjusted_settlement_distribution_by_year, year_range
+):
+    """
+    Returns the settlement distribution of the years of year_range as an
+    (n, 5) array and {mode: (n,) array} of the area specific emission factors
+    without policies. The emission factors without policies are weighted by
+    the settlement distribution once, the policies on propulsion shares
+    reuse them.
+    """
+    settlement_distribution = calculate_settlement_distribution(
+        adjusted_settlement_distribution_by_year, year_range
+    )
+    area_specific_ef = context.country_data.get_derived(
+        "settlement_independent_ef", build_settlement_independent_ef
+    ).weight(settlement_distribution, YearAxis.of(year_range).rows)
 
-    return absolute_policy_quantification_response, policy_quantification_response
+    return settlement_distribution, area_specific_ef
 
 
 # NEW DEVELOPMENT - U3.1 ########################################
+#
+# The U3.1 - U3.4 kernels work on YearFrames of the transport modes, with
+# masks of the years a policy is active. Only the modal share with a policy
+# is a recurrence over the years, it is computed for all modes at once. The
+# frames may have leading axes, e.g. the samples of calculate_uncertainty, and
+# so may the percentages of the policies, e.g. the variants of
+# calculate_sensitivity. The years of the policies are numbers.
+
+PASSENGER_TRANSPORT_MODES = ("bus", "car", "metro", "tram", "train")
+FREIGHT_TRANSPORT_MODES = ("rail_transport", "road_transport", "waterways_transport")
+
+# Modes in the total with policies, which does not include metros
+POLICY_TOTAL_MODES = (
+    "bus", "car", "tram", "train", "rail_transport", "road_transport", "waterways_transport"
+)
 
 
 def calculate_policy_impact_passenger_mobility(
@@ -2566,40 +2627,30 @@ def calculate_policy_impact_passenger_mobility(
 def calculate_u31_reduction_percentage(
     year_range, expected_change, year_start, year_end
 ):
-    u31_reduction_percentage = {}
-
-    for year in year_range:
+    """
+    Returns the (n,) array of the reduction (in %) in the years of
+    year_range, growing by the same amount in every year of the policy.
+    expected_change may be an array over leading axes, the result then has
+    them too.
+    """
+    year_range = YearAxis.of(year_range)
 
-        if year == 2021:
-            u31_reduction_percentage[year] = 0
-        else:
-            if year_start <= year <= year_end:
-                u31_reduction_percentage[year] = u31_reduction_percentage[year - 1] + (
-                    expected_change / (year_end - year_start + 1)
-                )
-            else:
-                u31_reduction_percentage[year] = u31_reduction_percentage[year - 1]
-    return u31_reduction_percentage
+    annual_change = np.where(
+        year_range.window(year_start, year_end) & (year_range.array != 2021),
+        np.asarray(expected_change)[..., np.newaxis] / (year_end - year_start + 1),
+        0,
+    )
+    return np.cumsum(annual_change, axis=-1)
 
 
 def calculate_u31_impact_per_transport_mode(
     year_range, u31_reduction_percentage, modal_split_in_passenger_km
 ):
-    u31_impact_per_transport_mode = {}
-
-    citizen_transport_modes = ["bus", "car", "metro", "tram", "train"]
-
-    for transport_type in citizen_transport_modes:
-        u31_impact_per_transport_mode[transport_type] = {}
-
-        for year in year_range:
-            u31_impact_per_transport_mode[transport_type][year] = (
-                (100 - u31_reduction_percentage[year])
-                / 100
-                * modal_split_in_passenger_km[transport_type][year]
-            )
+    modal_split_in_passenger_km = YearFrame.from_dict(
+        modal_split_in_passenger_km, PASSENGER_TRANSPORT_MODES
+    )
 
-    return u31_impact_per_transport_mode
+    return modal_split_in_passenger_km * ((100 - u31_reduction_percentage) / 100)[..., np.newaxis, :]
 
 
 def calculate_u31_weighted_impact_avg(
@@ -2608,23 +2659,17 @@ def calculate_u31_weighted_impact_avg(
     modal_split_in_passenger_km,
     u31_impact_per_transport_mode,
 ):
-    u31_weighted_impact_avg = {}
+    modal_split_in_passenger_km = YearFrame.from_dict(
+        modal_split_in_passenger_km, u31_impact_per_transport_mode.keys()
+    )
+    population_affected = np.asarray(population_affected)[..., np.newaxis, np.newaxis]
 
-    for transport_type in u31_impact_per_transport_mode.keys():
-        u31_weighted_impact_avg[transport_type] = {}
-
-        for year in year_range:
-            u31_weighted_impact_avg[transport_type][year] = (
-                (100 - population_affected)
-                / 100
-                * modal_split_in_passenger_km[transport_type][year]
-            ) + (
-                population_affected
-                / 100
-                * u31_impact_per_transport_mode[transport_type][year]
-            )
-
-    return u31_weighted_impact_avg
+    return YearFrame(
+        u31_impact_per_transport_mode.labels,
+        (100 - population_affected) / 100 * modal_split_in_passenger_km.array
+        + population_affected / 100 * u31_impact_per_transport_mode.array,
+        u31_impact_per_transport_mode.start,
+    )
 
 
 # NEW DEVELOPMENT - U3.2 ########################################
@@ -2647,41 +2692,17 @@ def calculate_change_policy_impact_freights(
 def calculate_u32_reduction_percentage(
     year_range, expected_change, year_start, year_end
 ):
-    u32_reduction_percentage = {}
-
-    for year in year_range:
-
-        if year == 2021:
-            u32_reduction_percentage[year] = 0
-        else:
-            if year_start <= year <= year_end:
-                u32_reduction_percentage[year] = u32_reduction_percentage[year - 1] + (
-                    expected_change / (year_end - year_start + 1)
-                )
-            else:
-                u32_reduction_percentage[year] = u32_reduction_percentage[year - 1]
-
-    return u32_reduction_percentage
+    return calculate_u31_reduction_percentage(
+        year_range, expected_change, year_start, year_end
+    )
 
 
 def calculate_u32_impact_per_freight_mode(
     year_range, baseline_emissions, u32_reduction_percentage
 ):
-    u32_impact_per_freight_mode = {}
-
-    freight_modes = ["rail_transport", "road_transport", "waterways_transport"]
+    baseline_emissions = YearFrame.from_dict(baseline_emissions, FREIGHT_TRANSPORT_MODES)
 
-    for transport_type in freight_modes:
-        u32_impact_per_freight_mode[transport_type] = {}
-
-        for year in year_range:
-            u32_impact_per_freight_mode[transport_type][year] = (
-                (100 - u32_reduction_percentage[year])
-                / 100
-                * baseline_emissions[transport_type][year]
-            )
-
-    return u32_impact_per_freight_mode
+    return baseline_emissions * ((100 - u32_reduction_percentage) / 100)[..., np.newaxis, :]
 
 
 # NEW DEVELOPMENT - U3.3 ########################################
@@ -2726,54 +2747,52 @@ def calculate_transport_impact_passenger_mobility(
 
 
 def calculate_modal_share_without_policy(year_range, policy_impact_passenger_mobility):
-    modal_share_without_policy = {}
-
-    total_impact_passenger_mobility = {}
-
-    for year in year_range:
-        total_impact_passenger_mobility[year] = 0
-
-        for transport_type in policy_impact_passenger_mobility.keys():
-            total_impact_passenger_mobility[year] = (
-                total_impact_passenger_mobility[year]
-                + policy_impact_passenger_mobility[transport_type][year]
-            )
-
-    for transport_type in policy_impact_passenger_mobility.keys():
-        modal_share_without_policy[transport_type] = {}
-
-        for year in year_range:
-            if total_impact_passenger_mobility[year] == 0:
-                modal_share_without_policy[transport_type][year] = 0
-            else:
-                modal_share_without_policy[transport_type][year] = (
-                    policy_impact_passenger_mobility[transport_type][year]
-                    / total_impact_passenger_mobility[year]
-                    * 100
-                )
+    """
+    Returns the YearFrame of the share (in %) of every mode of
+    policy_impact_passenger_mobility (a YearFrame) in their total.
+    """
+    total_impact_passenger_mobility = policy_impact_passenger_mobility.sum().array
+    total_impact_passenger_mobility = total_impact_passenger_mobility[..., np.newaxis, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        modal_share_without_policy = np.where(
+            total_impact_passenger_mobility == 0,
+            0,
+            policy_impact_passenger_mobility.array / total_impact_passenger_mobility * 100,
+        )
 
-    return modal_share_without_policy
+    return YearFrame(
+        policy_impact_passenger_mobility.labels,
+        modal_share_without_policy,
+        policy_impact_passenger_mobility.start,
+    )
 
 
 def calculate_change_in_modal_share_during_policy(
     year_range, modal_share_without_policy, shares, year_start, year_end
 ):
-    change_in_modal_share_during_policy = {}
-
-    for transport_type in modal_share_without_policy.keys():
-        change_in_modal_share_during_policy[transport_type] = {}
-
-        for year in year_range:
-            if year_start <= year <= year_end:
-                change_in_modal_share_during_policy[transport_type][year] = (
-                    shares[transport_type]
-                    - modal_share_without_policy[transport_type][year_start - 1]
-                ) / (year_end - year_start + 1)
+    """
+    Returns the YearFrame of the annual change of the modal shares, which
+    move from their share of the year before the policy to shares during it.
+    """
+    target = np.stack(np.broadcast_arrays(
+        *(shares[transport_type] for transport_type in modal_share_without_policy)
+    ), axis=-1)
+    share_before = modal_share_without_policy.array[
+        ..., modal_share_without_policy.years.index(year_start - 1)
+    ]
 
-            else:
-                change_in_modal_share_during_policy[transport_type][year] = 0
+    change_in_modal_share_during_policy = np.where(
+        YearAxis.of(year_range).window(year_start, year_end),
+        ((target - share_before) / (year_end - year_start + 1))[..., np.newaxis],
+        0,
+    )
 
-    return change_in_modal_share_during_policy
+    return YearFrame(
+        modal_share_without_policy.labels,
+        change_in_modal_share_during_policy,
+        modal_share_without_policy.start,
+    )
 
 
 def calculate_modal_share_with_policy(
@@ -2783,56 +2802,52 @@ def calculate_modal_share_with_policy(
     year_start,
     year_end,
 ):
-    modal_share_with_policy = {}
-
-    for transport_type in modal_share_without_policy.keys():
-        modal_share_with_policy[transport_type] = {}
+    """
+    Returns the YearFrame of the modal shares with a policy: they change by
+    change_in_modal_share_during_policy during the policy, and like the
+    shares without the policy in the other years. Cars (road freight) make
+    up what the other passenger (freight) modes leave.
+    """
+    in_policy = YearAxis.of(year_range).window(year_start, year_end)
+    without_policy = modal_share_without_policy.array
+    change = change_in_modal_share_during_policy.array
 
-        for year in year_range:
-            if year_start <= year <= year_end:
-                if (year - 1) not in year_range:
-                    modal_share_with_policy[transport_type][year] = (
-                        modal_share_without_policy[transport_type][year]
-                        + change_in_modal_share_during_policy[transport_type][year]
-                    )
-                else:
-                    modal_share_with_policy[transport_type][year] = (
-                        modal_share_with_policy[transport_type][year - 1]
-                        + change_in_modal_share_during_policy[transport_type][year]
-                    )
+    modal_share_with_policy = np.empty_like(without_policy, dtype=np.float64)
+    modal_share_with_policy[..., 0] = np.where(
+        in_policy[0], without_policy[..., 0] + change[..., 0], without_policy[..., 0]
+    )
 
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column in range(1, without_policy.shape[-1]):
+            previous = modal_share_with_policy[..., column - 1]
+            if in_policy[column]:
+                modal_share_with_policy[..., column] = previous + change[..., column]
             else:
-                if (year - 1) not in year_range:
-                    modal_share_with_policy[transport_type][
-                        year
-                    ] = modal_share_without_policy[transport_type][year]
-                else:
-                    if modal_share_without_policy[transport_type][year - 1] == 0:
-                        modal_share_with_policy[transport_type][
-                            year
-                        ] = modal_share_with_policy[transport_type][year - 1]
-                    else:
-                        modal_share_with_policy[transport_type][year] = (
-                            modal_share_with_policy[transport_type][year - 1]
-                            * modal_share_without_policy[transport_type][year]
-                            / modal_share_without_policy[transport_type][year - 1]
-                        )
-
-    if "car" in modal_share_with_policy.keys():
-        for year in year_range:
-            modal_share_with_policy["car"][year] = 100 - (
-                modal_share_with_policy["bus"][year]
-                + modal_share_with_policy["metro"][year]
-                + modal_share_with_policy["train"][year]
-                + modal_share_with_policy["tram"][year]
-            )
+                modal_share_with_policy[..., column] = np.where(
+                    without_policy[..., column - 1] == 0,
+                    previous,
+                    previous * without_policy[..., column] / without_policy[..., column - 1],
+                )
 
-    if "road_transport" in modal_share_with_policy.keys():
-        for year in year_range:
-            modal_share_with_policy["road_transport"][year] = 100 - (
-                modal_share_with_policy["rail_transport"][year]
-                + modal_share_with_policy["waterways_transport"][year]
-            )
+    modal_share_with_policy = YearFrame(
+        modal_share_without_policy.labels, modal_share_with_policy, modal_share_without_policy.start
+    )
+
+    if "car" in modal_share_with_policy:
+        row = modal_share_with_policy.labels.index("car")
+        modal_share_with_policy.array[..., row, :] = 100 - (
+            modal_share_with_policy["bus"].array
+            + modal_share_with_policy["metro"].array
+            + modal_share_with_policy["train"].array
+            + modal_share_with_policy["tram"].array
+        )
+
+    if "road_transport" in modal_share_with_policy:
+        row = modal_share_with_policy.labels.index("road_transport")
+        modal_share_with_policy.array[..., row, :] = 100 - (
+            modal_share_with_policy["rail_transport"].array
+            + modal_share_with_policy["waterways_transport"].array
+        )
 
     return modal_share_with_policy
 
@@ -2840,28 +2855,13 @@ def calculate_modal_share_with_policy(
 def calculate_u33_impact_passenger_km(
     year_range, policy_impact_passenger_mobility, modal_share_with_policy
 ):
-    u33_impact_passenger_km = {}
-
-    total_impact_passenger_mobility = {}
+    total_impact_passenger_mobility = policy_impact_passenger_mobility.sum().array
 
-    for year in year_range:
-        total_impact_passenger_mobility[year] = 0
-
-        for transport_type in policy_impact_passenger_mobility.keys():
-            total_impact_passenger_mobility[year] = (
-                total_impact_passenger_mobility[year]
-                + policy_impact_passenger_mobility[transport_type][year]
-            )
-
-    for transport_type in policy_impact_passenger_mobility.keys():
-        u33_impact_passenger_km[transport_type] = {}
-
-        for year in year_range:
-            u33_impact_passenger_km[transport_type][year] = (
-                modal_share_with_policy[transport_type][year] / 100
-            ) * total_impact_passenger_mobility[year]
-
-    return u33_impact_passenger_km
+    return YearFrame(
+        policy_impact_passenger_mobility.labels,
+        modal_share_with_policy.array / 100 * total_impact_passenger_mobility[..., np.newaxis, :],
+        policy_impact_passenger_mobility.start,
+    )
 
 
 def calculate_weight_average_with_u33(
@@ -2870,23 +2870,14 @@ def calculate_weight_average_with_u33(
     policy_impact_passenger_mobility,
     u33_impact_passenger_km,
 ):
-    weight_average_with_u33 = {}
-
-    for transport_type in u33_impact_passenger_km.keys():
-        weight_average_with_u33[transport_type] = {}
+    affected_population = np.asarray(affected_population)[..., np.newaxis, np.newaxis]
 
-        for year in year_range:
-            weight_average_with_u33[transport_type][year] = (
-                (100 - affected_population)
-                / 100
-                * policy_impact_passenger_mobility[transport_type][year]
-            ) + (
-                affected_population
-                / 100
-                * u33_impact_passenger_km[transport_type][year]
-            )
-
-    return weight_average_with_u33
+    return YearFrame(
+        u33_impact_passenger_km.labels,
+        (100 - affected_population) / 100 * policy_impact_passenger_mobility.array
+        + affected_population / 100 * u33_impact_passenger_km.array,
+        u33_impact_passenger_km.start,
+    )
 
 
 # NEW DEVELOPMENT - U3.4 ########################################
@@ -2925,50 +2916,28 @@ def calculate_transport_impact_freight(
 def calculate_u34_impact_tonne_km(
     year_range, policy_impact_freights, modal_share_with_policy
 ):
-    u34_impact_tonne_km = {}
-
-    total_impact = {}
-
-    for year in year_range:
-        total_impact[year] = 0
-
-        for transport_type in policy_impact_freights.keys():
-            total_impact[year] = (
-                total_impact[year] + policy_impact_freights[transport_type][year]
-            )
-
-    for transport_type in policy_impact_freights.keys():
-        u34_impact_tonne_km[transport_type] = {}
-
-        for year in year_range:
-            u34_impact_tonne_km[transport_type][year] = (
-                modal_share_with_policy[transport_type][year] / 100
-            ) * total_impact[year]
-
-    return u34_impact_tonne_km
+    return calculate_u33_impact_passenger_km(
+        year_range, policy_impact_freights, modal_share_with_policy
+    )
 
 
 def calculate_final_v_in_tonne_km(year_range, country_data, u34_impact_tonne_km):
-    weight_average_with_u34 = {}
-
-    for transport_type in u34_impact_tonne_km.keys():
-        weight_average_with_u34[transport_type] = {}
-
-        if transport_type == "rail_transport":
-            average_load = country_data.RAIL_TRN_COL13.to_numpy()[0]
-        elif transport_type == "road_transport":
-            average_load = country_data.ROAD_TRN_COL43.to_numpy()[0]
-        elif transport_type == "waterways_transport":
-            average_load = country_data.WATER_TRN_COL11.to_numpy()[0]
-        else:
-            average_load = 1
-
-        for year in year_range:
-            weight_average_with_u34[transport_type][year] = (
-                u34_impact_tonne_km[transport_type][year] / average_load
-            )
-
-    return weight_average_with_u34
+    average_load_columns = {
+        "rail_transport": "RAIL_TRN_COL13",
+        "road_transport": "ROAD_TRN_COL43",
+        "waterways_transport": "WATER_TRN_COL11",
+    }
+    average_load = np.array([
+        country_data[average_load_columns[transport_type]]
+        if transport_type in average_load_columns else 1
+        for transport_type in u34_impact_tonne_km
+    ])
+
+    return YearFrame(
+        u34_impact_tonne_km.labels,
+        u34_impact_tonne_km.array / average_load[:, np.newaxis],
+        u34_impact_tonne_km.start,
+    )
 
 
 # NEW DEVELOPMENT - U3.5 ########################################
@@ -2977,310 +2946,125 @@ def calculate_final_v_in_tonne_km(year_range, country_data, u34_impact_tonne_km)
 def calculate_impact_bus_ef(
     year_range,
     country_data,
-    adjusted_settlement_distribution_by_year,
+    grid_electricity_emission_factor,
+    settlement_distribution,
+    area_specific_ef_without_policy,
     types,
     year_start,
     year_end,
     affected_area,
 ):
-    baseline_emissions_bus = {}
-
-    init_propulsion_type = {"petrol", "lpg", "cng", "electricity"}
-
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
-
-    for year in year_range:
-        propulsion_share[year] = {}
-        baseline_ef_street[year] = {}
-        baseline_ef_road[year] = {}
-
-        for prplsn_type in init_propulsion_type:
-
-            if prplsn_type == "petrol":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL6.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL16.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL21.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "lpg":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL7.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL17.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL22.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "cng":
-                propulsion_share[year][prplsn_type] = country_data.BUS_COL9.to_numpy()[
-                    0
-                ]
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL19.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL24.to_numpy()[
-                    0
-                ]
-            elif prplsn_type == "electricity":
-                if year == 2021:
-                    share_start_yr = country_data.BUS_COL26.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL27.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_start_yr + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2022 <= year <= 2025:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL26.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL27.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2026 <= year <= 2030:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL27.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL28.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2031 <= year <= 2035:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL28.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL29.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2036 <= year <= 2040:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL29.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL30.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2041 <= year <= 2045:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL30.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL31.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-                elif 2046 <= year <= 2050:
-                    share_prev_year = propulsion_share[year - 1][prplsn_type]
-                    share_start_yr = country_data.BUS_COL31.to_numpy()[0]
-                    share_end_yr = country_data.BUS_COL32.to_numpy()[0]
-                    propulsion_share[year][prplsn_type] = (
-                        share_prev_year + (share_end_yr - share_start_yr) / 5
-                    )
-
-                baseline_ef_street[year][
-                    prplsn_type
-                ] = country_data.BUS_COL20.to_numpy()[0]
-                baseline_ef_road[year][prplsn_type] = country_data.BUS_COL25.to_numpy()[
-                    0
-                ]
-
-    annual_change = {}
-
-    for prplsn_type in init_propulsion_type:
-        annual_change[prplsn_type] = {}
-
-        for year in year_range:
-            if year_start <= year <= year_end:
-                annual_change[prplsn_type][year] = (
-                    types[prplsn_type] - propulsion_share[year_start - 1][prplsn_type]
-                ) / (year_end - year_start + 1)
-            else:
-                annual_change[prplsn_type][year] = 0
-
-    percent_with_u35_impact = {}
-
-    for prplsn_type in init_propulsion_type:
-        percent_with_u35_impact[prplsn_type] = {}
-
-        for year in year_range:
-            if year == 2021:
-                percent_with_u35_impact[prplsn_type][year] = (
-                    propulsion_share[year][prplsn_type]
-                    + annual_change[prplsn_type][year]
-                )
-            else:
-                if annual_change[prplsn_type][year] == 0:
-                    if propulsion_share[year - 1][prplsn_type] == 0:
-                        percent_with_u35_impact[prplsn_type][
-                            year
-                        ] = percent_with_u35_impact[prplsn_type][year - 1]
-                    else:
-                        percent_with_u35_impact[prplsn_type][year] = (
-                            percent_with_u35_impact[prplsn_type][year - 1]
-                            * propulsion_share[year][prplsn_type]
-                            / propulsion_share[year - 1][prplsn_type]
-                        )
-                else:
-                    percent_with_u35_impact[prplsn_type][year] = (
-                        percent_with_u35_impact[prplsn_type][year - 1]
-                        + annual_change[prplsn_type][year]
-                    )
-
-    percent_with_u35_impact["diesel"] = {}
-
-    for year in year_range:
-        percent_with_u35_impact["diesel"][year] = 100 - (
-            percent_with_u35_impact["petrol"][year]
-            + percent_with_u35_impact["lpg"][year]
-            + percent_with_u35_impact["cng"][year]
-            + percent_with_u35_impact["electricity"][year]
-        )
-
-        baseline_ef_street[year]["diesel"] = country_data.BUS_COL18.to_numpy()[0]
-        baseline_ef_road[year]["diesel"] = country_data.BUS_COL23.to_numpy()[0]
-
-    grid_electricity_emission_factor = calculate_grid_electricity_emission_factor(
-        year_range, country_data
+    timeline = country_data.get_derived(
+        "bus_propulsion_timeline", build_bus_propulsion_timeline
     )
 
-    ef_road_u35 = {}
-    ef_street_u35 = {}
+    year_range = YearAxis.of(year_range)
+    rows = year_range.rows
+    grid_electricity_ef = np.array(
+        [grid_electricity_emission_factor[year] for year in YEARS.tolist()]
+    )[:, np.newaxis]
 
-    for year in year_range:
-        ef_road_u35[year] = 0
-        ef_street_u35[year] = 0
+    percent_with_u35_impact = calculate_policy_propulsion_share(
+        timeline,
+        {prplsn_type: types[prplsn_type] for prplsn_type in ("petrol", "lpg", "cng", "electricity")},
+        year_start,
+        year_end,
+    )
+    percent_with_u35_impact["diesel"] = 100 - (
+        percent_with_u35_impact["petrol"]
+        + percent_with_u35_impact["lpg"]
+        + percent_with_u35_impact["cng"]
+        + percent_with_u35_impact["electricity"]
+    )
 
-        for prplsn_type in percent_with_u35_impact.keys():
+    ef_road_u35, ef_street_u35 = timeline.average_ef(
+        grid_electricity_ef[rows], rows, policy_share(timeline, percent_with_u35_impact)
+    )
 
-            if prplsn_type == "electricity":
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * percent_with_u35_impact[prplsn_type][year]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
+    return calculate_area_specific_ef_weighted_avg(
+        timeline,
+        (ef_road_u35, ef_street_u35),
+        area_specific_ef_without_policy,
+        settlement_distribution,
+        year_range,
+        affected_area,
+    )
 
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * percent_with_u35_impact[prplsn_type][year]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
-            else:
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * percent_with_u35_impact[prplsn_type][year]
-                    / 100
-                )
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * percent_with_u35_impact[prplsn_type][year]
-                    / 100
-                )
 
-            ef_road_u35[year] = ef_road_u35[year] + ef_road_pt
-            ef_street_u35[year] = ef_street_u35[year] + ef_street_pt
+def calculate_policy_propulsion_share(timeline, types, year_start, year_end):
+    """
+    Returns {propulsion type: (30,) array} of the shares (in %) of the
+    propulsion types in types with a policy: from year_start to year_end they
+    change linearly from their share of the year before to types[...], in
+    the other years they change like the baseline shares do. The values of
+    types may be arrays over leading axes, the shares then have them too.
+    """
+    share = timeline.share[:, [timeline.columns[prplsn_type] for prplsn_type in types]]
+    target = np.stack(np.broadcast_arrays(*types.values()), axis=-1).astype(np.float64)
+
+    year_axis = YearAxis()
+    in_policy = year_axis.window(year_start, year_end)[:, np.newaxis]
+    annual_change = np.where(
+        in_policy,
+        ((target - share[year_axis.index(year_start - 1)]) / (year_end - year_start + 1))[
+            ..., np.newaxis, :
+        ],
+        0,
+    )
 
-    for year in propulsion_share.keys():
-        propulsion_share[year]["diesel"] = 100 - (
-            propulsion_share[year]["petrol"]
-            + propulsion_share[year]["lpg"]
-            + propulsion_share[year]["cng"]
-            + propulsion_share[year]["electricity"]
+    # Annual change of the baseline shares, shares of 0 stay unchanged
+    with np.errstate(divide="ignore", invalid="ignore"):
+        baseline_change = np.where(share[:-1] == 0, 1, share[1:] / share[:-1])
+
+    percent = np.empty(annual_change.shape)
+    percent[..., 0, :] = share[0] + annual_change[..., 0, :]
+    for row in range(1, len(YEARS)):
+        percent[..., row, :] = np.where(
+            annual_change[..., row, :] == 0,
+            percent[..., row - 1, :] * baseline_change[row - 1],
+            percent[..., row - 1, :] + annual_change[..., row, :],
         )
 
-    ef_road = {}
-    ef_street = {}
-
-    for year in year_range:
-        ef_road[year] = 0
-        ef_street[year] = 0
-
-        for prplsn_type in propulsion_share[year].keys():
-            if prplsn_type == "electricity":
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
-
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                    * grid_electricity_emission_factor[year]
-                )
-            else:
-                ef_road_pt = (
-                    baseline_ef_road[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                )
-                ef_street_pt = (
-                    baseline_ef_street[year][prplsn_type]
-                    * propulsion_share[year][prplsn_type]
-                    / 100
-                )
-
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
+    return dict(zip(types.keys(), np.moveaxis(percent, -1, 0)))
 
-    share_road_driving = {
-        "metropolitan_center": country_data.BUS_COL33.to_numpy()[0],
-        "urban": country_data.BUS_COL35.to_numpy()[0],
-        "suburban": country_data.BUS_COL37.to_numpy()[0],
-        "town": country_data.BUS_COL39.to_numpy()[0],
-        "rural": country_data.BUS_COL41.to_numpy()[0],
-    }
-    share_street_driving = {
-        "metropolitan_center": 100 - share_road_driving["metropolitan_center"],
-        "urban": 100 - share_road_driving["urban"],
-        "suburban": 100 - share_road_driving["suburban"],
-        "town": 100 - share_road_driving["town"],
-        "rural": 100 - share_road_driving["rural"],
-    }
 
-    area_specific_ef_average_with_policy = {}
-    area_specific_ef_average_without_policy = {}
-    area_specific_ef_average_weighted_avg = {}
+def policy_share(timeline, percent):
+    # (..., 30, k) share array of a timeline from {propulsion type: (..., 30)
+    # array}, missing propulsion types get a share of 0
+    leading_shape = np.broadcast_shapes(*(np.shape(values) for values in percent.values()))[:-1]
+    share = np.zeros(leading_shape + timeline.share.shape, dtype=timeline.share.dtype)
+    for prplsn_type, values in percent.items():
+        share[..., timeline.columns[prplsn_type]] = values
+    return share
 
-    for year in year_range:
-        area_specific_ef_average_with_policy[year] = 0
-        area_specific_ef_average_without_policy[year] = 0
-        area_specific_ef_average_weighted_avg[year] = 0
-
-        for settlement_type in share_road_driving.keys():
-            area_specific_ef_average_with_policy[year] = (
-                area_specific_ef_average_with_policy[year]
-                + (
-                    ef_road_u35[year] * share_road_driving[settlement_type] / 100
-                    + ef_street_u35[year] * share_street_driving[settlement_type] / 100
-                )
-                * adjusted_settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
 
-            area_specific_ef_average_without_policy[year] = (
-                area_specific_ef_average_without_policy[year]
-                + (
-                    ef_road[year] * share_road_driving[settlement_type] / 100
-                    + ef_street[year] * share_street_driving[settlement_type] / 100
-                )
-                * adjusted_settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+def calculate_area_specific_ef_weighted_avg(
+    timeline,
+    ef_with_policy,
+    area_specific_ef_average_without_policy,
+    settlement_distribution,
+    year_range,
+    affected_area,
+):
+    """
+    Returns the YearSeries of the area specific emission factors with and
+    without a policy, weighted by the share of the area affected by it.
+    ef_with_policy are the (road, street) driving emission factors with the
+    policy, area_specific_ef_average_without_policy the already weighted ones
+    without it (see SettlementIndependentEF), both of the years of year_range.
+    All of them, the settlement distribution and affected_area may have
+    leading axes.
+    """
+    area_specific_ef_average_with_policy = calculate_area_specific_ef(
+        *ef_with_policy, timeline.share_road_driving, settlement_distribution
+    )
+    affected_area = np.asarray(affected_area)[..., np.newaxis]
 
-            area_specific_ef_average_weighted_avg[year] = (
-                affected_area / 100 * area_specific_ef_average_with_policy[year]
-            ) + (
-                (100 - affected_area)
-                / 100
-                * area_specific_ef_average_without_policy[year]
-            )
+    area_specific_ef_average_weighted_avg = (
+        affected_area / 100 * area_specific_ef_average_with_policy
+    ) + ((100 - affected_area) / 100 * area_specific_ef_average_without_policy)
 
-    return area_specific_ef_average_weighted_avg
+    return YearSeries(area_specific_ef_average_weighted_avg, YearAxis.of(year_range).start)
 
 
 # NEW DEVELOPMENT - U3.6 ########################################
@@ -3289,298 +3073,80 @@ def calculate_impact_bus_ef(
 def calculate_impact_car_ef(
     year_range,
     country_data,
-    adjusted_settlement_distribution_by_year,
+    settlement_distribution,
+    area_specific_ef_without_policy,
     types,
     year_start,
     year_end,
     affected_area,
 ):
-    baseline_emissions_car = {}
-
-    share_road_driving = {
-        "metropolitan_center": country_data.CAR_COL59.to_numpy()[0],
-        "urban": country_data.CAR_COL60.to_numpy()[0],
-        "suburban": country_data.CAR_COL61.to_numpy()[0],
-        "town": country_data.CAR_COL62.to_numpy()[0],
-        "rural": country_data.CAR_COL63.to_numpy()[0],
-    }
-    share_street_driving = {}
-    for settlement_type in share_road_driving.keys():
-        share_street_driving[settlement_type] = (
-            100 - share_road_driving[settlement_type]
-        )
-
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
-
-    for year in year_range:
-        propulsion_share[year] = {
-            "lpg": country_data.CAR_COL9.to_numpy()[0],
-            "cng": country_data.CAR_COL10.to_numpy()[0],
-            "ngv": country_data.CAR_COL11.to_numpy()[0],
-            "petrol": country_data.CAR_COL12.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL13.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL14.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL14.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL15.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL16.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL17.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL17.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL18.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL19.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL20.to_numpy()[0],
-            "bifuel": country_data.CAR_COL21.to_numpy()[0],
-            "other": country_data.CAR_COL22.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL23.to_numpy()[0],
-        }
-
-        if year > 2021:
-            propulsion_share[year]["petrol"] = (
-                propulsion_share[2021]["petrol"]
-                / (propulsion_share[2021]["petrol"] + propulsion_share[2021]["diesel"])
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol"]
-                        + propulsion_share[year]["diesel"]
-                        + propulsion_share[year]["p_e_phev"]
-                        + propulsion_share[year]["d_e_phev"]
-                    )
-                )
-            )
-
-            propulsion_share[year]["diesel"] = (
-                propulsion_share[2021]["diesel"]
-                / (propulsion_share[2021]["petrol"] + propulsion_share[2021]["diesel"])
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol"]
-                        + propulsion_share[year]["diesel"]
-                        + propulsion_share[year]["p_e_phev"]
-                        + propulsion_share[year]["d_e_phev"]
-                    )
-                )
-            )
-
-        baseline_ef_road[year] = {
-            "lpg": country_data.CAR_COL39.to_numpy()[0],
-            "cng": country_data.CAR_COL40.to_numpy()[0],
-            "ngv": country_data.CAR_COL41.to_numpy()[0],
-            "petrol": country_data.CAR_COL42.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL43.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL44.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL44.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL45.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL46.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL47.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL47.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL48.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL49.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL50.to_numpy()[0],
-            "bifuel": country_data.CAR_COL51.to_numpy()[0],
-            "other": country_data.CAR_COL52.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL53.to_numpy()[0],
-        }
-
-        baseline_ef_street[year] = {
-            "lpg": country_data.CAR_COL24.to_numpy()[0],
-            "cng": country_data.CAR_COL25.to_numpy()[0],
-            "ngv": country_data.CAR_COL26.to_numpy()[0],
-            "petrol": country_data.CAR_COL27.to_numpy()[0],
-            "p_e_hybrid": country_data.CAR_COL28.to_numpy()[0],
-            "p_e_phev": country_data.CAR_COL29.to_numpy()[0] * 0.5,
-            "electricity_p_e_phev": country_data.CAR_COL29.to_numpy()[0] * 0.5,
-            "diesel": country_data.CAR_COL30.to_numpy()[0],
-            "d_e_hybrid": country_data.CAR_COL31.to_numpy()[0],
-            "d_e_phev": country_data.CAR_COL32.to_numpy()[0] * 0.5,
-            "electricity_d_e_phev": country_data.CAR_COL32.to_numpy()[0] * 0.5,
-            "hydrogen_fuel": country_data.CAR_COL33.to_numpy()[0],
-            "bioethanol": country_data.CAR_COL34.to_numpy()[0],
-            "biodiesel": country_data.CAR_COL35.to_numpy()[0],
-            "bifuel": country_data.CAR_COL36.to_numpy()[0],
-            "other": country_data.CAR_COL37.to_numpy()[0],
-            "electricity_bev": country_data.CAR_COL38.to_numpy()[0],
-        }
-
-    annual_change = {}
-
-    for prplsn_type in types.keys():
-        annual_change[prplsn_type] = {}
-
-        for year in year_range:
-            if year_start <= year <= year_end:
-                annual_change[prplsn_type][year] = (
-                    types[prplsn_type] - propulsion_share[year_start - 1][prplsn_type]
-                ) / (year_end - year_start + 1)
-            else:
-                annual_change[prplsn_type][year] = 0
-
-    percent_with_u36_impact = {}
-
-    for prplsn_type in annual_change.keys():
-        percent_with_u36_impact[prplsn_type] = {}
-
-        for year in year_range:
-            if year == 2021:
-                percent_with_u36_impact[prplsn_type][year] = (
-                    propulsion_share[year][prplsn_type]
-                    + annual_change[prplsn_type][year]
-                )
-            else:
-                if annual_change[prplsn_type][year] == 0:
-                    if propulsion_share[year - 1][prplsn_type] == 0:
-                        percent_with_u36_impact[prplsn_type][
-                            year
-                        ] = percent_with_u36_impact[prplsn_type][year - 1]
-                    else:
-                        percent_with_u36_impact[prplsn_type][year] = (
-                            percent_with_u36_impact[prplsn_type][year - 1]
-                            * propulsion_share[year][prplsn_type]
-                            / propulsion_share[year - 1][prplsn_type]
-                        )
-                else:
-                    percent_with_u36_impact[prplsn_type][year] = (
-                        percent_with_u36_impact[prplsn_type][year - 1]
-                        + annual_change[prplsn_type][year]
-                    )
-
-    total_percent_with_u36_impact = {}
-    percent_with_u36_impact["petrol"] = {}
-    percent_with_u36_impact["diesel"] = {}
-
-    for year in year_range:
-        total_percent_with_u36_impact[year] = (
-            percent_with_u36_impact["lpg"][year]
-            + percent_with_u36_impact["cng"][year]
-            + percent_with_u36_impact["ngv"][year]
-            + percent_with_u36_impact["p_e_hybrid"][year]
-            + percent_with_u36_impact["p_e_phev"][year]
-            + percent_with_u36_impact["d_e_hybrid"][year]
-            + percent_with_u36_impact["d_e_phev"][year]
-            + percent_with_u36_impact["hydrogen_fuel"][year]
-            + percent_with_u36_impact["bioethanol"][year]
-            + percent_with_u36_impact["biodiesel"][year]
-            + percent_with_u36_impact["bifuel"][year]
-            + percent_with_u36_impact["other"][year]
-            + percent_with_u36_impact["electricity_bev"][year]
-        )
-
-        percent_with_u36_impact["petrol"][year] = (
-            100 - total_percent_with_u36_impact[year]
-        ) * (
-            propulsion_share[year]["petrol"]
-            / (propulsion_share[year]["petrol"] + propulsion_share[year]["diesel"])
-        )
-        percent_with_u36_impact["diesel"][year] = (
-            100 - total_percent_with_u36_impact[year]
-        ) * (
-            propulsion_share[year]["diesel"]
-            / (propulsion_share[year]["petrol"] + propulsion_share[year]["diesel"])
-        )
-
-    ef_road_u36 = {}
-    ef_street_u36 = {}
-
-    for year in year_range:
-        ef_road_u36[year] = 0
-        ef_street_u36[year] = 0
-
-        for prplsn_type in percent_with_u36_impact.keys():
-            ef_road_pt = (
-                baseline_ef_road[year][prplsn_type]
-                * percent_with_u36_impact[prplsn_type][year]
-                / 100
-            )
-            ef_street_pt = (
-                baseline_ef_street[year][prplsn_type]
-                * percent_with_u36_impact[prplsn_type][year]
-                / 100
-            )
-
-            ef_road_u36[year] = ef_road_u36[year] + ef_road_pt
-            ef_street_u36[year] = ef_street_u36[year] + ef_street_pt
-
-    ef_road = {}
-    ef_street = {}
-
-    for year in year_range:
-        ef_road[year] = 0
-        ef_street[year] = 0
-
-        for prplsn_type in propulsion_share[year].keys():
-            ef_road_pt = (
-                baseline_ef_road[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
-            ef_street_pt = (
-                baseline_ef_street[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
+    timeline = country_data.get_derived(
+        "car_propulsion_timeline", build_car_propulsion_timeline
+    )
 
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
+    year_range = YearAxis.of(year_range)
+    rows = year_range.rows
 
-    area_specific_ef_average_with_policy = {}
-    area_specific_ef_average_without_policy = {}
-    area_specific_ef_average_weighted_avg = {}
+    percent_with_u36_impact = calculate_policy_propulsion_share(
+        timeline, types, year_start, year_end
+    )
 
-    for year in year_range:
-        area_specific_ef_average_with_policy[year] = 0
-        area_specific_ef_average_without_policy[year] = 0
-        area_specific_ef_average_weighted_avg[year] = 0
-
-        for settlement_type in share_road_driving.keys():
-            area_specific_ef_average_with_policy[year] = (
-                area_specific_ef_average_with_policy[year]
-                + (
-                    ef_road_u36[year] * share_road_driving[settlement_type] / 100
-                    + ef_street_u36[year] * share_street_driving[settlement_type] / 100
-                )
-                * adjusted_settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+    total_percent_with_u36_impact = (
+        percent_with_u36_impact["lpg"]
+        + percent_with_u36_impact["cng"]
+        + percent_with_u36_impact["ngv"]
+        + percent_with_u36_impact["p_e_hybrid"]
+        + percent_with_u36_impact["p_e_phev"]
+        + percent_with_u36_impact["d_e_hybrid"]
+        + percent_with_u36_impact["d_e_phev"]
+        + percent_with_u36_impact["hydrogen_fuel"]
+        + percent_with_u36_impact["bioethanol"]
+        + percent_with_u36_impact["biodiesel"]
+        + percent_with_u36_impact["bifuel"]
+        + percent_with_u36_impact["other"]
+        + percent_with_u36_impact["electricity_bev"]
+    )
 
-            area_specific_ef_average_without_policy[year] = (
-                area_specific_ef_average_without_policy[year]
-                + (
-                    ef_road[year] * share_road_driving[settlement_type] / 100
-                    + ef_street[year] * share_street_driving[settlement_type] / 100
-                )
-                * adjusted_settlement_distribution_by_year[year][settlement_type]
-                / 100
-            )
+    # Petrol and diesel make up the rest in their baseline proportion
+    petrol = timeline.share[:, timeline.columns["petrol"]]
+    diesel = timeline.share[:, timeline.columns["diesel"]]
+    percent_with_u36_impact["petrol"] = (
+        (100 - total_percent_with_u36_impact) * (petrol / (petrol + diesel))
+    )
+    percent_with_u36_impact["diesel"] = (
+        (100 - total_percent_with_u36_impact) * (diesel / (petrol + diesel))
+    )
 
-            area_specific_ef_average_weighted_avg[year] = (
-                affected_area / 100 * area_specific_ef_average_with_policy[year]
-            ) + (
-                (100 - affected_area)
-                / 100
-                * area_specific_ef_average_without_policy[year]
-            )
+    # The electricity of cars is not weighted by the grid emission factor
+    ef_road_u36, ef_street_u36 = timeline.average_ef(
+        0, rows, policy_share(timeline, percent_with_u36_impact)
+    )
 
-    return area_specific_ef_average_weighted_avg
+    return calculate_area_specific_ef_weighted_avg(
+        timeline,
+        (ef_road_u36, ef_street_u36),
+        area_specific_ef_without_policy,
+        settlement_distribution,
+        year_range,
+        affected_area,
+    )
 
 
 # NEW DEVELOPMENT - U3.7 ########################################
 def calculate_impact_electricity_ef(
-    year_range, country_data, types, year_start, year_end, affected_area
+    year_range,
+    grid_electricity_ef_without_policy,
+    types,
+    year_start,
+    year_end,
+    affected_area,
 ):
+    year_range = YearAxis.of(year_range)
+
     impact_electricty_ef_weighted_average = {}
 
     annual_change_with_policy = {}
 
-    grid_electricity_ef_without_policy = calculate_grid_electricity_emission_factor(
-        year_range, country_data
-    )
-
     grid_electricity_ef_with_policy = {}
 
     for year in year_range:
@@ -3592,7 +3158,7 @@ def calculate_impact_electricity_ef(
                 * grid_electricity_ef_without_policy[year_end]
             ) / (year_end - year_start + 1)
 
-            if year == list(year_range)[0]:
+            if year == year_range.start:
                 grid_electricity_ef_with_policy[year] = (
                     grid_electricity_ef_without_policy[year]
                     - annual_change_with_policy[year]
@@ -3606,7 +3172,7 @@ def calculate_impact_electricity_ef(
         else:
             annual_change_with_policy[year] = 0
 
-            if year == list(year_range)[0]:
+            if year == year_range.start:
                 grid_electricity_ef_with_policy[
                     year
                 ] = grid_electricity_ef_without_policy[year]
@@ -3622,7 +3188,11 @@ def calculate_impact_electricity_ef(
             affected_area / 100 * grid_electricity_ef_with_policy[year]
         ) + ((100 - affected_area) / 100 * grid_electricity_ef_without_policy[year])
 
-    return impact_electricty_ef_weighted_average
+    # The renewables and affected_area may be arrays over leading axes
+    return YearSeries(
+        np.stack(np.broadcast_arrays(*impact_electricty_ef_weighted_average.values()), axis=-1),
+        year_range.start,
+    )
 
 
 # NEW DEVELOPMENT - Additional ########################################
@@ -3631,232 +3201,712 @@ def calculate_impact_electricity_ef(
 def calculate_total_train_ef(
     country_data, train_impact_passenger_mobility, impact_electricity_ef
 ):
-    total_train_ef = {}
+    """
+    Returns the YearSeries of the emissions of trains, from their activity
+    with policies and the grid electricity emission factor with policies
+    (YearSeries of the same years).
+    """
+    occupancy_rate = country_data.TRAIN_COL2
+    ef_diesel_train = country_data.TRAIN_COL3
+    electric_energy_consumption = country_data.TRAIN_COL4
+    share_electric_engine = country_data.TRAIN_COL5
+    share_diesel_engine = 100 - share_electric_engine
+
+    vkm_per_capita = train_impact_passenger_mobility.array / occupancy_rate
+
+    ef_electric_engine = (
+        share_electric_engine
+        / 100
+        * impact_electricity_ef.array
+        * electric_energy_consumption
+    )
+    ef_diesel_engine = share_diesel_engine / 100 * ef_diesel_train
+
+    return YearSeries(
+        (ef_electric_engine + ef_diesel_engine) * vkm_per_capita / 1000,
+        train_impact_passenger_mobility.start,
+    )
 
-    vkm_per_capita = {}
-    ef_electric_engine = {}
-    ef_diesel_engine = {}
 
-    occupancy_rate = country_data.TRAIN_COL2.to_numpy()[0]
-    ef_diesel_train = country_data.TRAIN_COL3.to_numpy()[0]
-    electric_energy_consumption = country_data.TRAIN_COL4.to_numpy()[0]
-    share_electric_engine = country_data.TRAIN_COL5.to_numpy()[0]
+def calculate_freight_emissions(
+    country_data,
+    settlement_distribution,
+    transport_impact_freight,
+    impact_electricity_ef,
+):
+    """
+    Returns the YearFrame of the emissions of FREIGHT_TRANSPORT_MODES, from
+    their activity with policies (transport_impact_freight, a YearFrame, see
+    calculate_transport_impact_freight) and the grid electricity emission
+    factor with policies (a YearSeries of the same years).
+    settlement_distribution is the (n, 5) array of the same years, see
+    calculate_settlement_distribution. All of them may have leading axes.
+    """
+    year_range = transport_impact_freight.years
+    electricity_ef = impact_electricity_ef.array
+
+    # (..., 3, n) emission factors, rows in FREIGHT_TRANSPORT_MODES order
+    ef_average = np.stack(np.broadcast_arrays(
+        calculate_rail_transport_ef(country_data, electricity_ef),
+        calculate_road_transport_ef(
+            country_data, settlement_distribution, electricity_ef, year_range.rows
+        ),
+        np.full(len(year_range), country_data.WATER_TRN_COL2, dtype=np.float64),
+    ), axis=-2)
+    activity = np.stack([
+        transport_impact_freight[transport_type].array
+        for transport_type in FREIGHT_TRANSPORT_MODES
+    ], axis=-2)
+
+    return YearFrame(
+        FREIGHT_TRANSPORT_MODES, ef_average * activity / 1000, transport_impact_freight.start
+    )
+
+
+def calculate_rail_transport_ef(country_data, electricity_ef):
+    # Average of electric and diesel engines, per year of electricity_ef
+    electric_energy_consumption = country_data.RAIL_TRN_COL3
+    share_electric_engine = country_data.RAIL_TRN_COL4
     share_diesel_engine = 100 - share_electric_engine
+    ef_diesel_train = country_data.TRAIN_COL3
 
-    for year in train_impact_passenger_mobility.keys():
-        vkm_per_capita[year] = train_impact_passenger_mobility[year] / occupancy_rate
+    return (
+        share_electric_engine / 100 * electric_energy_consumption * electricity_ef
+    ) + (share_diesel_engine / 100 * ef_diesel_train)
 
-        ef_electric_engine[year] = (
-            share_electric_engine
-            / 100
-            * impact_electricity_ef[year]
-            * electric_energy_consumption
-        )
-        ef_diesel_engine[year] = share_diesel_engine / 100 * ef_diesel_train
 
-        total_train_ef[year] = (
-            (ef_electric_engine[year] + ef_diesel_engine[year])
-            * vkm_per_capita[year]
-            / 1000
-        )
+def calculate_road_transport_ef(country_data, settlement_distribution, electricity_ef, rows):
+    # Baseline propulsion shares weighted by settlements, with electricity_ef
+    # for the electric trucks, in the given rows (years)
+    timeline = country_data.get_derived(
+        "road_transport_propulsion_timeline", build_road_transport_propulsion_timeline
+    )
 
-    return total_train_ef
+    ef_road, ef_street = timeline.average_ef(electricity_ef[..., np.newaxis], rows)
+    return calculate_area_specific_ef(
+        ef_road, ef_street, timeline.share_road_driving, settlement_distribution
+    )
 
 
-def calculate_total_rail_transport_ef(
-    country_data, rail_transport_impact_freight, impact_electricity_ef
+# UNCERTAINTY ########################################
+#
+# Monte Carlo bands of the emissions for the distributions of dataset
+# parameters in the "uncertainty" block of a transport request. In every
+# stage the emissions of a mode are its activity / occupancy rate * emission
+# factor, and the occupancy rates cancel out of the passenger-km the policies
+# work with. So samples of occupancy rates and emission factors scale the
+# emissions of a mode, and samples of the annual changes scale the activity
+# of a mode in every year. The modal shares of the policies (U3.3, U3.4) do
+# not scale, calculate_policy_activity is run for all samples at once with a
+# leading sample axis.
+
+UNCERTAINTY_SAMPLES = 1000
+UNCERTAINTY_PERCENTILES = (5, 50, 95)
+
+
+def calculate_uncertainty(
+    context,
+    baseline,
+    uncertainty,
+    policy_quantification,
+    modal_split_u2,
+    baseline_response,
+    new_development_response,
+    policy_quantification_response,
 ):
-    total_rail_transport_ef = {}
+    """
+    Returns the P5, P50 and P95 bands of the per capita and absolute
+    emissions of the transport modes and their total in the baseline, the
+    new development and with the policies, for the distributions of
+    uncertainty. The responses are those of the stages from the selected
+    year on.
+    """
+    transport_modes = [item[0] for item in TRANSPORT_LIST]
+    samples = uncertainty.get("samples", UNCERTAINTY_SAMPLES)
 
-    ef_electric_rail = {}
-    ef_diesel_rail = {}
-    ef_average = {}
+    emission_factor, activity_ratio = sample_uncertainty_factors(
+        context.country_data,
+        uncertainty["parameters"],
+        samples,
+        np.random.default_rng(uncertainty.get("seed")),
+    )
 
-    electric_energy_consumption = country_data.RAIL_TRN_COL3.to_numpy()[0]
-    share_electric_engine = country_data.RAIL_TRN_COL4.to_numpy()[0]
-    share_diesel_engine = 100 - share_electric_engine
-    ef_diesel_train = country_data.TRAIN_COL3.to_numpy()[0]
+    # The policies shift the sampled activity between the modes
+    modal_split_u2 = YearFrame.from_dict(modal_split_u2, transport_modes)
+    policy_activity = calculate_policy_activity(
+        modal_split_u2.years,
+        context.country_data,
+        baseline["year"],
+        policy_quantification,
+        modal_split_u2,
+    )
+    sampled_policy_activity = calculate_policy_activity(
+        modal_split_u2.years,
+        context.country_data,
+        baseline["year"],
+        policy_quantification,
+        modal_split_u2 * activity_ratio,
+    )
 
-    for year in rail_transport_impact_freight.keys():
-        ef_electric_rail[year] = (
-            electric_energy_consumption * impact_electricity_ef[year]
+    def by_transport_mode(activity):
+        # (..., 8, n) array of the passenger and freight activity in TRANSPORT_LIST order
+        passenger, freight = activity
+        labels = passenger.labels + freight.labels
+        return np.concatenate([passenger.array, freight.array], axis=-2)[
+            ..., [labels.index(transport_type) for transport_type in transport_modes], :
+        ]
+
+    policy_activity = by_transport_mode(policy_activity)
+    sampled_policy_activity = by_transport_mode(sampled_policy_activity)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        policy_activity_ratio = np.where(
+            policy_activity == 0, 1, sampled_policy_activity / policy_activity
         )
-        ef_diesel_rail[year] = ef_diesel_train
 
-        ef_average[year] = (
-            share_electric_engine
-            / 100
-            * electric_energy_consumption
-            * impact_electricity_ef[year]
-        ) + (share_diesel_engine / 100 * ef_diesel_train)
+    new_population = new_development_response["impact"]["population"]
+
+    return {
+        "samples": samples,
+        "baseline": calculate_uncertainty_bands(
+            baseline_response["projections"],
+            baseline_response["projections"]["population"],
+            emission_factor,
+            activity_ratio,
+            transport_modes,
+        ),
+        "new_development": calculate_uncertainty_bands(
+            new_development_response["impact"]["emissions"],
+            new_population,
+            emission_factor,
+            activity_ratio,
+            transport_modes,
+        ),
+        "policy_quantification": calculate_uncertainty_bands(
+            policy_quantification_response,
+            new_population,
+            emission_factor,
+            policy_activity_ratio,
+            POLICY_TOTAL_MODES,
+        ),
+    }
+
+
+def calculate_uncertainty_bands(emissions, population, emission_factor, activity_ratio, total_modes):
+    """
+    Returns {"emissions": {"p5": YearFrame, ...}, "absolute_emissions": ...}
+    of the per capita emissions of a response ({transport_type: YearSeries})
+    scaled by the sampled factors (see sample_uncertainty_factors), with a
+    "total" row of total_modes.
+    """
+    transport_modes = [item[0] for item in TRANSPORT_LIST]
+    start = emissions[transport_modes[0]].start
 
-        total_rail_transport_ef[year] = (
-            ef_average[year] * rail_transport_impact_freight[year] / 1000
+    emissions_by_mode = np.stack(
+        [emissions[transport_type].array for transport_type in transport_modes]
+    )
+    sampled_emissions = (
+        emissions_by_mode * emission_factor * activity_ratio[..., YearAxis().index(start):]
+    )
+
+    # The total of the response changes like the sum of total_modes, so
+    # that it is not the sum of the rounded emissions of the modes
+    rows = [transport_modes.index(transport_type) for transport_type in total_modes]
+    total = emissions_by_mode[rows].sum(axis=0)
+    sampled_total = sampled_emissions[:, rows].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sampled_total = np.where(
+            total == 0, sampled_total, emissions["total"].array * sampled_total / total
         )
+    total = sampled_total[:, np.newaxis]
 
-    return total_rail_transport_ef
+    bands = np.percentile(
+        np.concatenate([sampled_emissions, total], axis=1), UNCERTAINTY_PERCENTILES, axis=0
+    )
+    population = population.since(start).array
 
+    return {
+        "emissions": {
+            "p%d" % percentile: YearFrame(transport_modes + ["total"], band, start).round(3)
+            for percentile, band in zip(UNCERTAINTY_PERCENTILES, bands)
+        },
+        "absolute_emissions": {
+            "p%d" % percentile: YearFrame(
+                transport_modes + ["total"], band * population / 1000, start
+            ).round(3)
+            for percentile, band in zip(UNCERTAINTY_PERCENTILES, bands)
+        },
+    }
 
-def calculate_total_road_transport_ef(
-    country_data,
-    adjusted_settlement_distribution_by_year,
-    road_transport_impact_freight,
-    impact_electricity_ef,
+
+def sample_uncertainty_factors(country_data, parameters, samples, rng):
+    """
+    Returns the sampled factors of the emissions of every transport mode
+    (TRANSPORT_LIST order) as a (samples, 8, 1) array, and of their activity
+    in 2021-2050 as a (samples, 8, 30) array.
+    """
+    transport_modes = [item[0] for item in TRANSPORT_LIST]
+    emission_factor = np.ones((samples, len(transport_modes), 1))
+    annual_change = np.zeros((samples, len(transport_modes)))
+
+    for parameter in parameters:
+        row = transport_modes.index(parameter["transport_mode"])
+        if parameter["distribution"] == "uniform":
+            change = rng.uniform(-parameter["range"], parameter["range"], samples)
+        else:
+            change = rng.triangular(parameter["low"], parameter["mode"], parameter["high"], samples)
+
+        if parameter["parameter"] == "occupancy_rate":
+            emission_factor[:, row, 0] /= 1 + change / 100
+        elif parameter["parameter"] == "emission_factor":
+            emission_factor[:, row, 0] *= 1 + change / 100
+        else:
+            annual_change[:, row] += change
+
+    # The annual changes of every decade move by the sampled percentage points
+    activity_growth = country_data.get_derived("activity_growth", build_activity_growth)
+    activity_ratio = np.ones((samples, len(transport_modes), len(YEARS)))
+    for row, transport_type in enumerate(transport_modes):
+        if not annual_change[:, row].any():
+            continue
+        changes = np.array([country_data[col] for col in ACTIVITY_GROWTH_COLUMNS[transport_type]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            activity_ratio[:, row] = np.where(
+                activity_growth[row] == 0,
+                1,
+                growth_profile(changes + annual_change[:, row, np.newaxis]) / activity_growth[row],
+            )
+
+    return emission_factor, activity_ratio
+
+
+# SENSITIVITY ########################################
+#
+# Elasticities of the total emissions with policies to the inputs of a
+# transport request: the settlement distribution, the intensity of
+# non-residential and freight transport, the metro and tram splits and the
+# percentages of the policies U3.1 - U3.7 (not their years). Every input is
+# perturbed in a variant of the request, percentages by a step in percentage
+# points and options by every other option. The policy stage is evaluated
+# for all variants at once, with a leading variant axis. The inputs of the
+# baseline only reach it through the activity of the transport modes and the
+# settlement distribution, which are computed for every variant.
+
+SENSITIVITY_YEARS = (2030, 2050)
+SENSITIVITY_STEP = 1  # percentage points
+
+INTENSITY_OPTIONS = ("none", "low_intensity", "average_intensity", "high_intensity")
+
+
+def calculate_sensitivity(
+    context,
+    new_development,
+    request_inputs,
+    sensitivity,
+    baseline_result,
+    new_development_result,
 ):
-    total_road_transport_ef = {}
+    """
+    Returns the total per capita emissions with policies in SENSITIVITY_YEARS
+    (from the selected year on) and the table of the inputs of request_inputs
+    ({"baseline": ..., "policy_quantification": ...}), ranked by how much the
+    emissions of the last of these years change with the perturbation of an
+    input. Every row has the change of the emissions (in %) in each year and
+    their elasticity, the change relative to that of the input (None for
+    options). The results of the stages are those of request_inputs.
+    """
+    step = sensitivity.get("step", SENSITIVITY_STEP)
+    years = [year for year in SENSITIVITY_YEARS if year >= request_inputs["baseline"]["year"]]
 
-    ef_average = {}
+    inputs = list_sensitivity_inputs(request_inputs, step)
+    variants = [request_inputs] + [
+        replace_input(request_inputs, path, perturbed) for path, perturbed in inputs
+    ]
 
-    share_road_driving = {
-        "metropolitan_center": country_data.ROAD_TRN_COL38.to_numpy()[0],
-        "urban": country_data.ROAD_TRN_COL39.to_numpy()[0],
-        "suburban": country_data.ROAD_TRN_COL40.to_numpy()[0],
-        "town": country_data.ROAD_TRN_COL41.to_numpy()[0],
-        "rural": country_data.ROAD_TRN_COL42.to_numpy()[0],
+    emissions = calculate_variant_emissions(
+        context, new_development, variants, baseline_result, new_development_result
+    )
+    total = emissions["total"].array[:, [emissions.years.index(year) for year in years]]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (total[1:] - total[0]) / total[0] * 100
+
+    elasticities = []
+    for (path, perturbed), input_change in zip(inputs, change):
+        value = get_input(request_inputs, path)
+        if isinstance(value, str):
+            elasticity = None
+        else:
+            elasticity = year_values(years, input_change / 100 * value / (perturbed - value))
+
+        elasticities.append({
+            "input": list(path),
+            "value": value,
+            "perturbed": perturbed,
+            "change": year_values(years, input_change),
+            "elasticity": elasticity,
+        })
+
+    # Largest changes of the last year first, then of the years before
+    order = sorted(
+        range(len(elasticities)),
+        key=lambda row: (-np.abs(np.nan_to_num(change[row, ::-1]))).tolist(),
+    )
+
+    return {
+        "step": step,
+        "emissions": year_values(years, total[0]),
+        "elasticities": [elasticities[row] for row in order],
     }
-    share_street_driving = {}
-    for settlement_type in share_road_driving.keys():
-        share_street_driving[settlement_type] = (
-            100 - share_road_driving[settlement_type]
+
+
+def list_sensitivity_inputs(request_inputs, step):
+    """
+    Returns [(path, perturbed value)] of the inputs of request_inputs that
+    calculate_sensitivity perturbs, the path being the keys of an input.
+    """
+    baseline = request_inputs["baseline"]
+
+    inputs = [
+        (
+            ("baseline", "settlement_distribution", settlement_type),
+            baseline["settlement_distribution"][settlement_type] + step,
         )
+        for settlement_type in SETTLEMENT_TYPES
+    ]
 
-    propulsion_share = {}
-    baseline_ef_street = {}
-    baseline_ef_road = {}
-
-    for year in road_transport_impact_freight.keys():
-        propulsion_share[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL11.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL12.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL13.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL14.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL15.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL16.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL17.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL18.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL19.to_numpy()[0],
-        }
+    for key, option in baseline["intensity_non_res_and_ft"].items():
+        inputs.extend(
+            (("baseline", "intensity_non_res_and_ft", key), other_option)
+            for other_option in INTENSITY_OPTIONS if other_option != option
+        )
 
-        if year > 2021:
-            propulsion_share[year]["petrol_hybrid"] = (
-                propulsion_share[2021]["petrol_hybrid"]
-                / (
-                    propulsion_share[2021]["petrol_hybrid"]
-                    + propulsion_share[2021]["diesel_hybrid"]
-                )
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol_hybrid"]
-                        + propulsion_share[year]["diesel_hybrid"]
-                    )
-                )
-            )
+    for split in ("metro_split", "tram_split"):
+        inputs.extend(
+            (("baseline", split, city), share + step) for city, share in baseline[split].items()
+        )
 
-            propulsion_share[year]["diesel_hybrid"] = (
-                propulsion_share[2021]["diesel_hybrid"]
-                / (
-                    propulsion_share[2021]["petrol_hybrid"]
-                    + propulsion_share[2021]["diesel_hybrid"]
-                )
-            ) * (
-                100
-                - (
-                    sum(propulsion_share[year].values())
-                    - (
-                        propulsion_share[year]["petrol_hybrid"]
-                        + propulsion_share[year]["diesel_hybrid"]
-                    )
-                )
-            )
+    inputs.extend(
+        (path, value + step) for path, value in policy_percentages(
+            request_inputs["policy_quantification"], ("policy_quantification",)
+        )
+    )
 
-        baseline_ef_road[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL29.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL30.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL31.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL32.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL33.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL34.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL35.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL36.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL37.to_numpy()[0],
-        }
+    return inputs
 
-        baseline_ef_street[year] = {
-            "petrol_hybrid": country_data.ROAD_TRN_COL20.to_numpy()[0],
-            "lpg": country_data.ROAD_TRN_COL21.to_numpy()[0],
-            "diesel_hybrid": country_data.ROAD_TRN_COL22.to_numpy()[0],
-            "ng": country_data.ROAD_TRN_COL23.to_numpy()[0],
-            "electricity": country_data.ROAD_TRN_COL24.to_numpy()[0],
-            "alternative": country_data.ROAD_TRN_COL25.to_numpy()[0],
-            "bioethonol": country_data.ROAD_TRN_COL26.to_numpy()[0],
-            "biodiesel": country_data.ROAD_TRN_COL27.to_numpy()[0],
-            "cng": country_data.ROAD_TRN_COL28.to_numpy()[0],
-        }
 
-    ef_road = {}
-    ef_street = {}
+def policy_percentages(values, path):
+    # (path, value) of the numbers in the nested dicts values, except the years
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from policy_percentages(value, path + (key,))
+        elif (
+            key not in ("year_start", "year_end")
+            and isinstance(value, (int, float)) and not isinstance(value, bool)
+        ):
+            yield path + (key,), value
 
-    for year in road_transport_impact_freight.keys():
-        ef_road[year] = 0
-        ef_street[year] = 0
 
-        for prplsn_type in propulsion_share[year].keys():
+def get_input(values, path):
+    for key in path:
+        values = values[key]
+    return values
 
-            ef_road_pt = (
-                baseline_ef_road[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
-            ef_street_pt = (
-                baseline_ef_street[year][prplsn_type]
-                * propulsion_share[year][prplsn_type]
-                / 100
-            )
 
-            if prplsn_type == "electricity":
-                ef_road_pt = ef_road_pt * impact_electricity_ef[year]
-                ef_street_pt = ef_street_pt * impact_electricity_ef[year]
+def replace_input(values, path, value):
+    # Copy of the nested dicts values with value at path, sharing the rest
+    values = dict(values)
+    values[path[0]] = value if len(path) == 1 else replace_input(values[path[0]], path[1:], value)
+    return values
 
-            ef_road[year] = ef_road[year] + ef_road_pt
-            ef_street[year] = ef_street[year] + ef_street_pt
 
-    year_wise_settlement_ef = {}
+def year_values(years, values):
+    # {year: value} rounded like the responses, None where not defined
+    return {
+        year: round(value, 3) if math.isfinite(value) else None
+        for year, value in zip(years, np.asarray(values).tolist())
+    }
 
-    for year in road_transport_impact_freight.keys():
-        year_wise_settlement_ef[year] = {}
-        ef_average[year] = 0
 
-        for settlement_type in share_road_driving.keys():
-            year_wise_settlement_ef[year][settlement_type] = (
-                share_road_driving[settlement_type] / 100 * ef_road[year]
-            ) + (share_street_driving[settlement_type] / 100 * ef_street[year])
+def stack_variants(variants):
+    """
+    Returns variants (nested dicts of the same keys) as one, with an array
+    over the variants in place of every number that differs between them.
+    """
+    first = variants[0]
+    if isinstance(first, dict):
+        return {key: stack_variants([variant[key] for variant in variants]) for key in first}
+    if all(variant == first for variant in variants):
+        return first
+    return np.array(variants, dtype=np.float64)
 
-            ef_average[year] = ef_average[year] + (
-                adjusted_settlement_distribution_by_year[year][settlement_type]
-                / 100
-                * year_wise_settlement_ef[year][settlement_type]
+
+def calculate_variant_emissions(
+    context, new_development, variants, baseline_result, new_development_result
+):
+    """
+    Returns the YearFrame of the per capita emissions with policies of the
+    variants of a request, [{"baseline": ..., "policy_quantification": ...}],
+    with a leading variant axis. The variants only differ in the inputs of
+    list_sensitivity_inputs. baseline_result and new_development_result are
+    those of the stages of the first variant.
+    """
+    country_data = context.country_data
+    beginning_year = variants[0]["baseline"]["year"]
+    year_range = new_development_result["impact"]["population"].keys()
+    baselines = [variant["baseline"] for variant in variants]
+
+    # Settlement distribution of the old population and the new residents,
+    # rounded like that of calculate_new_development
+    old_settlement_distribution_by_year = YearFrame(
+        SETTLEMENT_TYPES,
+        np.stack([
+            settlement_distribution_frame(baseline["settlement_distribution"], year_range).array
+            for baseline in baselines
+        ]),
+        year_range.start,
+        by_year=True,
+    )
+    adjusted_settlement_distribution_by_year = calculate_adjusted_settlement_distribution_by_year(
+        old_settlement_distribution_by_year,
+        baseline_result["population"],
+        settlement_distribution_frame(new_development["new_settlement_distribution"], year_range),
+        new_development_result["impact"]["new_residents"],
+    ).round(3)
+    adjusted_settlement_distribution_by_year.array[
+        np.isnan(adjusted_settlement_distribution_by_year.array)
+    ] = 0.0
+
+    modal_split_u2 = calculate_variant_modal_split(
+        context, baselines, new_development, baseline_result, new_development_result
+    )
+
+    policy_quantification = stack_variants(
+        [variant["policy_quantification"] for variant in variants]
+    )
+    transport_impact_passenger_mobility, transport_impact_freight = calculate_policy_activity(
+        year_range, country_data, beginning_year, policy_quantification, modal_split_u2
+    )
+
+    return calculate_policy_emissions(
+        context,
+        year_range,
+        beginning_year,
+        policy_quantification,
+        calculate_policy_settlement_weights(
+            context, adjusted_settlement_distribution_by_year, year_range
+        ),
+        transport_impact_passenger_mobility,
+        transport_impact_freight,
+    )
+
+
+def calculate_variant_modal_split(
+    context, baselines, new_development, baseline_result, new_development_result
+):
+    """
+    Returns the modal split (see calculate_new_baseline_emissions) after the
+    new development of each of baselines, as a YearFrame of all transport
+    modes with a leading variant axis. The activity of a mode in 2021 (see
+    calculate_initial_v) and its correction factors depend on the baseline,
+    the annual changes, occupancy rates and loads are the same in all
+    variants.
+    """
+    country_data = context.country_data
+    year_range = baseline_result["population"].keys()
+    transport_modes = [item[0] for item in TRANSPORT_LIST]
+
+    transport_mode_weights = {
+        transport_type: initialize_transport_mode_weights(country_data, transport_type)
+        for transport_type in transport_modes
+    }
+
+    initial_v = []
+    old_correction_factors = []
+    for baseline in baselines:
+        correction_factor = calculate_correction_factors(
+            transport_mode_weights,
+            settlement_distribution_frame(baseline["settlement_distribution"], year_range),
+        )
+        intensity_non_res_and_ft = generate_intensity_non_res_and_ft(
+            baseline["intensity_non_res_and_ft"], country_data
+        )
+        initial_v.append([
+            calculate_initial_v(
+                intensity_non_res_and_ft,
+                baseline["metro_split"],
+                baseline["tram_split"],
+                country_data,
+                transport_type,
+                correction_factor,
             )
+            for transport_type in transport_modes
+        ])
+        old_correction_factors.append(
+            [correction_factor[transport_type] for transport_type in transport_modes]
+        )
 
-        total_road_transport_ef[year] = (
-            ef_average[year] * road_transport_impact_freight[year] / 1000
+    new_correction_factors = calculate_correction_factors(
+        transport_mode_weights,
+        settlement_distribution_frame(new_development["new_settlement_distribution"], year_range),
+    )
+
+    old_correction_factor = np.array(old_correction_factors, dtype=np.float64)[..., np.newaxis]
+    new_correction_factor = np.array(
+        [new_correction_factors[transport_type] for transport_type in transport_modes],
+        dtype=np.float64,
+    )[:, np.newaxis]
+    occupancy_rate, average_load = np.array([
+        get_occupancy_rate_and_load(country_data, transport_type)
+        for transport_type in transport_modes
+    ], dtype=np.float64).T[..., np.newaxis]
+
+    activity_growth = country_data.get_derived("activity_growth", build_activity_growth)
+    baseline_v = (
+        np.array(initial_v, dtype=np.float64)[..., np.newaxis]
+        * activity_growth[:, year_range.rows]
+    )
+
+    old_population = baseline_result["population"].array
+    new_residents = new_development_result["impact"]["new_residents"].array
+    new_population = new_development_result["impact"]["population"].array
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_correction_factor = np.where(
+            new_population == 0,
+            0,
+            old_population / new_population * old_correction_factor
+            + new_residents / new_population * new_correction_factor,
+        )
+        cf_impact_factor = np.where(
+            old_correction_factor == 0, 0, weighted_correction_factor / old_correction_factor
         )
 
-    return total_road_transport_ef
+    return YearFrame(
+        transport_modes,
+        baseline_v * cf_impact_factor * occupancy_rate * average_load,
+        year_range.start,
+    )
 
 
-def calculate_total_water_transport_ef(
-    country_data, waterways_transport_impact_freight
+# DECOMPOSITION ########################################
+#
+# Contribution of each block of policies to the change of the total
+# emissions from those without policies to those with all of them. The
+# policy stage is evaluated for every subset of the blocks at once, with a
+# leading subset axis. The change is divided among the blocks by their
+# Shapley values, the average change a block makes when it is added to the
+# subsets of the other blocks. Unlike the changes of leaving out one block,
+# these add up to the total change in every year, so they make a waterfall.
+# Its first step is from the emissions of the new development to those
+# without policies, which differ where the policy stage calculates
+# differently (e.g. the activity of cars).
+
+# Percentages that are set to 0 to switch off each block of policies. The
+# freight modal split policy (U3.4) has none, the freight activity of the
+# subsets without it is calculated without it instead.
+POLICY_BLOCKS = {
+    "passenger_mobility": (("passenger_mobility", "expected_change"),),
+    "freight_transport": (("freight_transport", "expected_change"),),
+    "modal_split": (("modal_split_passenger", "affected_population"),),
+    "fuel_shares": (("fuel_shares_bus", "affected_area"), ("fuel_shares_car", "affected_area")),
+    "electricity_transport": (("electricity_transport", "affected_area"),),
+}
+
+
+def calculate_policy_decomposition(
+    context,
+    baseline,
+    policy_quantification,
+    adjusted_settlement_distribution_by_year,
+    new_development_result,
+    modal_split_u2,
 ):
-    total_water_transport_ef = {}
+    """
+    Returns the per capita emissions of the new development, without and
+    with the policies of policy_quantification and the contribution of each
+    of POLICY_BLOCKS to the change between the latter two, by year from the
+    selected year on.
+    """
+    beginning_year = baseline["year"]
+    year_range = adjusted_settlement_distribution_by_year.years
+    country_data = context.country_data
 
-    ef_waterways_transport = country_data.WATER_TRN_COL2.to_numpy()[0]
+    # All blocks off first, all on last
+    subsets = list(itertools.product((False, True), repeat=len(POLICY_BLOCKS)))
+    modal_split_on = np.array(
+        [subset[list(POLICY_BLOCKS).index("modal_split")] for subset in subsets]
+    )[:, np.newaxis, np.newaxis]
 
-    for year in waterways_transport_impact_freight.keys():
-        total_water_transport_ef[year] = (
-            waterways_transport_impact_freight[year] * ef_waterways_transport / 1000
-        )
+    policy_quantification = stack_variants([
+        switch_off_policy_blocks(policy_quantification, subset) for subset in subsets
+    ])
+
+    transport_impact_passenger_mobility, transport_impact_freight = calculate_policy_activity(
+        year_range, country_data, beginning_year, policy_quantification, modal_split_u2
+    )
+    _, transport_impact_freight_without_u34 = calculate_policy_activity(
+        year_range,
+        country_data,
+        beginning_year,
+        policy_quantification,
+        modal_split_u2,
+        without_u34=True,
+    )
+
+    emissions = calculate_policy_emissions(
+        context,
+        year_range,
+        beginning_year,
+        policy_quantification,
+        calculate_policy_settlement_weights(
+            context, adjusted_settlement_distribution_by_year, year_range
+        ),
+        transport_impact_passenger_mobility,
+        YearFrame(
+            FREIGHT_TRANSPORT_MODES,
+            np.where(
+                modal_split_on,
+                transport_impact_freight.array,
+                transport_impact_freight_without_u34.array,
+            ),
+            year_range.start,
+        ),
+    )
+    total = np.broadcast_to(emissions["total"].array, (len(subsets), len(year_range)))
+
+    row_of_subset = {subset: row for row, subset in enumerate(subsets)}
+    contributions = {}
+    for block_index, block in enumerate(POLICY_BLOCKS):
+        contribution = np.zeros(len(year_range))
+        for subset, row in row_of_subset.items():
+            if subset[block_index]:
+                continue
+            with_block = subset[:block_index] + (True,) + subset[block_index + 1:]
+            size = sum(subset)
+            weight = (
+                math.factorial(size)
+                * math.factorial(len(POLICY_BLOCKS) - size - 1)
+                / math.factorial(len(POLICY_BLOCKS))
+            )
+            contribution += weight * (total[row_of_subset[with_block]] - total[row])
+
+        contributions[block] = YearSeries(contribution, year_range.start).round(3)
+
+    return years_since({
+        "new_development": new_development_result["impact"]["emissions"]["total"],
+        "without_policies": YearSeries(total[0], year_range.start).round(3),
+        "contributions": contributions,
+        "with_policies": YearSeries(total[-1], year_range.start).round(3),
+    }, beginning_year)
+
+
+def switch_off_policy_blocks(policy_quantification, subset):
+    # policy_quantification with the percentages of the blocks of POLICY_BLOCKS
+    # that are not in subset (a flag for each block) set to 0
+    for paths, block_on in zip(POLICY_BLOCKS.values(), subset):
+        if not block_on:
+            for path in paths:
+                policy_quantification = replace_input(policy_quantification, path, 0)
+    return policy_quantification
 
-    return total_water_transport_ef
@@ -1,5 +1,5 @@
-from marshmallow import Schema, fields
-from marshmallow.validate import Range
+from marshmallow import Schema, ValidationError, fields, validates_schema
+from marshmallow.validate import OneOf, Range
 
 
 class MetroTramList(Schema):
@@ -50,7 +50,70 @@ class PolicyQuantification(Schema):
     electricity_transport = fields.Nested(FuelShares)
 
 
+class UncertainParameter(Schema):
+    # Changes of a dataset parameter of a transport mode: in % of the value
+    # for occupancy rates and emission factors, in percentage points for the
+    # annual changes of the activity
+    parameter = fields.String(
+        required=True, validate=OneOf(("occupancy_rate", "emission_factor", "annual_change")))
+    transport_mode = fields.String(required=True, validate=OneOf((
+        "bus", "car", "metro", "tram", "train",
+        "rail_transport", "road_transport", "waterways_transport")))
+    distribution = fields.String(required=True, validate=OneOf(("uniform", "triangular")))
+    range = fields.Float(validate=Range(min=0))  # uniform from -range to +range
+    low = fields.Float()  # triangular
+    mode = fields.Float()
+    high = fields.Float()
+
+    @validates_schema
+    def validate_distribution(self, data, **kwargs):
+        if data["parameter"] == "occupancy_rate" and data["transport_mode"] not in (
+                "bus", "car", "metro", "tram", "train"):
+            raise ValidationError("Occupancy rates are only known for passenger transport modes.")
+
+        if data["distribution"] == "uniform":
+            if "range" not in data:
+                raise ValidationError("Uniform distributions need a range.")
+            low = -data["range"]
+        else:
+            if not all(key in data for key in ("low", "mode", "high")):
+                raise ValidationError("Triangular distributions need a low, mode and high.")
+            if not data["low"] <= data["mode"] <= data["high"] or data["low"] == data["high"]:
+                raise ValidationError(
+                    "Triangular distributions need low <= mode <= high and low < high.")
+            low = data["low"]
+
+        if data["parameter"] != "annual_change" and low <= -100:
+            raise ValidationError(
+                "Changes of occupancy rates and emission factors must be above -100 %.")
+
+
+class Uncertainty(Schema):
+    samples = fields.Integer(strict=True, validate=Range(min=2, max=10000))
+    seed = fields.Integer(strict=True)
+    parameters = fields.List(fields.Nested(UncertainParameter), required=True)
+
+
 class Transport(Schema):
     baseline = fields.Nested(Baseline)
     new_development = fields.Nested(NewDevelopment)
     policy_quantification = fields.Nested(PolicyQuantification)
+    uncertainty = fields.Nested(Uncertainty)
+    decomposition = fields.Boolean()
+
+
+class TransportBatch(Schema):
+    baseline = fields.Nested(Baseline, required=True)
+    new_development = fields.Nested(NewDevelopment, required=True)
+    policy_quantifications = fields.List(fields.Nested(PolicyQuantification), required=True)
+
+
+class Sensitivity(Schema):
+    step = fields.Float(validate=Range(min=0, min_inclusive=False, max=100))
+
+
+class TransportSensitivity(Schema):
+    baseline = fields.Nested(Baseline, required=True)
+    new_development = fields.Nested(NewDevelopment, required=True)
+    policy_quantification = fields.Nested(PolicyQuantification, required=True)
+    sensitivity = fields.Nested(Sensitivity)
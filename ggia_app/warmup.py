@@ -0,0 +1,216 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ggia_app.dataset_registry import (
+    load_all, get_table, get_load_report, list_countries, get_country_record,
+    DATASET_FILES, TRANSPORT_DATASET, LAND_USE_DATASET, BUILDINGS_DATASET, LOCAL_DATASET_FORMAT
+)
+from ggia_app.local_datasets import list_local_datasets, get_local_record
+from ggia_app.buildings.utils.emission_factor_calculator import country_emission_factor
+import ggia_app.transport as transport
+
+
+# Pre-fork warmup: everything a request would otherwise compute on first use
+# is computed once in create_app. When gunicorn is started with --preload the
+# app is created before the workers are forked, so the workers start with
+# this data already in (copy-on-write shared) memory.
+
+WARMUP_DATASETS = (TRANSPORT_DATASET, LAND_USE_DATASET, BUILDINGS_DATASET)
+
+# Reference datasets used by the modules of each blueprint, for the startup report
+BLUEPRINT_DATASETS = {
+    "ggia_app.countries": (TRANSPORT_DATASET,),
+    "ggia_app.create_local_dataset": (
+        LOCAL_DATASET_FORMAT, TRANSPORT_DATASET, LAND_USE_DATASET, BUILDINGS_DATASET),
+    "ggia_app.transport": (TRANSPORT_DATASET,),
+    "ggia_app.land_use_change": (TRANSPORT_DATASET, LAND_USE_DATASET),
+    "ggia_app.buildings": (BUILDINGS_DATASET,),
+    "ggia_app.consumption": tuple(
+        name for name, (path, _, _) in DATASET_FILES.items() if path.startswith("consumption/")),
+}
+
+_background_warmup = None  # thread started by start_background_warmup()
+
+
+def warmup():
+    """
+    Runs all warmup stages and returns [(stage, seconds)] in the order they ran.
+    """
+    timings = []
+
+    for stage, run in (
+        ("datasets", load_all),
+        ("country records", _build_country_records),
+        ("grid emission factor trajectories", _build_grid_electricity_emission_factors),
+        ("population growth profiles", _build_population_growth),
+        ("activity growth profiles", _build_activity_growth),
+        ("metro and tram city indexes", _build_city_indexes),
+        ("propulsion share timelines", _build_propulsion_timelines),
+        ("settlement independent emission factors", _build_settlement_independent_ef),
+        ("building emission factor tables", _build_building_emission_factors),
+    ):
+        start = time.perf_counter()
+        run()
+        timings.append((stage, time.perf_counter() - start))
+
+    return timings
+
+
+def print_warmup_report(timings):
+    load_report = get_load_report()
+    print(
+        "Warmup finished in %.3f s, %d reference datasets loaded (%d from snapshots)" % (
+            sum(seconds for _, seconds in timings),
+            len(load_report),
+            sum(1 for source, _ in load_report.values() if source == "snapshot")
+        )
+    )
+    for stage, seconds in timings:
+        print("  %-36s %.3f s" % (stage, seconds))
+
+
+def start_background_warmup():
+    """
+    Runs warmup() in a daemon thread, so that the server can start accepting
+    requests right away. Requests arriving earlier load what they need themselves.
+    """
+    global _background_warmup
+    if _background_warmup is not None:
+        return _background_warmup
+
+    def run():
+        print_warmup_report(warmup())
+
+    _background_warmup = threading.Thread(target=run, name="ggia-warmup", daemon=True)
+    _background_warmup.start()
+    return _background_warmup
+
+
+def print_startup_report(import_times, startup_times, budget):
+    """
+    Prints the import time and dataset load time of every blueprint module.
+    Datasets that are not loaded yet are loaded (and timed) first.
+    Returns False if imports and create_app took longer than budget seconds.
+    """
+    if _background_warmup is not None:
+        _background_warmup.join()
+
+    for names in BLUEPRINT_DATASETS.values():
+        for name in names:
+            get_table(name)
+    load_report = get_load_report()
+
+    print("%-32s %10s %10s  %s" % ("module", "import", "load", "datasets"))
+    for module, seconds in import_times.items():
+        names = BLUEPRINT_DATASETS.get(module, ())
+        print("%-32s %8.3f s %8.3f s  %s" % (
+            module, seconds,
+            sum(load_report[name][1] for name in names),
+            ", ".join("%s (%s)" % (name, load_report[name][0]) for name in names)
+        ))
+
+    startup = sum(import_times.values()) + sum(startup_times.values())
+    print("Startup (imports and create_app) took %.3f s, budget %.3f s" % (startup, budget))
+    return startup <= budget
+
+
+def _transport_records():
+    # (record, local) of the country and local dataset records as used by the
+    # transport calculations
+    for country in list_countries(TRANSPORT_DATASET):
+        yield get_country_record(TRANSPORT_DATASET, country), False
+    for record in _local_records():
+        yield record, True
+
+
+def _local_records():
+    # Local datasets that cannot be parsed fail again when they are requested
+    for name in list_local_datasets():
+        try:
+            record = get_local_record(name)
+        except (KeyError, ValueError, pd.errors.ParserError):
+            continue
+        if record is not None:
+            yield record
+
+
+def _build_country_records():
+    for name in WARMUP_DATASETS:
+        for country in list_countries(name):
+            get_country_record(name, country)
+    for _ in _local_records():
+        pass
+
+
+def _build_grid_electricity_emission_factors():
+    for record, local in _transport_records():
+        _get_derived(
+            record, local, "grid_electricity_ef", transport.build_grid_electricity_emission_factor
+        )
+
+
+def _build_population_growth():
+    for record, local in _transport_records():
+        _get_derived(record, local, "population_growth", transport.build_population_growth)
+
+
+def _build_activity_growth():
+    for record, local in _transport_records():
+        _get_derived(record, local, "activity_growth", transport.build_activity_growth)
+
+
+def _build_city_indexes():
+    for record, local in _transport_records():
+        _get_derived(record, local, "metro_city_index", transport.build_metro_city_index)
+        _get_derived(record, local, "tram_city_index", transport.build_tram_city_index)
+
+
+def _build_propulsion_timelines():
+    # Countries without petrol and diesel cars are divided by zero, which only
+    # matters (and is reported) when such a country is requested
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for record, local in _transport_records():
+            _get_derived(
+                record, local, "bus_propulsion_timeline", transport.build_bus_propulsion_timeline
+            )
+            _get_derived(
+                record, local, "car_propulsion_timeline", transport.build_car_propulsion_timeline
+            )
+            _get_derived(
+                record,
+                local,
+                "road_transport_propulsion_timeline",
+                transport.build_road_transport_propulsion_timeline,
+            )
+
+
+def _build_settlement_independent_ef():
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for record, local in _transport_records():
+            _get_derived(
+                record,
+                local,
+                "settlement_independent_ef",
+                transport.build_settlement_independent_ef,
+            )
+
+
+def _build_building_emission_factors():
+    for country in list_countries(BUILDINGS_DATASET):
+        country_emission_factor(country)
+
+
+def _get_derived(record, local, key, build):
+    # Local datasets may be incomplete, those fail again when they are
+    # requested. Errors of the reference datasets are not skipped.
+    if not local:
+        record.get_derived(key, build)
+        return
+
+    try:
+        record.get_derived(key, build)
+    except (AttributeError, TypeError):
+        pass
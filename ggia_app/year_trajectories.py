@@ -0,0 +1,399 @@
+import numpy as np
+
+
+# Year axis of the 2021-2050 projections and the growth kernel shared by them.
+# The datasets give annual changes (in %) per decade: 2020-2030, 2030-2040 and
+# 2040-2050. The change of a decade applies to the steps into its years, so
+# 2022-2030 use the first one, 2031-2040 the second and 2041-2050 the third.
+
+FIRST_YEAR = 2021
+LAST_YEAR = 2050
+YEARS = np.arange(FIRST_YEAR, LAST_YEAR + 1)
+
+# Decade (0, 1 or 2) of the annual change used for the step into each year 2022-2050
+_STEP_DECADES = np.searchsorted([2030, 2040], YEARS[1:], side="left")
+
+
+def growth_percentages(annual_changes):
+    """
+    Returns 100 + annual change, i.e. each year in % of the previous year,
+    for the years 2022-2050. annual_changes holds the three decade changes
+    in its last axis, so an (n, 3) array gives an (n, 29) result.
+    """
+    annual_changes = np.asarray(annual_changes, dtype=np.float64)
+    return 100 + annual_changes[..., _STEP_DECADES]
+
+
+def growth_profile(annual_changes):
+    """
+    Returns the multiplier of every year 2021-2050 relative to 2021
+    (the cumulative product of the annual changes). annual_changes holds
+    the three decade changes in its last axis, so an (n, 3) array gives an
+    (n, 30) result whose first column is 1.
+    """
+    steps = growth_percentages(annual_changes) / 100
+
+    profile = np.ones(steps.shape[:-1] + (len(YEARS),))
+    profile[..., 1:] = np.cumprod(steps, axis=-1)
+    return profile
+
+
+class YearAxis:
+    """
+    The consecutive years start ... end of a calculation. Iterates, indexes
+    and slices like a range of the years, while the position of a year
+    (index), the positions in the FIRST_YEAR-LAST_YEAR arrays (rows) and the
+    mask of a policy period (window) take no list of the years. Immutable,
+    so that one axis is shared by all stages of a calculation.
+    """
+    __slots__ = ("start", "end")
+
+    def __init__(self, start=FIRST_YEAR, end=LAST_YEAR):
+        object.__setattr__(self, "start", start)
+        object.__setattr__(self, "end", max(end, start - 1))
+
+    @classmethod
+    def of(cls, year_range):
+        """
+        Returns year_range (a YearAxis or any iterable of consecutive years)
+        as a YearAxis.
+        """
+        if isinstance(year_range, cls):
+            return year_range
+        if isinstance(year_range, range) and year_range.step == 1:
+            return cls(year_range.start, year_range.stop - 1)
+        years = list(year_range)
+        if not years:
+            return cls(FIRST_YEAR, FIRST_YEAR - 1)
+        if years != list(range(years[0], years[0] + len(years))):
+            raise ValueError("Years are not consecutive")
+        return cls(years[0], years[-1])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("YearAxis is immutable")
+
+    def __reduce__(self):
+        return YearAxis, (self.start, self.end)
+
+    @property
+    def years(self):
+        return range(self.start, self.end + 1)
+
+    @property
+    def array(self):
+        return np.arange(self.start, self.end + 1)
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+    def __iter__(self):
+        return iter(self.years)
+
+    def __contains__(self, year):
+        return self.start <= year <= self.end
+
+    def __getitem__(self, position):
+        return self.years[position]
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, YearAxis) and (self.start, self.end) == (other.start, other.end)
+        )
+
+    def __hash__(self):
+        return hash((self.start, self.end))
+
+    def index(self, year):
+        """
+        Returns the position of year, raises KeyError for other years.
+        """
+        if not self.start <= year <= self.end:
+            raise KeyError(year)
+        return year - self.start
+
+    @property
+    def rows(self):
+        """
+        The positions of the years in FIRST_YEAR-LAST_YEAR arrays. Raises
+        KeyError if the axis goes beyond them.
+        """
+        if len(self) and not FIRST_YEAR <= self.start <= self.end <= LAST_YEAR:
+            raise KeyError(self.start if self.start < FIRST_YEAR else self.end)
+        return np.arange(self.start - FIRST_YEAR, self.end - FIRST_YEAR + 1)
+
+    def window(self, year_start, year_end):
+        """
+        Returns the (n,) mask of the years from year_start to year_end.
+        """
+        years = self.array
+        return (years >= year_start) & (years <= year_end)
+
+    def since(self, year):
+        """
+        Returns the axis from year on (empty if year is after the end).
+        """
+        return YearAxis(max(year, self.start), self.end)
+
+    def __repr__(self):
+        return "YearAxis(%d, %d)" % (self.start, self.end)
+
+
+def to_year_dict(values, year_range=None):
+    """
+    Returns {year: value} of a 2021-2050 array, for the years of year_range
+    (all years by default).
+    """
+    values = np.asarray(values).tolist()
+    if year_range is None:
+        return dict(zip(YEARS.tolist(), values))
+    return {year: values[year - FIRST_YEAR] for year in year_range}
+
+
+def round_values(values, decimals=0):
+    """
+    Returns the array values rounded like the builtin round of floats, from
+    the exact value of each float. np.round, like the builtin round of
+    np.float64 values, scales them first and differs at values such as 19.1235.
+    """
+    values = np.asarray(values)
+    rounded = [round(value, decimals) for value in values.ravel().tolist()]
+    return np.array(rounded, dtype=values.dtype).reshape(values.shape)
+
+
+class YearSeries:
+    """
+    Values of consecutive years backed by a 1-d NumPy array, e.g. the
+    emissions of a transport mode. Reads like a {year: value} dict
+    (series[year], keys(), values(), items() and iteration over the years)
+    and serializes to one (see to_dict). Arithmetic with numbers, arrays of
+    the same length and series of the same years is element-wise. The array
+    may have leading axes (e.g. samples), the years are the last one.
+    """
+    __slots__ = ("start", "array")
+
+    def __init__(self, array, start=FIRST_YEAR):
+        self.start = start
+        self.array = np.asarray(array)
+
+    @classmethod
+    def from_dict(cls, values_by_year):
+        """
+        Returns the series of {year: value} of consecutive years.
+        """
+        years = list(values_by_year)
+        return cls(list(values_by_year.values()), years[0] if years else FIRST_YEAR)
+
+    @property
+    def years(self):
+        return YearAxis(self.start, self.start + self.array.shape[-1] - 1)
+
+    def keys(self):
+        return self.years
+
+    def values(self):
+        return self.array.tolist()
+
+    def items(self):
+        return zip(self.years, self.array.tolist())
+
+    def __len__(self):
+        return self.array.shape[-1]
+
+    def __iter__(self):
+        return iter(self.years)
+
+    def __contains__(self, year):
+        return year in self.years
+
+    def _index(self, year):
+        index = year - self.start
+        if not 0 <= index < len(self):
+            raise KeyError(year)
+        return index
+
+    def __getitem__(self, year):
+        return self.array[self._index(year)].item()
+
+    def __setitem__(self, year, value):
+        self.array[self._index(year)] = value
+
+    def since(self, year):
+        """
+        Returns the series from year on, sharing the array.
+        """
+        offset = min(max(year - self.start, 0), len(self))
+        return YearSeries(self.array[..., offset:], self.start + offset)
+
+    def round(self, decimals=0):
+        return YearSeries(np.round(self.array, decimals), self.start)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def _operand(self, other):
+        if isinstance(other, YearSeries):
+            if other.start != self.start or len(other) != len(self):
+                raise ValueError("Series of different years")
+            return other.array
+        return other
+
+    def __add__(self, other):
+        return YearSeries(self.array + self._operand(other), self.start)
+
+    def __sub__(self, other):
+        return YearSeries(self.array - self._operand(other), self.start)
+
+    def __mul__(self, other):
+        return YearSeries(self.array * self._operand(other), self.start)
+
+    def __truediv__(self, other):
+        return YearSeries(self.array / self._operand(other), self.start)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return "YearSeries(%r)" % self.to_dict()
+
+
+class YearFrame:
+    """
+    Series of several labels (e.g. transport modes or settlement types) over
+    the same years, backed by a NumPy array with a row for each label.
+    Reads like a {label: YearSeries} dict, frame.at(year) gives the values of
+    a year. Serializes to {label: {year: value}}, or to {year: {label: value}}
+    if by_year. Arithmetic is element-wise, a YearSeries or an array of the
+    years applies to every row. The array may have leading axes (e.g.
+    samples), the labels are then the second to last axis.
+    """
+    __slots__ = ("labels", "array", "start", "by_year")
+
+    def __init__(self, labels, array, start=FIRST_YEAR, by_year=False):
+        self.labels = tuple(labels)
+        self.array = np.asarray(array)
+        self.start = start
+        self.by_year = by_year
+
+    @classmethod
+    def from_dict(cls, values_by_label, labels=None):
+        """
+        Returns the frame of {label: {year: value}} (or {label: YearSeries})
+        of consecutive years, with the rows of labels (all by default). A
+        YearFrame is returned with only the rows of labels.
+        """
+        labels = list(values_by_label if labels is None else labels)
+        if isinstance(values_by_label, YearFrame):
+            rows = [values_by_label.labels.index(label) for label in labels]
+            return cls(labels, values_by_label.array[..., rows, :], values_by_label.start)
+
+        years = list(values_by_label[labels[0]].keys())
+        return cls(
+            labels,
+            np.array([[values_by_label[label][year] for year in years] for label in labels]),
+            years[0],
+        )
+
+    @property
+    def years(self):
+        return YearAxis(self.start, self.start + self.array.shape[-1] - 1)
+
+    def keys(self):
+        return self.labels
+
+    def items(self):
+        return ((label, self[label]) for label in self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __contains__(self, label):
+        return label in self.labels
+
+    def __getitem__(self, label):
+        return YearSeries(self.array[..., self.labels.index(label), :], self.start)
+
+    def at(self, year):
+        """
+        Returns {label: value} of year, of frames without leading axes.
+        """
+        index = year - self.start
+        if not 0 <= index < self.array.shape[-1]:
+            raise KeyError(year)
+        return dict(zip(self.labels, self.array[:, index].tolist()))
+
+    def since(self, year):
+        """
+        Returns the frame from year on, sharing the array.
+        """
+        offset = min(max(year - self.start, 0), self.array.shape[-1])
+        return YearFrame(self.labels, self.array[..., offset:], self.start + offset, self.by_year)
+
+    def round(self, decimals=0, builtin=False):
+        """
+        Rounds like np.round, or like round_values if builtin, for values the
+        calculations used to keep as floats instead of np.float64.
+        """
+        rounded = round_values(self.array, decimals) if builtin else np.round(self.array, decimals)
+        return YearFrame(self.labels, rounded, self.start, self.by_year)
+
+    def sum(self):
+        """
+        Returns the YearSeries of the sum of all rows.
+        """
+        return YearSeries(self.array.sum(axis=-2), self.start)
+
+    def to_dict(self):
+        values = self.array.tolist()
+        if self.by_year:
+            return {
+                year: {label: row[i] for label, row in zip(self.labels, values)}
+                for i, year in enumerate(self.years)
+            }
+        return {label: dict(zip(self.years, row)) for label, row in zip(self.labels, values)}
+
+    def _operand(self, other):
+        if isinstance(other, YearFrame):
+            return other.array
+        if isinstance(other, YearSeries):
+            return other.array
+        return other
+
+    def __mul__(self, other):
+        return YearFrame(self.labels, self.array * self._operand(other), self.start, self.by_year)
+
+    def __truediv__(self, other):
+        return YearFrame(self.labels, self.array / self._operand(other), self.start, self.by_year)
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return "YearFrame(%r)" % self.to_dict()
+
+
+def years_since(value, year):
+    """
+    Returns value with every YearSeries and YearFrame in it (also in nested
+    dicts) cut to the years from year on.
+    """
+    if isinstance(value, (YearSeries, YearFrame)):
+        return value.since(year)
+    if isinstance(value, dict):
+        return {key: years_since(item, year) for key, item in value.items()}
+    return value
+
+
+def serialize_years(value):
+    """
+    Returns value with every YearSeries and YearFrame in it (also in nested
+    dicts and lists) replaced by its dict, for JSON responses.
+    """
+    if isinstance(value, (YearSeries, YearFrame)):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: serialize_years(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [serialize_years(item) for item in value]
+    return value
@@ -0,0 +1,128 @@
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from ggia_app import dataset_registry
+
+
+class DatasetRegistryTestCase(unittest.TestCase):
+    # Registers the table "test" read from a temporary CSV_ROOT
+
+    def setUp(self):
+        self.csv_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.csv_root)
+        self.addCleanup(dataset_registry._TABLES.pop, "test", None)
+        self.addCleanup(dataset_registry._LOAD_TIMES.pop, "test", None)
+
+        for patch in (
+            mock.patch.object(dataset_registry, "CSV_ROOT", self.csv_root),
+            mock.patch.object(
+                dataset_registry, "SNAPSHOT_ROOT", os.path.join(self.csv_root, "snapshots")
+            ),
+            mock.patch.dict(
+                dataset_registry.DATASET_FILES, {"test": ("test.csv", {}, True)}, clear=True
+            ),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.path = os.path.join(self.csv_root, "test.csv")
+
+    def write(self, content, mtime):
+        with open(self.path, "w") as csv_file:
+            csv_file.write(content)
+        os.utime(self.path, ns=(mtime, mtime))
+
+
+class ReloadTest(DatasetRegistryTestCase):
+
+    def test_unchanged_file_is_parsed_once(self):
+        self.write("country,a\nX,1\n", 1_000_000_000)
+        table = dataset_registry.get_table("test")
+        self.assertIs(dataset_registry.get_table("test"), table)
+
+        # Touched, but with the same content
+        self.write("country,a\nX,1\n", 2_000_000_000)
+        self.assertIs(dataset_registry.get_table("test"), table)
+
+    def test_changed_file_is_parsed_again(self):
+        self.write("country,a\nX,1\n", 1_000_000_000)
+        version = dataset_registry.get_version("test")
+        self.assertEqual(dataset_registry.get_country_record("test", "X").a, 1)
+
+        self.write("country,a\nX,2\n", 2_000_000_000)
+        self.assertNotEqual(dataset_registry.get_version("test"), version)
+        self.assertEqual(dataset_registry.get_country_record("test", "X").a, 2)
+
+    def test_country_lookup(self):
+        self.write("country,a,b\nX,1,\nY,2,text\nX,3,\n", 1_000_000_000)
+        self.assertEqual(dataset_registry.list_countries("test"), ["X", "Y"])
+        self.assertEqual(dataset_registry.get_country_data("test", "X")["a"].tolist(), [1])
+        self.assertTrue(dataset_registry.get_country_data("test", "Z").empty)
+        self.assertIsNone(dataset_registry.get_country_record("test", "Z"))
+
+        record = dataset_registry.get_country_record("test", "Y")
+        self.assertEqual((record.a, record["b"]), (2, "text"))
+        self.assertEqual(dataset_registry.get_country_record("test", "X").b, 0)
+
+
+class SnapshotTest(DatasetRegistryTestCase):
+
+    def reload(self):
+        dataset_registry._TABLES.pop("test")
+        table = dataset_registry.get_table("test")
+        return table, dataset_registry.get_load_report()["test"][0]
+
+    def test_round_trip(self):
+        self.write("country,a,b,c\nX,1,1.5,text\nY,2,,\n", 1_000_000_000)
+        table = dataset_registry.get_table("test")
+        values = dataset_registry._TABLES["test"].values
+        written = dataset_registry.write_snapshots()
+
+        snapshot_table, source = self.reload()
+        self.assertEqual(source, "snapshot")
+        pd.testing.assert_frame_equal(snapshot_table, table)
+        self.assertEqual(dataset_registry._TABLES["test"].values.tolist(), values.tolist())
+
+        # Only the snapshot of the current content is kept
+        self.write("country,a,b,c\nX,3,1.5,text\n", 2_000_000_000)
+        table, source = self.reload()
+        self.assertEqual(source, "csv")
+        self.assertEqual(table["a"].tolist(), [3])
+        self.assertNotEqual(dataset_registry.write_snapshots(), written)
+        self.assertEqual(len(os.listdir(dataset_registry.SNAPSHOT_ROOT)), 2)
+
+    def test_shared_values(self):
+        self.write("country,a,b\nX,1,1.5\nY,2,2.5\n", 1_000_000_000)
+        dataset_registry.write_snapshots()
+
+        with mock.patch.object(dataset_registry, "SHARE_DATASETS", True):
+            self.reload()
+        values = dataset_registry._TABLES["test"].values
+        self.assertEqual(values.tolist(), [[1, 1.5], [2, 2.5]])
+
+        # The values of the records are a view of the mapped buffer file
+        record = dataset_registry.get_country_record("test", "Y")
+        self.assertTrue(np.shares_memory(record.values, values))
+        while isinstance(values, np.ndarray):
+            values = values.base
+        self.assertIsInstance(values.obj, mmap.mmap)
+
+    def test_shared_text_table(self):
+        self.write("name,type\nX,Float\n", 1_000_000_000)
+        dataset_registry.write_snapshots()
+
+        with mock.patch.object(dataset_registry, "SHARE_DATASETS", True):
+            table, source = self.reload()
+        self.assertEqual(source, "snapshot")
+        self.assertEqual(table["type"].tolist(), ["Float"])
+
+
+if __name__ == "__main__":
+    unittest.main()
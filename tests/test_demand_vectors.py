@@ -0,0 +1,76 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from ggia_app import demand_vectors
+from ggia_app.dataset_registry import get_table
+from ggia_app.demand_vectors import get_demand_vector, list_demand_vectors
+
+
+class DemandVectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        for patch in (
+            mock.patch.object(demand_vectors, "DEMAND_VECTORS_PATH", self.directory),
+            mock.patch.object(demand_vectors, "_FILES", {}),
+            mock.patch.object(demand_vectors, "_INDEX", {}),
+            mock.patch.object(demand_vectors, "_INDEX_MTIME", None),
+            mock.patch.object(demand_vectors, "_VECTORS", demand_vectors.OrderedDict()),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.average = get_table("y_vector_average")
+
+    def write(self, file_name, column, value, mtime):
+        path = os.path.join(self.directory, file_name)
+        pd.DataFrame({column: value}, index=self.average.index).to_csv(path)
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_saved_vectors(self):
+        # The vectors the consumption module used to read on import
+        y_vectors_local = {}
+        for file in glob.glob(os.path.join("CSVfiles", "consumption", "datasets", "*.csv")):
+            local_table = pd.read_csv(file, index_col=0)
+            if self.average.index.equals(local_table.index):
+                name = os.path.basename(file).split("_")[0] + ": " + local_table.columns[0]
+                y_vectors_local[name] = local_table[local_table.columns[0]].copy()
+            shutil.copy(file, self.directory)
+
+        self.assertEqual(sorted(list_demand_vectors()), sorted(y_vectors_local))
+        for name, vector in y_vectors_local.items():
+            pd.testing.assert_series_equal(get_demand_vector(name), vector)
+
+    def test_changes(self):
+        self.write("Austria_Test-Test.csv", "Test Test", 1.0, 1_000_000_000)
+        self.assertEqual(list_demand_vectors(), ["Austria: Test Test"])
+        self.assertEqual(get_demand_vector("Austria: Test Test").sum(), len(self.average.index))
+
+        # Returned vectors are copies
+        get_demand_vector("Austria: Test Test")[:] = 5.0
+        self.assertEqual(get_demand_vector("Austria: Test Test").max(), 1.0)
+
+        # Rewritten in place
+        self.write("Austria_Test-Test.csv", "Test Test", 2.0, 2_000_000_000)
+        self.assertEqual(get_demand_vector("Austria: Test Test").max(), 2.0)
+
+        # Not a demand vector
+        with open(os.path.join(self.directory, "Austria_Broken.csv"), "w") as csv_file:
+            csv_file.write(",Broken\nWheat,1.0\n")
+        self.assertEqual(list_demand_vectors(), ["Austria: Test Test"])
+
+        os.remove(os.path.join(self.directory, "Austria_Test-Test.csv"))
+        self.assertIsNone(get_demand_vector("Austria: Test Test"))
+        self.assertEqual(list_demand_vectors(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from ggia_app import create_app, local_datasets
+from ggia_app.local_datasets import (
+    check_local_data, get_local_dataset_format, get_local_record, get_local_version,
+    list_local_datasets
+)
+
+
+def read_local_dataset(path):
+    # The parsing of local datasets before they were compiled into records
+    df = pd.read_csv(path)
+    sub_df = df[["VariableAcronym", "Value"]].T
+    sub_df.columns = sub_df.iloc[0]
+    sub_df = sub_df.drop(["VariableAcronym"])
+
+    local_dataset_format = pd.read_csv("CSVfiles/local_dataset_format.csv")
+    for i in range(len(local_dataset_format)):
+        if local_dataset_format["VariableType"][i] == "Float":
+            sub_df[local_dataset_format["VariableAcronym"][i]] = sub_df[
+                local_dataset_format["VariableAcronym"][i]].astype(float)
+
+    sub_df.fillna(0, inplace=True)
+    return sub_df
+
+
+def import_output(country_data):
+    # The structuring of imported data before the format was compiled
+    local_dataset_format = pd.read_csv("CSVfiles/local_dataset_format.csv")
+    country_data_output = {}
+    for i in range(len(local_dataset_format)):
+        if local_dataset_format["VariableAcronym"][i] in country_data.keys():
+            value = country_data[local_dataset_format["VariableAcronym"][i]].values[0]
+            country_data_output[local_dataset_format["VariableName"][i]] = getattr(
+                value, "item", lambda: value)()
+        else:
+            if local_dataset_format["VariableType"][i] == "String":
+                country_data_output[local_dataset_format["VariableName"][i]] = ""
+            else:
+                country_data_output[local_dataset_format["VariableName"][i]] = 0.0
+    return country_data_output
+
+
+class ImportLocalDatasetTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, dataset_name):
+        response = self.client.post(
+            "/api/v1/local-dataset/import", json={"localDataset": {"datasetName": dataset_name}}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_country(self):
+        response = self.post("Estonia")
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["data"]["dataset_name"], "Estonia")
+
+        country_data = pd.read_csv("CSVfiles/Transport_full_dataset.csv", skiprows=7).fillna(0)
+        country_data = country_data.loc[country_data["country"] == "Estonia"]
+        for path, read_csv_kwargs in (
+            ("CSVfiles/Land_use_full_dataset.csv", {"skiprows": 7}),
+            ("CSVfiles/buildings_full_dataset.csv", {}),
+        ):
+            table = pd.read_csv(path, **read_csv_kwargs).fillna(0)
+            table = table.loc[table["country"] == "Estonia"]
+            cols_to_use = table.columns.difference(country_data.columns)
+            country_data = country_data.merge(
+                table[cols_to_use], left_index=True, right_index=True, how="outer")
+        self.assertEqual(response["data"], import_output(country_data))
+
+    def test_local_dataset(self):
+        response = self.post("Tallinn: 11.11.2022@12:00")
+        self.assertEqual(response["status"], "success")
+        country_data = read_local_dataset("CSVfiles/local_datasets/Tallinn-11_11_2022@12__00.csv")
+        self.assertEqual(response["data"], import_output(country_data))
+
+    def test_unknown_local_dataset_of_country(self):
+        # A "<country> & <local dataset>" name is not resolved to the country
+        response = self.post("Estonia & Tallinn: 11.11.2022@12:00")
+        self.assertNotEqual(response["status"], "success")
+
+
+class LocalDatasetFormatTest(unittest.TestCase):
+
+    def test_format(self):
+        table = pd.read_csv("CSVfiles/local_dataset_format.csv")
+        local_dataset_format = get_local_dataset_format()
+        self.assertEqual(local_dataset_format.names, table["VariableName"].tolist())
+        self.assertEqual(local_dataset_format.acronyms, table["VariableAcronym"].tolist())
+        self.assertEqual(local_dataset_format.defaults, [
+            "" if var_type == "String" else 0.0 for var_type in table["VariableType"]
+        ])
+        self.assertEqual(
+            local_dataset_format.float_acronyms,
+            set(table["VariableAcronym"][table["VariableType"] == "Float"]),
+        )
+
+
+class LocalDatasetStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        for patch in (
+            mock.patch.object(local_datasets, "LOCAL_DATASETS_PATH", self.directory),
+            mock.patch.object(local_datasets, "_INDEX", {}),
+            mock.patch.object(local_datasets, "_INDEX_MTIME", None),
+            mock.patch.object(local_datasets, "_DATASETS", {}),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write(self, file_name, population_change, mtime):
+        path = os.path.join(self.directory, file_name)
+        with open(path, "w") as csv_file:
+            csv_file.write(
+                "VariableName,Value,VariableAcronym\n"
+                "dataset_name,Tallinn,country\n"
+                "dataset_description,,description\n"
+                f"annual_change_population__2021_30,{population_change},POP_COL1\n"
+                "annual_change_population__2031_40,,POP_COL2\n"
+            )
+        os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def test_saved_datasets(self):
+        # Files saved by the export, the demo files have an older layout
+        for file_name in sorted(os.listdir("CSVfiles/local_datasets")):
+            if file_name.startswith("DEMO"):
+                continue
+            path = shutil.copy(os.path.join("CSVfiles/local_datasets", file_name), self.directory)
+            name = local_datasets.dataset_name(file_name)
+            expected = read_local_dataset(path)
+
+            data = check_local_data(name)
+            self.assertEqual(sorted(data.columns), sorted(expected.columns), name)
+            for column in expected.columns:
+                self.assertEqual(data[column].iloc[0], expected[column].iloc[0], (name, column))
+
+    def test_changes(self):
+        self.write("Tallinn-11_11_2022@12__00.csv", "1.5", 1_000_000_000)
+        self.assertEqual(list_local_datasets(), ["Tallinn: 11.11.2022@12:00"])
+        self.assertIsNone(get_local_record("Tallinn"))
+
+        record = get_local_record("Tallinn: 11.11.2022@12:00")
+        self.assertEqual((record.POP_COL1, record.POP_COL2, record.description), (1.5, 0, 0))
+        version = get_local_version("Tallinn: 11.11.2022@12:00")
+
+        self.write("Tallinn-11_11_2022@12__00.csv", "-2", 2_000_000_000)
+        self.assertNotEqual(get_local_version("Tallinn: 11.11.2022@12:00"), version)
+        self.assertEqual(get_local_record("Tallinn: 11.11.2022@12:00").POP_COL1, -2)
+
+        os.remove(os.path.join(self.directory, "Tallinn-11_11_2022@12__00.csv"))
+        self.assertEqual(list_local_datasets(), [])
+        self.assertTrue(check_local_data("Tallinn: 11.11.2022@12:00").empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
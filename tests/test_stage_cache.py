@@ -0,0 +1,73 @@
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+from ggia_app import create_app, stage_cache
+from ggia_app.stage_cache import get_stage, put_stage, stage_key
+from test_transport import transport_request
+
+
+class StageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(stage_cache, "_STAGES", OrderedDict())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_key(self):
+        key = stage_key("baseline", {"a": 1, "b": [1, 2]}, ["v1", None])
+        self.assertEqual(key, stage_key("baseline", {"b": [1, 2], "a": 1}, ["v1", None]))
+        self.assertNotEqual(key, stage_key("baseline", {"a": 1, "b": [1, 2]}, ["v2", None]))
+        self.assertNotEqual(key, stage_key("new_development", {"a": 1, "b": [1, 2]}, ["v1", None]))
+
+    def test_copies(self):
+        value = {"projections": {"bus": {2021: 1.0}}}
+        put_stage("key", value)
+        value["projections"]["bus"][2021] = 2.0
+        self.assertEqual(get_stage("key"), {"projections": {"bus": {2021: 1.0}}})
+
+        get_stage("key")["projections"].pop("bus")
+        self.assertEqual(get_stage("key"), {"projections": {"bus": {2021: 1.0}}})
+        self.assertIsNone(get_stage("other key"))
+
+    def test_eviction(self):
+        with mock.patch.object(stage_cache, "MAX_CACHED_STAGES", 2):
+            put_stage("a", 1)
+            put_stage("b", 2)
+            get_stage("a")
+            put_stage("c", 3)
+        self.assertEqual((get_stage("a"), get_stage("b"), get_stage("c")), (1, None, 3))
+
+
+class CachedStagesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, endpoint, body):
+        return self.client.post("/api/v1/calculate/transport" + endpoint, json=body).json
+
+    def test_endpoints(self):
+        # Every endpoint removes the years before the selected year from
+        # the stages it returns, which must not change the cached stages
+        body = transport_request("Austria", 2025)
+        with mock.patch.object(stage_cache, "_STAGES", OrderedDict()):
+            expected = self.post("", body)
+
+        with mock.patch.object(stage_cache, "_STAGES", OrderedDict()):
+            baseline = self.post("/baseline", {"baseline": body["baseline"]})
+            new_development = self.post("/new-development", {
+                "baseline": body["baseline"], "new_development": body["new_development"]
+            })
+            self.assertEqual(self.post("", body), expected)
+            self.assertEqual(self.post("", body), expected)
+
+        self.assertEqual(baseline["data"]["baseline"], expected["data"]["baseline"])
+        self.assertEqual(
+            new_development["data"]["new_development"], expected["data"]["new_development"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
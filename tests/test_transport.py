@@ -0,0 +1,412 @@
+import json
+import os
+import unittest
+
+from ggia_app import create_app
+
+
+CAR_TYPES = (
+    "lpg", "cng", "ngv", "p_e_hybrid", "p_e_phev", "d_e_hybrid", "d_e_phev", "hydrogen_fuel",
+    "bioethanol", "biodiesel", "bifuel", "other",
+    "electricity_bev", "electricity_p_e_phev", "electricity_d_e_phev",
+)
+
+# (country, year, metro_split, tram_split) of the responses in data/transport_responses.json
+TRANSPORT_CASES = (
+    ("Austria", 2022, {"vienna": 40}, {"graz": 50, "linz": 20}),
+    ("Germany", 2025, {"berlin": 30, "munich": 50}, {"berlin": 20, "dresden": 10}),
+    ("Belgium", 2030, {}, {}),
+    ("Tallinn: 11.11.2022@12:00", 2023, {}, {}),
+    ("Estonia & Tallinn: 31.10.2022@15:17", 2021, {}, {}),
+)
+
+
+def transport_request(country, year=2022):
+    return {
+        "baseline": {
+            "country": country,
+            "population": 120000,
+            "year": year,
+            "settlement_distribution": {
+                "metropolitan_center": 10, "urban": 30, "suburban": 20, "town": 20, "rural": 20,
+            },
+            "intensity_non_res_and_ft": {
+                "non_res_pt": "average_intensity",
+                "ft_rail": "average_intensity",
+                "ft_road": "high_intensity",
+                "ft_water": "none",
+            },
+            "metro_split": {},
+            "tram_split": {},
+        },
+        "new_development": {
+            "new_residents": 5000,
+            "year_start": year + 1,
+            "year_finish": year + 6,
+            "new_settlement_distribution": {
+                "metropolitan_center": 0, "urban": 50, "suburban": 30, "town": 20, "rural": 0,
+            },
+        },
+        "policy_quantification": {
+            "passenger_mobility": {
+                "expected_change": -10, "affected_area": 60,
+                "year_start": year + 2, "year_end": year + 10,
+            },
+            "freight_transport": {
+                "expected_change": 5, "year_start": year + 2, "year_end": year + 8,
+            },
+            "modal_split_passenger": {
+                "shares": {"bus": 20, "car": 50, "metro": 5, "tram": 5, "train": 20},
+                "affected_population": 50,
+                "year_start": year + 1, "year_end": year + 12,
+            },
+            "modal_split_freight": {
+                "shares": {"rail_transport": 30, "road_transport": 60, "waterways_transport": 10},
+                "year_start": year + 1, "year_end": year + 9,
+            },
+            "fuel_shares_bus": {
+                "types": {"petrol": 0, "lpg": 1, "cng": 4, "electricity": 50, "diesel": 45},
+                "year_start": year + 1, "year_end": year + 10, "affected_area": 70,
+            },
+            "fuel_shares_car": {
+                "types": {
+                    car_type: 20 if car_type == "electricity_bev" else 2 for car_type in CAR_TYPES
+                },
+                "year_start": year + 3, "year_end": year + 14, "affected_area": 80,
+            },
+            "electricity_transport": {
+                "types": {"renewables": 60},
+                "year_start": year + 2, "year_end": year + 15, "affected_area": 90,
+            },
+        },
+    }
+
+
+class TransportResponsesTest(unittest.TestCase):
+    # The responses of TRANSPORT_CASES were recorded before the calculations
+    # were moved from dicts of years to arrays, and must stay the same
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+        with open(os.path.join(os.path.dirname(__file__), "data", "transport_responses.json")) as f:
+            cls.responses = json.load(f)
+
+    def test_responses(self):
+        for country, year, metro_split, tram_split in TRANSPORT_CASES:
+            with self.subTest(country=country, year=year):
+                body = transport_request(country, year)
+                body["baseline"]["metro_split"] = metro_split
+                body["baseline"]["tram_split"] = tram_split
+                response = self.client.post("/api/v1/calculate/transport", json=body)
+                self.assertEqual(response.json["data"], self.responses["%s/%d" % (country, year)])
+
+
+class SettlementDistributionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, endpoint, baseline):
+        response = self.client.post("/api/v1/calculate/transport" + endpoint, json={"baseline": baseline})
+        self.assertEqual(response.json["status"], "success")
+        return response.json["data"]["baseline"]
+
+    def test_same_as_baseline(self):
+        # The first request of each baseline builds the settlement basis,
+        # the next ones only evaluate it
+        for country in ("Austria", "Finland", "Tallinn: 11.11.2022@12:00"):
+            for shares in (
+                (10, 30, 20, 20, 20),
+                (0, 0, 0, 0, 100),
+                (12.345, 23.456, 34.567, 17.532, 12.1),
+                (100 / 3, 100 / 7, 100 / 11, 100 / 13, 100 - 100 / 3 - 100 / 7 - 100 / 11 - 100 / 13),
+            ):
+                with self.subTest(country=country, shares=shares):
+                    baseline = transport_request(country, 2024)["baseline"]
+                    baseline["settlement_distribution"] = dict(zip(
+                        ("metropolitan_center", "urban", "suburban", "town", "rural"), shares
+                    ))
+                    self.assertEqual(
+                        self.post("/settlement-distribution", baseline),
+                        self.post("/baseline", baseline),
+                    )
+
+    def test_missing_settlement_type(self):
+        baseline = transport_request("Austria")["baseline"]
+        del baseline["settlement_distribution"]["rural"]
+        response = self.client.post(
+            "/api/v1/calculate/transport/settlement-distribution", json={"baseline": baseline}
+        )
+        self.assertEqual(response.json["status"], "invalid")
+
+
+class BatchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, endpoint, body):
+        response = self.client.post("/api/v1/calculate/transport" + endpoint, json=body)
+        self.assertEqual(response.json["status"], "success")
+        return response.json["data"]
+
+    def test_same_as_single_runs(self):
+        request = transport_request("Germany", 2023)
+        baseline_and_new_development = {
+            "baseline": request["baseline"], "new_development": request["new_development"]
+        }
+
+        policy_quantifications = []
+        for expected_change, car_share in ((-10, 50), (20, 30), (0, 70)):
+            policy_quantification = transport_request("Germany", 2023)["policy_quantification"]
+            policy_quantification["passenger_mobility"]["expected_change"] = expected_change
+            policy_quantification["modal_split_passenger"]["shares"].update(
+                {"car": car_share, "bus": 70 - car_share}
+            )
+            policy_quantifications.append(policy_quantification)
+
+        batch = self.post("/batch", dict(
+            baseline_and_new_development, policy_quantifications=policy_quantifications
+        ))
+        results = batch["policy_quantifications"]
+        self.assertEqual(len(results), 3)
+        self.assertNotEqual(results[0], results[1])
+
+        # The results are in the order of the policy quantifications
+        for policy_quantification, result in zip(policy_quantifications, results):
+            single = self.post("", dict(
+                baseline_and_new_development, policy_quantification=policy_quantification
+            ))
+            self.assertEqual(batch["baseline"], single["baseline"])
+            self.assertEqual(batch["new_development"], single["new_development"])
+            self.assertEqual(result, {
+                "policy_quantification": single["policy_quantification"],
+                "absolute_policy_quantification": single["absolute_policy_quantification"],
+            })
+
+
+class ZeroGridElectricityEmissionFactorTest(unittest.TestCase):
+    # Norway has a grid electricity emission factor of 0, which the policy
+    # U3.7 divides by. Its emissions are reported as 0, not as an error.
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, endpoint, body):
+        response = self.client.post("/api/v1/calculate/transport" + endpoint, json=body)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        self.assertEqual(response.json["status"], "success")
+        return response.json["data"]
+
+    def test_transport(self):
+        data = self.post("", transport_request("Norway"))
+        self.assertEqual(set(data["policy_quantification"]["metro"].values()), {0.0})
+
+    def test_batch(self):
+        body = transport_request("Norway")
+        body["policy_quantifications"] = [body.pop("policy_quantification")]
+        self.post("/batch", body)
+
+    def test_sensitivity(self):
+        self.post("/sensitivity", transport_request("Norway"))
+
+    def test_uncertainty(self):
+        body = transport_request("Norway")
+        body["uncertainty"] = {"samples": 5, "seed": 1, "parameters": [{
+            "parameter": "emission_factor",
+            "transport_mode": "train",
+            "distribution": "uniform",
+            "range": 10,
+        }]}
+        self.post("", body)
+
+    def test_decomposition(self):
+        body = transport_request("Norway")
+        body["decomposition"] = True
+        self.post("", body)
+
+
+class DecompositionFlagTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def test_false_strings(self):
+        for flag, decomposition in (("false", False), ("0", False), ("true", True)):
+            body = transport_request("Austria")
+            body["decomposition"] = flag
+            response = self.client.post("/api/v1/calculate/transport", json=body)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual("decomposition" in response.json["data"], decomposition, flag)
+
+
+class CountryNameTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def test_country_with_unknown_local_dataset(self):
+        # Without a local dataset of that name the country's data is used
+        body = transport_request("Estonia & Tallinn: 11.11.2022@12:00")
+        response = self.client.post("/api/v1/calculate/transport", json=body)
+        self.assertEqual(response.json["status"], "success")
+
+
+class RoundingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def test_settlement_distribution(self):
+        # Until the new development starts, the adjusted rural share is the
+        # float 19.1235, which the calculations have always rounded to 19.123
+        body = transport_request("Belgium", 2023)
+        body["baseline"]["settlement_distribution"].update({"urban": 30.8765, "rural": 19.1235})
+        body["new_development"].update({"year_start": 2049, "year_finish": 2050})
+        data = self.client.post("/api/v1/calculate/transport", json=body).json["data"]
+
+        settlement_distribution = data["new_development"]["impact"]["settlement_distribution"]["2048"]
+        self.assertEqual(settlement_distribution["rural"], 19.123)
+        self.assertEqual(settlement_distribution["urban"], 30.877)
+        self.assertEqual(data["policy_quantification"]["car"]["2048"], 1369.74)
+
+
+class MetroTramSplitTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post_baseline(self, country, metro_split):
+        baseline = transport_request(country)["baseline"]
+        baseline["metro_split"] = metro_split
+        response = self.client.post("/api/v1/calculate/transport/baseline", json={"baseline": baseline})
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_city_names_in_any_case(self):
+        lower_case = self.post_baseline("Austria", {"vienna": 40})
+        self.assertGreater(lower_case["data"]["baseline"]["projections"]["metro"]["2022"], 0)
+        self.assertEqual(self.post_baseline("Austria", {"Vienna": 40}), lower_case)
+
+    def test_cities_without_name(self):
+        # The metro and tram columns of e.g. Haapsalu are empty
+        response = self.post_baseline("Haapsalu", {})
+        self.assertEqual(response["status"], "invalid")
+
+
+class UncertaintyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def test_zero_width(self):
+        # Without uncertainty every sample is the point estimate
+        body = transport_request("Germany", 2024)
+        body["uncertainty"] = {"samples": 20, "seed": 1, "parameters": [
+            {"parameter": parameter, "transport_mode": "car", "distribution": "uniform", "range": 0}
+            for parameter in ("occupancy_rate", "emission_factor", "annual_change")
+        ]}
+        response = self.client.post("/api/v1/calculate/transport", json=body)
+        self.assertEqual(response.json["status"], "success")
+        data = response.json["data"]
+
+        for stage, emissions in (
+            ("baseline", data["baseline"]["projections"]),
+            ("new_development", data["new_development"]["impact"]["emissions"]),
+            ("policy_quantification", data["policy_quantification"]),
+        ):
+            bands = data["uncertainty"][stage]["emissions"]
+            for band in ("p5", "p50", "p95"):
+                for transport_mode, years in bands[band].items():
+                    with self.subTest(stage=stage, band=band, transport_mode=transport_mode):
+                        self.assertEqual(years.keys(), emissions[transport_mode].keys())
+                        for year, value in years.items():
+                            self.assertAlmostEqual(value, emissions[transport_mode][year], places=6)
+
+
+class SensitivityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, endpoint, body):
+        response = self.client.post("/api/v1/calculate/transport" + endpoint, json=body)
+        self.assertEqual(response.json["status"], "success")
+        return response.json["data"]
+
+    def test_same_as_perturbed_runs(self):
+        request = transport_request("Finland", 2024)
+        sensitivity = self.post("/sensitivity", request)["sensitivity"]
+        emissions = self.post("", request)["policy_quantification"]["total"]
+        self.assertEqual(sensitivity["emissions"], {year: emissions[year] for year in ("2030", "2050")})
+
+        self.assertGreater(len(sensitivity["elasticities"]), 10)
+        for row in sensitivity["elasticities"][::5]:
+            with self.subTest(input=row["input"]):
+                perturbed = json.loads(json.dumps(request))
+                values = perturbed
+                for key in row["input"][:-1]:
+                    values = values[key]
+                self.assertEqual(values[row["input"][-1]], row["value"])
+                values[row["input"][-1]] = row["perturbed"]
+
+                perturbed_emissions = self.post("", perturbed)["policy_quantification"]["total"]
+                for year, change in row["change"].items():
+                    expected = (perturbed_emissions[year] - emissions[year]) / emissions[year] * 100
+                    # The emissions of the responses are rounded to 3 decimals
+                    self.assertAlmostEqual(change, expected, delta=0.01)
+
+
+class DecompositionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+
+    def post(self, body):
+        response = self.client.post("/api/v1/calculate/transport", json=body)
+        self.assertEqual(response.json["status"], "success")
+        return response.json["data"]
+
+    def test_closes_to_policy_total(self):
+        for country, year in (("Austria", 2022), ("Spain", 2026)):
+            with self.subTest(country=country, year=year):
+                body = transport_request(country, year)
+                body["decomposition"] = True
+                data = self.post(body)
+                decomposition = data["decomposition"]
+
+                self.assertEqual(decomposition["with_policies"], data["policy_quantification"]["total"])
+                for year, with_policies in decomposition["with_policies"].items():
+                    contributions = sum(
+                        contribution[year] for contribution in decomposition["contributions"].values()
+                    )
+                    self.assertAlmostEqual(
+                        decomposition["without_policies"][year] + contributions, with_policies, delta=0.01
+                    )
+
+    def test_blocks_without_change(self):
+        # Policies that change nothing contribute nothing
+        body = transport_request("Austria")
+        body["decomposition"] = True
+        body["policy_quantification"]["passenger_mobility"]["expected_change"] = 0
+        body["policy_quantification"]["electricity_transport"]["affected_area"] = 0
+        contributions = self.post(body)["decomposition"]["contributions"]
+
+        for block in ("passenger_mobility", "electricity_transport"):
+            self.assertEqual(set(contributions[block].values()), {0.0})
+        self.assertNotEqual(set(contributions["fuel_shares"].values()), {0.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
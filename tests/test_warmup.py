@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+
+from ggia_app.dataset_registry import get_country_record, list_countries, TRANSPORT_DATASET
+from ggia_app.local_datasets import get_local_record
+from ggia_app.warmup import print_startup_report, warmup
+
+
+class WarmupTest(unittest.TestCase):
+
+    def test_derived_data(self):
+        timings = warmup()
+        self.assertEqual(timings[0][0], "datasets")
+
+        keys = (
+            "grid_electricity_ef", "population_growth", "activity_growth", "metro_city_index",
+            "tram_city_index", "bus_propulsion_timeline", "car_propulsion_timeline",
+            "road_transport_propulsion_timeline", "settlement_independent_ef",
+        )
+        records = [get_country_record(TRANSPORT_DATASET, country)
+                   for country in list_countries(TRANSPORT_DATASET)]
+        records.append(get_local_record("Tallinn: 11.11.2022@12:00"))
+
+        # Requests find the derived data of every record
+        for record in records:
+            for key in keys:
+                self.assertIn(key, record.derived, (record.country, key))
+
+
+class StartupReportTest(unittest.TestCase):
+
+    def report(self, import_seconds, budget):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return print_startup_report(
+                {"ggia_app.transport": import_seconds}, {"create_app": 0.5}, budget
+            )
+
+    def test_budget(self):
+        self.assertTrue(self.report(0.9, 1.5))
+        self.assertFalse(self.report(1.1, 1.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
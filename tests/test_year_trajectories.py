@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+
+from ggia_app.year_trajectories import (
+    YearAxis, YearFrame, YearSeries, round_values, serialize_years, years_since
+)
+
+
+class RoundTest(unittest.TestCase):
+    # 19.1235 is stored as 19.12349999..., which the builtin round of a
+    # float rounds down and np.round, like the builtin round of a
+    # np.float64, rounds up after scaling it to 19123.5
+
+    def test_round_values(self):
+        self.assertEqual(round_values(np.array([19.1235, 2.675]), 3).tolist(), [19.123, 2.675])
+        self.assertEqual(round_values(np.array([[0.5, 1.5, 2.5]])).tolist(), [[0.0, 2.0, 2.0]])
+        self.assertTrue(np.isnan(round_values(np.array([np.nan]), 3)[0]))
+
+    def test_year_series(self):
+        series = YearSeries([19.1235, 1.0], 2021)
+        self.assertEqual(series.round(3).to_dict(), {2021: round(np.float64(19.1235), 3), 2022: 1.0})
+
+    def test_year_frame(self):
+        frame = YearFrame(("rural",), np.array([[19.1235, 20.0]]), 2047)
+        self.assertEqual(frame.round(3).to_dict(), {"rural": {2047: 19.124, 2048: 20.0}})
+        self.assertEqual(frame.round(3, builtin=True).to_dict(), {"rural": {2047: 19.123, 2048: 20.0}})
+
+
+class YearSeriesTest(unittest.TestCase):
+    # Series replace {year: value} dicts and must read like them
+
+    def setUp(self):
+        self.values = {2021: 1.5, 2022: 2.0, 2023: 3.25}
+        self.series = YearSeries.from_dict(self.values)
+
+    def test_dict(self):
+        self.assertEqual(self.series.to_dict(), self.values)
+        self.assertEqual(list(self.series), list(self.values))
+        self.assertEqual(list(self.series.keys()), list(self.values.keys()))
+        self.assertEqual(self.series.values(), list(self.values.values()))
+        self.assertEqual(list(self.series.items()), list(self.values.items()))
+        self.assertEqual(self.series[2022], 2.0)
+        self.assertIn(2023, self.series)
+        self.assertNotIn(2024, self.series)
+        with self.assertRaises(KeyError):
+            self.series[2020]
+
+        self.series[2022] = 4.0
+        self.assertEqual(self.series.to_dict(), {2021: 1.5, 2022: 4.0, 2023: 3.25})
+
+    def test_since(self):
+        self.assertEqual(self.series.since(2022).to_dict(), {2022: 2.0, 2023: 3.25})
+        self.assertEqual(self.series.since(2000).to_dict(), self.values)
+        self.assertEqual(self.series.since(2030).to_dict(), {})
+
+    def test_arithmetic(self):
+        other = YearSeries([1.0, 2.0, 4.0], 2021)
+        self.assertEqual((self.series + other).to_dict(), {2021: 2.5, 2022: 4.0, 2023: 7.25})
+        self.assertEqual((self.series - other).to_dict(), {2021: 0.5, 2022: 0.0, 2023: -0.75})
+        self.assertEqual((2 * self.series).to_dict(), {2021: 3.0, 2022: 4.0, 2023: 6.5})
+        self.assertEqual((self.series / other).to_dict(), {2021: 1.5, 2022: 1.0, 2023: 0.8125})
+        with self.assertRaises(ValueError):
+            self.series + YearSeries([1.0, 2.0, 4.0], 2022)
+
+
+class YearFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = {"bus": {2021: 1.0, 2022: 2.0}, "car": {2021: 3.0, 2022: 5.0}}
+        self.frame = YearFrame.from_dict(self.values)
+
+    def test_dict(self):
+        self.assertEqual(self.frame.to_dict(), self.values)
+        self.assertEqual(list(self.frame), ["bus", "car"])
+        self.assertEqual(self.frame["car"].to_dict(), {2021: 3.0, 2022: 5.0})
+        self.assertEqual(self.frame.at(2022), {"bus": 2.0, "car": 5.0})
+        self.assertEqual(self.frame.sum().to_dict(), {2021: 4.0, 2022: 7.0})
+        self.assertEqual(YearFrame.from_dict(self.frame, ["car"]).to_dict(), {"car": self.values["car"]})
+
+        by_year = YearFrame(self.frame.labels, self.frame.array, 2021, by_year=True)
+        self.assertEqual(by_year.to_dict(), {2021: {"bus": 1.0, "car": 3.0}, 2022: {"bus": 2.0, "car": 5.0}})
+
+    def test_nested(self):
+        response = {"emissions": self.frame, "population": YearSeries([7, 8], 2021), "year": 2021}
+        self.assertEqual(serialize_years(years_since(response, 2022)), {
+            "emissions": {"bus": {2022: 2.0}, "car": {2022: 5.0}},
+            "population": {2022: 8},
+            "year": 2021,
+        })
+
+
+class YearAxisTest(unittest.TestCase):
+
+    def test_range(self):
+        axis = YearAxis(2023, 2030)
+        self.assertEqual(list(axis), list(range(2023, 2031)))
+        self.assertEqual(len(axis), 8)
+        self.assertEqual(axis[0], 2023)
+        self.assertEqual(axis.index(2025), 2)
+        self.assertEqual(YearAxis.of(range(2023, 2031)), axis)
+        self.assertEqual(axis.since(2028), YearAxis(2028, 2030))
+        self.assertEqual(axis.window(2024, 2025).tolist(), [False, True, True] + [False] * 5)
+        self.assertEqual(axis.rows.tolist(), list(range(2, 10)))
+        with self.assertRaises(ValueError):
+            YearAxis.of([2021, 2023])
+
+
+if __name__ == "__main__":
+    unittest.main()